@@ -0,0 +1,112 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import ExitStack
+from typing import Callable, List
+
+import numpy as np
+
+from . import profiling
+from .metrics import QUERY_BATCH_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class _Request:
+    __slots__ = ("texts", "future", "profiler")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future = Future()
+        # The caller only waits; if its request is profiled, the worker's encode is sampled for it
+        self.profiler = profiling.active()
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embedding requests into one encode call
+
+    Callers block on submit(texts).result() while a single worker thread
+    drains the queue, encodes everything it collected in one batch and hands
+    each caller its own rows back. Whatever is already queued is always taken;
+    the worker only waits up to max_wait_ms for more when recent batches show
+    that requests are arriving concurrently, so a lone request is not delayed.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch_size: int = 64, max_wait_ms: float = 3.0):
+        self.encode_batch = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        # Moving average of requests per batch, used to decide whether waiting pays off
+        self.recent_requests = 1.0
+        self._closed = False
+        self._start()
+
+    def _start(self):
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def after_fork(self):
+        """Give a forked child its own queue and worker; the parent's thread was not copied"""
+        self._start()
+
+    def submit(self, texts: List[str]) -> Future:
+        if self._closed:
+            raise RuntimeError("EmbeddingBatcher is closed")
+        request = _Request(list(texts))
+        self._queue.put(request)
+        return request.future
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.submit(texts).result()
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.perf_counter() + (self.max_wait if self.recent_requests > 1.5 else 0)
+        while size < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                # Let the main loop see the shutdown once this batch is done
+                self._queue.put(None)
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = self._collect(first)
+            self.recent_requests = 0.8 * self.recent_requests + 0.2 * len(batch)
+            QUERY_BATCH_REQUESTS.observe(len(batch))
+
+            texts = [text for request in batch for text in request.texts]
+            try:
+                with ExitStack() as scopes:
+                    for profiler in {id(r.profiler): r.profiler for r in batch if r.profiler is not None}.values():
+                        scopes.enter_context(profiler.thread_scope())
+                    embeddings = self.encode_batch(texts)
+            except Exception as e:
+                logger.error("❌ Batched embedding failed: %s", e)
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            start = 0
+            for request in batch:
+                request.future.set_result(embeddings[start:start + len(request.texts)])
+                start += len(request.texts)
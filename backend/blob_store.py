@@ -0,0 +1,253 @@
+"""Content-addressed store for uploaded files
+
+Files are stored once per distinct content, named by their SHA-256 and
+spread over two levels of fan-out directories (ab/cd/abcd...), so no
+directory grows past a few entries however many documents are uploaded.
+Each blob keeps the ids of the documents that use it in a .refs file next
+to it; the blob is deleted when the last of them is released, so the same
+PDF uploaded twice is stored once and survives deleting either copy.
+
+Blobs are written to a temporary file and renamed into place, so a crash
+never leaves half a blob. With BLOB_COMPRESSION=gzip they are stored
+compressed and decompressed to a temporary file when a path is needed.
+
+Documents uploaded before the blob store only have a file_path; move them in with
+
+    python -m backend.blob_store migrate
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Union
+
+from .file_locks import index_write_lock
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIONS = ("none", "gzip")
+GZIP_SUFFIX = ".gz"
+REFS_SUFFIX = ".refs"
+
+_READ_SIZE = 1 << 20
+
+
+class BlobStore:
+    """SHA-256 addressed, reference-counted files under root
+
+    put and release hold an exclusive lock on the store, so gunicorn
+    workers can share it; copying and compressing happen before the lock
+    is taken.
+    """
+
+    def __init__(self, root: Optional[str] = None, compression: Optional[str] = None,
+                 compresslevel: int = 6):
+        self.root = root or os.getenv("BLOB_DIR", "./uploads/blobs")
+        compression = (compression or os.getenv("BLOB_COMPRESSION", "none")).lower()
+        if compression not in COMPRESSIONS:
+            logger.warning("⚠️ Unknown BLOB_COMPRESSION '%s', using 'none'", compression)
+            compression = "none"
+        self.compression = compression
+        self.compresslevel = compresslevel
+        os.makedirs(self.root, exist_ok=True)
+
+    def _base(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def path(self, digest: str) -> Optional[str]:
+        """Stored file of digest, compressed or not, or None if there is none
+
+        Blobs keep the form they were written in, so changing
+        BLOB_COMPRESSION leaves existing blobs readable.
+        """
+        base = self._base(digest)
+        for candidate in (base, base + GZIP_SUFFIX):
+            if os.path.exists(candidate):
+                return candidate
+        return None
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest) is not None
+
+    def refs(self, digest: str) -> List[str]:
+        """Ids of the documents using digest"""
+        try:
+            with open(self._base(digest) + REFS_SUFFIX, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def _write_refs(self, digest: str, refs: List[str]):
+        path = self._base(digest) + REFS_SUFFIX
+        if not refs:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        partial = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(refs, f)
+        os.replace(partial, path)
+
+    def put(self, source: Union[bytes, str], ref: str) -> str:
+        """Store source (bytes, or a file path, which is consumed) for ref; returns its SHA-256"""
+        if isinstance(source, bytes):
+            digest = hashlib.sha256(source).hexdigest()
+        else:
+            digest = _hash_file(source)
+
+        base = self._base(digest)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        partial = None
+        if not self.exists(digest):
+            partial = f"{base}.{os.getpid()}.{threading.get_ident()}.tmp"
+            self._write(source, partial)
+
+        with index_write_lock(self.root, exclusive=True):
+            if not self.exists(digest):
+                if partial is None:
+                    # Its last reference was released since the check above
+                    partial = f"{base}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    self._write(source, partial)
+                os.replace(partial, base + GZIP_SUFFIX if self.compression == "gzip" else base)
+            elif partial is not None:
+                # Stored by someone else meanwhile
+                os.remove(partial)
+            refs = self.refs(digest)
+            if ref not in refs:
+                refs.append(ref)
+                self._write_refs(digest, refs)
+
+        if not isinstance(source, bytes) and os.path.exists(source):
+            os.remove(source)
+        logger.debug("💾 Stored blob %s for %s (%s references)", digest[:12], ref, len(refs))
+        return digest
+
+    def _write(self, source: Union[bytes, str], partial: str):
+        if self.compression == "gzip":
+            with gzip.open(partial, "wb", compresslevel=self.compresslevel) as out:
+                if isinstance(source, bytes):
+                    out.write(source)
+                else:
+                    with open(source, "rb") as f:
+                        shutil.copyfileobj(f, out, _READ_SIZE)
+        elif isinstance(source, bytes):
+            with open(partial, "wb") as out:
+                out.write(source)
+        else:
+            # Same filesystem in the usual case, so the upload is renamed rather than copied
+            try:
+                os.replace(source, partial)
+            except OSError:
+                shutil.copyfile(source, partial)
+
+    def release(self, digest: str, ref: str) -> bool:
+        """Drop ref's use of digest; returns True if that deleted the blob"""
+        with index_write_lock(self.root, exclusive=True):
+            refs = [r for r in self.refs(digest) if r != ref]
+            self._write_refs(digest, refs)
+            if refs:
+                logger.debug("🔗 Blob %s still used by %s documents", digest[:12], len(refs))
+                return False
+            path = self.path(digest)
+            if path:
+                os.remove(path)
+        return path is not None
+
+    def open(self, digest: str):
+        """Binary file object with the original bytes of digest"""
+        path = self.path(digest)
+        if path is None:
+            raise FileNotFoundError(f"No blob {digest}")
+        return gzip.open(path, "rb") if path.endswith(GZIP_SUFFIX) else open(path, "rb")
+
+    @contextmanager
+    def local_path(self, digest: str) -> Iterator[str]:
+        """Path of a plain file with the bytes of digest, for readers that need one
+
+        Uncompressed blobs are used in place and must not be modified;
+        compressed ones are decompressed to a temporary file, removed afterwards.
+        """
+        path = self.path(digest)
+        if path is None:
+            raise FileNotFoundError(f"No blob {digest}")
+        if not path.endswith(GZIP_SUFFIX):
+            yield path
+            return
+        handle, temporary = tempfile.mkstemp(prefix="blob-", suffix=".pdf")
+        try:
+            with os.fdopen(handle, "wb") as out, gzip.open(path, "rb") as f:
+                shutil.copyfileobj(f, out, _READ_SIZE)
+            yield temporary
+        finally:
+            os.remove(temporary)
+
+    @contextmanager
+    def document_path(self, document: Dict) -> Iterator[str]:
+        """Local path of a document's PDF, from its blob or, for older documents, its file_path"""
+        digest = document.get("blob_sha256")
+        if digest:
+            with self.local_path(digest) as path:
+                yield path
+            return
+        file_path = document.get("file_path")
+        if not file_path or not os.path.exists(file_path):
+            raise FileNotFoundError(f"No stored file for document {document.get('_id')}")
+        yield file_path
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_READ_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def migrate_documents(store: BlobStore, metadata_store) -> Dict:
+    """Move documents that still have a plain file_path into the blob store"""
+    moved = missing = 0
+    for document in metadata_store.get_all_documents("documents"):
+        file_path = document.get("file_path")
+        if document.get("blob_sha256") or not file_path:
+            continue
+        if not os.path.exists(file_path):
+            logger.warning("⚠️ File not found for %s: %s", document["_id"], file_path)
+            missing += 1
+            continue
+        digest = store.put(file_path, document["_id"])
+        metadata_store.update_document("documents", document["_id"], {
+            "blob_sha256": digest,
+            "file_path": store.path(digest)
+        })
+        moved += 1
+    logger.info("✅ Moved %s documents into %s (%s files missing)", moved, store.root, missing)
+    return {"moved": moved, "missing": missing}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the content-addressed upload store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("migrate", help="Move documents stored as plain files into the blob store")
+    parser.add_argument("--persist-directory", default="./chroma_db")
+    args = parser.parse_args()
+
+    from .logging_config import configure_logging
+    configure_logging()
+
+    from .database import mongo_db
+    if getattr(mongo_db, "use_fallback", False) and not mongo_db.memory_storage.persist_path:
+        raise SystemExit("No persistent metadata store: set METADATA_BACKEND=sqlite, MONGODB_URI or MEMORY_STORE_PATH")
+
+    # Shared, like ingestion, so a snapshot does not catch a document half moved
+    with index_write_lock(args.persist_directory):
+        migrate_documents(BlobStore(), mongo_db)
+
+
+if __name__ == "__main__":
+    main()
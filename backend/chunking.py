@@ -0,0 +1,82 @@
+from typing import List, Optional, Tuple
+
+# Characters that end a sentence or clause; chunks prefer to stop right after one
+SENTENCE_END = ".!?;:"
+
+
+class TokenTextSplitter:
+    """Splits text into chunks that fit the embedding model's sequence limit
+
+    The text is tokenized once with the model's own tokenizer. Each chunk
+    holds at most max_tokens word-pieces including special tokens, so
+    nothing is truncated at encode time, and consecutive chunks share
+    overlap_tokens. Cuts fall between words, preferring a sentence end and
+    then a line break in the last quarter of the window.
+
+    split_with_tokens also returns each chunk's model input ids, so the
+    embedding step can skip tokenizing the same text again.
+    """
+
+    def __init__(self, tokenizer, max_tokens: int, overlap_tokens: int = 32):
+        self.tokenizer = tokenizer
+        # Special tokens the model expects around every input, e.g. [CLS] ... [SEP]
+        bare = tokenizer("a", add_special_tokens=False)["input_ids"]
+        full = tokenizer("a")["input_ids"]
+        position = next(i for i in range(len(full)) if full[i:i + len(bare)] == bare)
+        self.prefix = full[:position]
+        self.suffix = full[position + len(bare):]
+        self.budget = max_tokens - len(self.prefix) - len(self.suffix)
+        if not 0 <= overlap_tokens < self.budget // 2:
+            raise ValueError(f"overlap_tokens must be between 0 and {self.budget // 2 - 1}, got {overlap_tokens}")
+        self.overlap_tokens = overlap_tokens
+
+    def split_text(self, text: str) -> List[str]:
+        return [chunk for chunk, _ in self.split_with_tokens(text)]
+
+    def split_with_tokens(self, text: str) -> List[Tuple[str, List[int]]]:
+        """(chunk text, input ids with special tokens) for each chunk"""
+        encoding = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+        ids = encoding["input_ids"]
+        offsets = encoding["offset_mapping"]
+        word_ids = encoding.word_ids()
+
+        chunks = []
+        start = 0
+        while start < len(ids):
+            end = min(start + self.budget, len(ids))
+            if end < len(ids):
+                end = self._cut(text, offsets, word_ids, start, end)
+            chunks.append((
+                text[offsets[start][0]:offsets[end - 1][1]],
+                self.prefix + ids[start:end] + self.suffix
+            ))
+            if end == len(ids):
+                break
+            next_start = self._word_start(word_ids, end - self.overlap_tokens)
+            start = next_start if next_start > start else end
+        return chunks
+
+    @staticmethod
+    def _continues_word(word_ids: List[Optional[int]], i: int) -> bool:
+        return word_ids[i] is not None and word_ids[i] == word_ids[i - 1]
+
+    def _word_start(self, word_ids: List[Optional[int]], i: int) -> int:
+        while i > 0 and self._continues_word(word_ids, i):
+            i -= 1
+        return i
+
+    def _cut(self, text: str, offsets, word_ids: List[Optional[int]], start: int, end: int) -> int:
+        """Token index to end the chunk before, at most end"""
+        floor = start + max(1, (end - start) * 3 // 4)
+        line_cut = word_cut = None
+        for i in range(end, floor - 1, -1):
+            if self._continues_word(word_ids, i):
+                continue
+            previous_end = offsets[i - 1][1]
+            if previous_end and text[previous_end - 1] in SENTENCE_END:
+                return i
+            if line_cut is None and "\n" in text[previous_end:offsets[i][0]]:
+                line_cut = i
+            if word_cut is None:
+                word_cut = i
+        return line_cut or word_cut or end
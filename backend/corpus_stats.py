@@ -0,0 +1,155 @@
+import logging
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+class CorpusStats:
+    """Corpus-wide counters, updated incrementally on upload and delete
+
+    Built from the metadata store, so /stats is a constant-time snapshot
+    no matter how big the corpus is. With a source, the counters are
+    rebuilt from it at most every refresh_seconds: with several worker
+    processes each one sees the others' uploads and deletes that way, and
+    all of them report the same numbers.
+    """
+
+    RECENT_UPLOADS = 20
+
+    def __init__(self, rate_window_seconds: int = 3600, source: Optional[Callable[[], Iterable[Dict]]] = None,
+                 refresh_seconds: float = 10.0):
+        self.rate_window_seconds = rate_window_seconds
+        self.source = source
+        self.refresh_seconds = refresh_seconds
+        self.lock = threading.Lock()
+        self._built_at = None
+        self._reset()
+
+    def _reset(self):
+        self.total_documents = 0
+        self.indexed_documents = 0
+        self.total_chunks = 0
+        self.bytes_stored = 0
+        self.documents_by_category = Counter()
+        self.chunks_by_cause = Counter()
+        self.recent_uploads = []
+        self._ingest_events = deque()  # (timestamp, chunks)
+
+    @staticmethod
+    def _chunks(document: Dict) -> int:
+        if "chunks_count" in document:
+            return document["chunks_count"]
+        return len(document.get("vector_ids") or [])
+
+    def _add(self, document: Dict):
+        chunks = self._chunks(document)
+        self.total_documents += 1
+        self.indexed_documents += 1 if chunks else 0
+        self.total_chunks += chunks
+        self.bytes_stored += document.get("file_size", 0) or 0
+        self.documents_by_category[document.get("category", "other")] += 1
+        self.chunks_by_cause.update(document.get("cause_counts") or {})
+
+        self.recent_uploads.append({
+            "id": str(document.get("_id", document.get("document_id", ""))),
+            "title": document.get("title", "Untitled"),
+            "uploaded_at": _isoformat(document.get("uploaded_at")),
+        })
+        self.recent_uploads.sort(key=lambda d: d["uploaded_at"], reverse=True)
+        del self.recent_uploads[self.RECENT_UPLOADS:]
+
+    def rebuild(self, documents: Iterable[Dict]):
+        """Recompute every counter, the ingest rate included, from the stored documents"""
+        cutoff = time.time() - self.rate_window_seconds
+        with self.lock:
+            self._reset()
+            events = []
+            for document in documents:
+                self._add(document)
+                uploaded = _timestamp(document.get("uploaded_at"))
+                if uploaded is not None and uploaded >= cutoff:
+                    events.append((uploaded, self._chunks(document)))
+            self._ingest_events.extend(sorted(events))
+            self._built_at = time.monotonic()
+
+    def refresh(self):
+        """Rebuild from source if the counters are older than refresh_seconds"""
+        if self.source is None:
+            return
+        if self._built_at is not None and time.monotonic() - self._built_at < self.refresh_seconds:
+            return
+        try:
+            self.rebuild(self.source())
+        except Exception as e:
+            logger.warning("⚠️ Could not rebuild corpus stats: %s", e)
+
+    def record_upload(self, document: Dict):
+        with self.lock:
+            self._add(document)
+            self._ingest_events.append((time.time(), self._chunks(document)))
+
+    def record_delete(self, document: Dict):
+        with self.lock:
+            chunks = self._chunks(document)
+            self.total_documents -= 1
+            self.indexed_documents -= 1 if chunks else 0
+            self.total_chunks -= chunks
+            self.bytes_stored -= document.get("file_size", 0) or 0
+
+            category = document.get("category", "other")
+            self.documents_by_category[category] -= 1
+            if self.documents_by_category[category] <= 0:
+                del self.documents_by_category[category]
+
+            self.chunks_by_cause.subtract(document.get("cause_counts") or {})
+            self.chunks_by_cause = +self.chunks_by_cause  # drop zero counts
+
+            doc_id = str(document.get("_id", document.get("document_id", "")))
+            self.recent_uploads = [d for d in self.recent_uploads if d["id"] != doc_id]
+
+    def _ingest_rate(self) -> Dict:
+        cutoff = time.time() - self.rate_window_seconds
+        while self._ingest_events and self._ingest_events[0][0] < cutoff:
+            self._ingest_events.popleft()
+
+        minutes = self.rate_window_seconds / 60
+        return {
+            "window_seconds": self.rate_window_seconds,
+            "documents_per_minute": round(len(self._ingest_events) / minutes, 3),
+            "chunks_per_minute": round(sum(c for _, c in self._ingest_events) / minutes, 3),
+        }
+
+    def snapshot(self) -> Dict:
+        self.refresh()
+        with self.lock:
+            return {
+                "total_documents": self.total_documents,
+                "indexed_documents": self.indexed_documents,
+                "total_chunks": self.total_chunks,
+                "bytes_stored": self.bytes_stored,
+                "documents_by_category": dict(self.documents_by_category),
+                "chunks_by_cause": dict(self.chunks_by_cause),
+                "ingest_rate": self._ingest_rate(),
+                "recent_uploads": list(self.recent_uploads),
+            }
+
+def _timestamp(value) -> Optional[float]:
+    """Epoch seconds of a stored uploaded_at (a naive UTC datetime or its ISO string)"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def _isoformat(value) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value or "")
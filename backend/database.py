@@ -1,10 +1,15 @@
 from pymongo import MongoClient
 from datetime import datetime
+import logging
 import os
 from dotenv import load_dotenv
 
+from .memory_store import MemoryStore
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class MongoDB:
     def __init__(self):
         self.client = None
@@ -17,7 +22,7 @@ class MongoDB:
             mongodb_uri = os.getenv("MONGODB_URI")
             
             if not mongodb_uri:
-                print("⚠️ No MONGODB_URI found, using local MongoDB")
+                logger.warning("⚠️ No MONGODB_URI found, using local MongoDB")
                 mongodb_uri = "mongodb://localhost:27017/"
             
             # Connect with timeout
@@ -40,52 +45,63 @@ class MongoDB:
             else:
                 self.db = self.client["compliance_checker"]
             
-            print("✅ Connected to MongoDB successfully")
+            logger.info("✅ Connected to MongoDB successfully")
             
         except Exception as e:
-            print(f"❌ MongoDB Connection Failed: {e}")
-            print("⚠️ Switching to in-memory storage...")
+            logger.error("❌ MongoDB Connection Failed: %s", e)
+            logger.warning("⚠️ Switching to in-memory storage...")
             self.use_fallback = True
-            self.memory_storage = []
+            # Set MEMORY_STORE_PATH to keep fallback data across restarts
+            self.memory_storage = MemoryStore(os.getenv("MEMORY_STORE_PATH"))
             return
         
         self.use_fallback = False
     
+    def after_fork(self):
+        """Reconnect in a forked worker; MongoClient instances are not fork-safe"""
+        if self.use_fallback:
+            logger.warning("⚠️ In-memory metadata is not shared between worker processes")
+            return
+        self.connect()
+    
     def get_collection(self, collection_name):
         if self.use_fallback:
-            return None
+            return self.memory_storage[collection_name]
         return self.db[collection_name]
     
-    def insert_document(self, collection_name, document):
+    def _id_filter(self, document_id):
+        """Build an _id filter that matches both ObjectId and string ids"""
         if self.use_fallback:
-            doc_id = str(datetime.now().timestamp())
-            document["_id"] = doc_id
-            self.memory_storage.append(document)
-            return doc_id
+            return {"_id": str(document_id)}
         
+        from bson.objectid import ObjectId
+        try:
+            return {"_id": {"$in": [ObjectId(document_id), document_id]}}
+        except:
+            return {"_id": document_id}
+    
+    def insert_document(self, collection_name, document):
         collection = self.get_collection(collection_name)
         result = collection.insert_one(document)
         return str(result.inserted_id)
     
     def get_document(self, collection_name, document_id):
-        if self.use_fallback:
-            for doc in self.memory_storage:
-                if str(doc.get("_id")) == str(document_id):
-                    return doc
-            return None
-        
         collection = self.get_collection(collection_name)
-        from bson.objectid import ObjectId
-        try:
-            doc = collection.find_one({"_id": ObjectId(document_id)})
-        except:
-            doc = collection.find_one({"_id": document_id})
-        return doc
+        return collection.find_one(self._id_filter(document_id))
+    
+    def update_document(self, collection_name, document_id, fields):
+        """Set fields on a document; returns True if it was found"""
+        collection = self.get_collection(collection_name)
+        result = collection.update_one(self._id_filter(document_id), {"$set": fields})
+        return result.matched_count > 0
+    
+    def delete_document(self, collection_name, document_id):
+        """Delete a document; returns True if it existed"""
+        collection = self.get_collection(collection_name)
+        result = collection.delete_one(self._id_filter(document_id))
+        return result.deleted_count > 0
     
     def get_all_documents(self, collection_name):
-        if self.use_fallback:
-            return self.memory_storage
-        
         collection = self.get_collection(collection_name)
         documents = list(collection.find({}))
         
@@ -96,5 +112,17 @@ class MongoDB:
         
         return documents
 
+def create_metadata_store():
+    """Pick the metadata backend from METADATA_BACKEND (mongo or sqlite)"""
+    backend = os.getenv("METADATA_BACKEND", "mongo").lower()
+    
+    if backend == "sqlite":
+        from .sqlite_store import SQLiteStore
+        return SQLiteStore(os.getenv("SQLITE_PATH", "./metadata.db"))
+    
+    if backend != "mongo":
+        logger.warning("⚠️ Unknown METADATA_BACKEND '%s', using MongoDB", backend)
+    return MongoDB()
+
 # Singleton instance
-mongo_db = MongoDB()
\ No newline at end of file
+mongo_db = create_metadata_store()
\ No newline at end of file
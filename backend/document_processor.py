@@ -1,35 +1,79 @@
 import os
+import logging
 from PyPDF2 import PdfReader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 import hashlib
 
+from .chunking import TokenTextSplitter
+from .logging_config import timed
+from .ocr import PageOCR
+
+logger = logging.getLogger(__name__)
+
 class PDFProcessor:
-    def __init__(self):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,
-        )
-        print("✅ PDF Processor initialized")
+    def __init__(self, embedder=None):
+        """embedder, if given, sizes chunks in its tokenizer's tokens instead of characters
+        
+        Chunks then hold up to CHUNK_TOKENS (default: the model's limit) with
+        CHUNK_OVERLAP_TOKENS of overlap, and carry their input_ids so they are
+        not tokenized twice. CHUNKING=chars keeps the 1000-character splitter.
+        """
+        if embedder is not None and os.getenv("CHUNKING", "tokens").lower() == "tokens":
+            max_tokens = min(int(os.getenv("CHUNK_TOKENS", "0")) or embedder.max_length, embedder.max_length)
+            self.text_splitter = TokenTextSplitter(
+                embedder.tokenizer,
+                max_tokens=max_tokens,
+                overlap_tokens=int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+            )
+            logger.info("✅ PDF Processor initialized (%s-token chunks)", max_tokens)
+        else:
+            self.text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=1000,
+                chunk_overlap=200,
+                length_function=len,
+            )
+            logger.info("✅ PDF Processor initialized")
+        
+        # Pages with less text than this are treated as scans and OCR'd
+        self.ocr_min_chars = int(os.getenv("OCR_MIN_CHARS", "20"))
+        self.ocr = PageOCR()
     
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract all text from a PDF file"""
+    def extract_text_from_pdf(self, pdf_path: str, progress: Optional[Callable] = None) -> str:
+        """Extract all text from a PDF file, OCR-ing only the pages that have no text layer"""
         try:
-            print(f"📖 Reading PDF: {pdf_path}")
+            logger.debug("📖 Reading PDF: %s", pdf_path)
             reader = PdfReader(pdf_path)
-            text = ""
+            page_texts = []
+            scanned = []
+            pages_total = len(reader.pages)
             
             for i, page in enumerate(reader.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+                page_text = page.extract_text() or ""
+                page_texts.append(page_text)
+                if len(page_text.strip()) < self.ocr_min_chars:
+                    scanned.append((i, page))
+                if progress:
+                    progress(stage="parsing", pages_parsed=i + 1, pages_total=pages_total)
+            
+            if scanned and self.ocr.available():
+                def report(done):
+                    if progress:
+                        progress(stage="ocr", pages_parsed=done, pages_total=len(scanned))
+                
+                report(0)
+                with timed("ocr"):
+                    for i, page_text in self.ocr.recognize(pdf_path, scanned, report).items():
+                        # Keep whichever is longer, in case the page had a little real text
+                        if len(page_text.strip()) > len(page_texts[i].strip()):
+                            page_texts[i] = page_text
             
-            print(f"📄 Extracted {len(text)} characters from PDF")
+            text = "".join(page_text + "\n" for page_text in page_texts if page_text)
+            logger.debug("📄 Extracted %s characters from PDF", len(text))
             return text.strip()
             
         except Exception as e:
-            print(f"❌ Error reading PDF {pdf_path}: {e}")
+            logger.error("❌ Error reading PDF %s: %s", pdf_path, e)
             return ""
     
     def split_document(self, text: str) -> List[Dict]:
@@ -37,24 +81,30 @@ class PDFProcessor:
         if not text:
             return []
         
-        chunks = self.text_splitter.split_text(text)
-        print(f"✂️ Split text into {len(chunks)} chunks")
+        if isinstance(self.text_splitter, TokenTextSplitter):
+            pieces = self.text_splitter.split_with_tokens(text)
+        else:
+            pieces = [(chunk, None) for chunk in self.text_splitter.split_text(text)]
+        logger.debug("✂️ Split text into %s chunks", len(pieces))
         
         processed_chunks = []
-        for i, chunk in enumerate(chunks):
+        for i, (chunk, input_ids) in enumerate(pieces):
             # Generate unique ID for each chunk
             chunk_id = hashlib.md5(chunk.encode()).hexdigest()[:10]
             
             # Identify potential cause
             cause = self.identify_cause(chunk)
             
-            processed_chunks.append({
+            processed_chunk = {
                 "chunk_id": chunk_id,
                 "text": chunk,
                 "chunk_index": i,
                 "cause": cause,
                 "char_length": len(chunk)
-            })
+            }
+            if input_ids is not None:
+                processed_chunk["input_ids"] = input_ids
+            processed_chunks.append(processed_chunk)
         
         return processed_chunks
     
@@ -79,19 +129,27 @@ class PDFProcessor:
         else:
             return "General Compliance"
     
-    def process_pdf(self, pdf_path: str, metadata: Dict = None) -> List[Dict]:
-        """Full processing pipeline for a PDF"""
+    def process_pdf(self, pdf_path: str, metadata: Dict = None, progress: Optional[Callable] = None) -> List[Dict]:
+        """Full processing pipeline for a PDF
+        
+        progress, if given, is called with keyword fields (stage, pages_parsed,
+        pages_total, chunks_total) as work advances.
+        """
         if metadata is None:
             metadata = {}
         
         # Extract text
-        text = self.extract_text_from_pdf(pdf_path)
+        with timed("parse"):
+            text = self.extract_text_from_pdf(pdf_path, progress)
         if not text:
-            print("❌ No text extracted from PDF")
+            logger.error("❌ No text extracted from PDF")
             return []
         
         # Split into chunks
-        chunks = self.split_document(text)
+        with timed("split"):
+            chunks = self.split_document(text)
+        if progress:
+            progress(stage="splitting", chunks_total=len(chunks))
         
         # Add metadata to each chunk
         for chunk in chunks:
@@ -0,0 +1,258 @@
+"""Embedding backends for VectorStore
+
+EMBEDDING_BACKEND picks the implementation:
+
+- "torch" (default): SentenceTransformer on PyTorch
+- "onnx": the same model exported to ONNX, run with ONNX Runtime
+- "onnx-int8": the dynamically int8-quantized export
+
+The ONNX backends load from EMBEDDING_MODEL_PATH, a directory written by:
+
+    python -m backend.embeddings export --output ./models/minilm-onnx
+"""
+import argparse
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+FP32_FILE = "model.onnx"
+INT8_FILE = "model_int8.onnx"
+CONFIG_FILE = "embedding_config.json"
+
+
+class EmbeddingBackend(ABC):
+    """Turns texts into normalized float32 embeddings, one row per text"""
+
+    name = ""
+
+    @abstractmethod
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def encode_ids(self, input_ids: List[List[int]], batch_size: int = 64) -> np.ndarray:
+        """Like encode, for texts already tokenized with this backend's tokenizer"""
+
+    @property
+    @abstractmethod
+    def tokenizer(self):
+        ...
+
+    @property
+    @abstractmethod
+    def max_length(self) -> int:
+        ...
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    name = "torch"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+
+    def encode_ids(self, input_ids: List[List[int]], batch_size: int = 64) -> np.ndarray:
+        import torch
+
+        output = None
+        order = np.argsort([-len(ids) for ids in input_ids], kind="stable")
+        for start in range(0, len(input_ids), batch_size):
+            rows = order[start:start + batch_size]
+            features = self.model.tokenizer.pad({"input_ids": [input_ids[i] for i in rows]}, return_tensors="pt")
+            features = {name: tensor.to(self.model.device) for name, tensor in features.items()}
+            with torch.no_grad():
+                embeddings = self.model(features)["sentence_embedding"]
+            embeddings = torch.nn.functional.normalize(embeddings, dim=1).cpu().numpy()
+            if output is None:
+                output = np.empty((len(input_ids), embeddings.shape[1]), dtype=np.float32)
+            output[rows] = embeddings
+        return output
+
+    @property
+    def tokenizer(self):
+        return self.model.tokenizer
+
+    @property
+    def max_length(self) -> int:
+        return self.model.max_seq_length
+
+
+class OnnxBackend(EmbeddingBackend):
+    """Mean-pooled transformer embeddings computed with ONNX Runtime on CPU"""
+
+    name = "onnx"
+
+    def __init__(self, model_path: str, quantized: bool = False, threads: Optional[int] = None):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError("EMBEDDING_BACKEND=onnx needs onnxruntime: pip install onnxruntime")
+        from transformers import AutoTokenizer
+
+        model_file = os.path.join(model_path, INT8_FILE if quantized else FP32_FILE)
+        if not os.path.exists(model_file):
+            raise FileNotFoundError(f"No {os.path.basename(model_file)} in {model_path}; run python -m backend.embeddings export")
+
+        with open(os.path.join(model_path, CONFIG_FILE)) as f:
+            self.config = json.load(f)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(model_file, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self._tokenizer = AutoTokenizer.from_pretrained(model_path)
+        self.name = "onnx-int8" if quantized else "onnx"
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        output = np.empty((len(texts), self.config["dimension"]), dtype=np.float32)
+        # Sorting by length keeps padding, and so wasted compute, to a minimum
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            tokens = self._tokenizer(
+                [texts[i] for i in rows],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np"
+            )
+            output[rows] = self.encode_tokens(tokens["input_ids"], tokens["attention_mask"], tokens.get("token_type_ids"))
+        return output
+
+    def encode_ids(self, input_ids: List[List[int]], batch_size: int = 64) -> np.ndarray:
+        output = np.empty((len(input_ids), self.config["dimension"]), dtype=np.float32)
+        order = np.argsort([-len(ids) for ids in input_ids], kind="stable")
+        for start in range(0, len(input_ids), batch_size):
+            rows = order[start:start + batch_size]
+            tokens = self._tokenizer.pad({"input_ids": [input_ids[i] for i in rows]}, return_tensors="np")
+            output[rows] = self.encode_tokens(tokens["input_ids"], tokens["attention_mask"])
+        return output
+
+    def encode_tokens(self, input_ids: np.ndarray, attention_mask: np.ndarray, token_type_ids: Optional[np.ndarray] = None) -> np.ndarray:
+        feed = {"input_ids": input_ids.astype(np.int64), "attention_mask": attention_mask.astype(np.int64)}
+        if "token_type_ids" in self.input_names:
+            feed["token_type_ids"] = (np.zeros_like(input_ids) if token_type_ids is None else token_type_ids).astype(np.int64)
+        hidden = self.session.run(None, feed)[0]
+
+        # Mean pooling over real tokens, then L2 normalization, as the SentenceTransformer pipeline does
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+    @property
+    def tokenizer(self):
+        return self._tokenizer
+
+    @property
+    def max_length(self) -> int:
+        return self.config["max_length"]
+
+
+def create_backend() -> EmbeddingBackend:
+    """The embedding backend selected by EMBEDDING_BACKEND"""
+    backend = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+    if backend in ("onnx", "onnx-int8"):
+        model_path = os.getenv("EMBEDDING_MODEL_PATH")
+        if not model_path:
+            raise ValueError(f"EMBEDDING_BACKEND={backend} needs EMBEDDING_MODEL_PATH")
+        return OnnxBackend(
+            model_path,
+            quantized=backend == "onnx-int8",
+            threads=int(os.getenv("EMBEDDING_THREADS", "0")) or None
+        )
+    if backend != "torch":
+        logger.warning("⚠️ Unknown EMBEDDING_BACKEND '%s', using torch", backend)
+    return SentenceTransformerBackend(os.getenv("EMBEDDING_MODEL_PATH") or DEFAULT_MODEL)
+
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = True) -> str:
+    """Export a mean-pooling SentenceTransformer to ONNX, plus an int8 copy if quantize"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device="cpu")
+    modules = [type(module).__name__ for module in model]
+    if any(name not in ("Transformer", "Pooling", "Normalize") for name in modules):
+        raise ValueError(f"Only transformer + pooling models can be exported, {model_name} has {modules}")
+    pooling = model[1].get_config_dict()
+    if pooling.get("pooling_mode", "mean") != "mean" and not pooling.get("pooling_mode_mean_tokens"):
+        raise ValueError(f"Only mean pooling is supported, {model_name} uses {pooling}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+    sample = tokenizer(["An example clause"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "tokens"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "tokens"}
+
+    class _HiddenStates(torch.nn.Module):
+        # Fixed positional signature and a single tensor output, whatever the model's forward looks like
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    fp32_path = os.path.join(output_dir, FP32_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            _HiddenStates(transformer),
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+            dynamo=False,
+        )
+    tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, CONFIG_FILE), "w") as f:
+        json.dump({
+            "source_model": model_name,
+            "dimension": transformer.config.hidden_size,
+            "max_length": model.max_seq_length,
+            "pooling": "mean",
+        }, f, indent=2)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(fp32_path, os.path.join(output_dir, INT8_FILE), weight_type=QuantType.QInt8)
+
+    return output_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backend tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Export the embedding model to ONNX (fp32 and int8)")
+    export.add_argument("--model", default=DEFAULT_MODEL)
+    export.add_argument("--output", required=True)
+    export.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        print(export_onnx(args.model, args.output, quantize=not args.no_quantize))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class ExactIndex:
+    """Brute-force cosine search over a memory-mapped float32 matrix
+
+    Vectors are appended to a raw float32 file and searched with blocked
+    matrix multiplies plus argpartition, so scores are exact and thresholds
+    mean exactly what they say. Texts and metadata live in a parallel
+    JSONL file, one line per vector row. For corpora up to a few hundred
+    thousand chunks this beats HNSW on both latency and recall.
+
+    Exposes the subset of the Chroma collection API VectorStore uses, with
+    cosine distances (1 - cosine similarity).
+    """
+
+    SUBDIRECTORY = "exact"
+    BLOCK_ROWS = 65536
+
+    def __init__(self, persist_directory: str, dim: int = 384):
+        self.directory = os.path.join(persist_directory, self.SUBDIRECTORY)
+        self.dim = dim
+        self.lock = threading.RLock()
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._vectors_path = os.path.join(self.directory, "vectors.f32")
+        self._records_path = os.path.join(self.directory, "records.jsonl")
+
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict] = []
+        self._vectors = None
+        # where filter -> boolean row mask, extended as rows are added
+        self._masks: Dict[Tuple, np.ndarray] = {}
+        self._load()
+
+    # ---------- persistence ----------
+
+    def _row_files(self) -> List[Tuple[str, int]]:
+        """Append-only files holding one fixed-size row per vector: (path, row bytes)"""
+        return [(self._vectors_path, 4 * self.dim)]
+
+    def _load(self):
+        record_lines = 0
+        if os.path.exists(self._records_path):
+            with open(self._records_path, "r", encoding="utf-8") as records:
+                for line in records:
+                    record_lines += 1
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    self.ids.append(record["id"])
+                    self.documents.append(record["document"])
+                    self.metadatas.append(record["metadata"])
+
+        # A crash between the appends can leave files of different lengths;
+        # keep only the rows every file has
+        count = len(self.ids)
+        for path, row_bytes in self._row_files():
+            rows = os.path.getsize(path) // row_bytes if os.path.exists(path) else 0
+            count = min(count, rows)
+        self._truncate(count, record_lines)
+        self._load_rows(count)
+
+    def _load_rows(self, count: int):
+        """Hook for subclasses that keep row data in RAM"""
+
+    def _truncate(self, count: int, record_lines: int):
+        del self.ids[count:], self.documents[count:], self.metadatas[count:]
+        for path, row_bytes in self._row_files():
+            if os.path.exists(path) and os.path.getsize(path) > count * row_bytes:
+                with open(path, "r+b") as f:
+                    f.truncate(count * row_bytes)
+        if record_lines > count:
+            with open(self._records_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()[:count]
+            with open(self._records_path, "w", encoding="utf-8") as f:
+                f.writelines(lines)
+
+    def _append_rows(self, vectors: np.ndarray):
+        """Write the row files for newly added unit vectors"""
+        with open(self._vectors_path, "ab") as f:
+            vectors.tofile(f)
+
+    def _exact_vectors(self) -> np.ndarray:
+        """Memory-map the exact vectors, re-mapping after the file grew"""
+        count = len(self.ids)
+        if self._vectors is None or len(self._vectors) != count:
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+        return self._vectors
+
+    # ---------- search ----------
+
+    def _where_mask(self, where: Dict) -> np.ndarray:
+        """Rows whose metadata equals every value in where"""
+        if any(isinstance(value, dict) for value in where.values()):
+            raise ValueError(f"Only equality filters such as {{'category': 'policy'}} are supported, got {where}")
+        key = tuple(sorted(where.items()))
+        mask = self._masks.get(key, np.empty(0, dtype=bool))
+        if len(mask) < len(self.metadatas):
+            new_rows = self.metadatas[len(mask):]
+            matches = np.fromiter(
+                (all(metadata.get(k) == v for k, v in key) for metadata in new_rows),
+                dtype=bool,
+                count=len(new_rows)
+            )
+            mask = self._masks[key] = np.concatenate([mask, matches])
+        return mask
+
+    def _search(self, queries: np.ndarray, n: int, allowed: Optional[np.ndarray] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Exact top-n rows and similarities for each (unit) query, among allowed rows if given"""
+        vectors = self._exact_vectors()
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+
+        for start in range(0, len(vectors), self.BLOCK_ROWS):
+            scores = queries @ vectors[start:start + self.BLOCK_ROWS].T
+            if allowed is not None:
+                scores[:, ~allowed[start:start + self.BLOCK_ROWS]] = -np.inf
+            k = min(n, scores.shape[1])
+            rows = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, rows, axis=1)], axis=1)
+            best_rows = np.concatenate([best_rows, rows + start], axis=1)
+
+            if best_scores.shape[1] > n:
+                keep = np.argpartition(-best_scores, n - 1, axis=1)[:, :n]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        return [
+            (rows[o], scores[o])
+            for rows, scores, o in zip(best_rows, best_scores, order)
+        ]
+
+    # ---------- Chroma-compatible API ----------
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def add(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected embeddings of shape (n, {self.dim}), got {vectors.shape}")
+
+        # VectorStore already hands over unit vectors; only copy if they are not
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        if not np.allclose(norms, 1.0, atol=1e-3):
+            norms[norms == 0] = 1.0
+            vectors = vectors / norms
+
+        with self.lock:
+            self._append_rows(vectors)
+            with open(self._records_path, "a", encoding="utf-8") as f:
+                for doc_id, document, metadata in zip(ids, documents, metadatas):
+                    f.write(json.dumps({"id": doc_id, "document": document, "metadata": metadata}) + "\n")
+
+            self.ids.extend(ids)
+            self.documents.extend(documents)
+            self.metadatas.extend(metadatas)
+
+    def query(self, query_embeddings, n_results: int = 5, include=None, where: Optional[Dict] = None):
+        queries = np.ascontiguousarray(query_embeddings, dtype=np.float32).reshape(-1, self.dim)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        queries = queries / norms
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+
+        with self.lock:
+            allowed = self._where_mask(where) if where else None
+            n = min(n_results, len(self.ids) if allowed is None else int(allowed.sum()))
+            if n == 0:
+                matches = [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))] * len(queries)
+            else:
+                matches = self._search(queries, n, allowed)
+
+            for rows, similarities in matches:
+                results["ids"].append([self.ids[i] for i in rows])
+                results["documents"].append([self.documents[i] for i in rows])
+                results["metadatas"].append([self.metadatas[i] for i in rows])
+                results["distances"].append([float(1 - s) for s in similarities])
+
+        return results
+
+    def get(self, where: Optional[Dict] = None, include=None):
+        """Stored rows, all or those matching where; include picks embeddings, documents, metadatas"""
+        include = include or ["documents", "metadatas"]
+        with self.lock:
+            rows = np.flatnonzero(self._where_mask(where)) if where else np.arange(len(self.ids))
+            results = {"ids": [self.ids[i] for i in rows]}
+            if "embeddings" in include:
+                results["embeddings"] = np.asarray(self._exact_vectors()[rows])
+            if "documents" in include:
+                results["documents"] = [self.documents[i] for i in rows]
+            if "metadatas" in include:
+                results["metadatas"] = [self.metadatas[i] for i in rows]
+        return results
+
+    def memory_usage(self) -> Dict:
+        """Vector bytes held on the heap versus the full (memory-mapped) float32 matrix"""
+        count = len(self.ids)
+        return {
+            "vectors": count,
+            "resident_bytes": 0,
+            "float32_bytes": int(count * self.dim * 4),
+        }
@@ -0,0 +1,51 @@
+"""Cross-process locks on files
+
+flock on Linux and macOS. Windows has no shared locks in msvcrt, so there
+every lock is exclusive: writers that could have run together take turns,
+which costs concurrency but not correctness.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+LOCK_FILE = ".write.lock"
+
+
+@contextmanager
+def locked_file(file, exclusive: bool = True):
+    """Hold a lock on an open file for the duration of the block"""
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+
+    if fcntl is not None:
+        fcntl.flock(file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+        return
+
+    import msvcrt
+    # Locks the first byte; LK_LOCK would give up after ten seconds
+    file.seek(0)
+    while True:
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+            break
+        except OSError:
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def index_write_lock(directory: str, exclusive: bool = False):
+    """Cross-process lock on directory: shared for writers, exclusive for snapshots"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_FILE), "a") as lock_file, locked_file(lock_file, exclusive):
+        yield
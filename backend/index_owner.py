@@ -0,0 +1,216 @@
+"""Single owner process for the vector collection in multi-worker deployments
+
+With several server workers, each opening ./chroma_db (or the numpy
+indexes) on its own means N copies of the index in memory and writers that
+race on the same files. Instead one owner process opens the collection and
+every worker talks to it through a multiprocessing manager:
+
+    python -m backend.index_owner --address /tmp/index_owner.sock
+
+Workers find it through INDEX_OWNER_ADDRESS (a socket path or host:port)
+and INDEX_OWNER_AUTHKEY. gunicorn.conf.py starts the owner for you.
+Queries run concurrently; adds take the collection exclusively.
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.managers import BaseManager
+from typing import Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Address = Union[str, Tuple[str, int]]
+
+
+def parse_address(address: str) -> Address:
+    """A filesystem path is a Unix socket, host:port is TCP"""
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit() and "/" not in address:
+        return host, int(port)
+    return address
+
+
+def authkey_from_env() -> bytes:
+    authkey = os.getenv("INDEX_OWNER_AUTHKEY")
+    if not authkey:
+        raise ValueError("INDEX_OWNER_ADDRESS needs INDEX_OWNER_AUTHKEY")
+    return authkey.encode()
+
+
+class ReadWriteLock:
+    """Many readers or one writer; waiting writers block new readers so adds are not starved"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class OwnedCollection:
+    """The owner's collection, guarded by a ReadWriteLock"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.lock = ReadWriteLock()
+
+    def add(self, **kwargs):
+        with self.lock.write():
+            self.collection.add(**kwargs)
+
+    def query(self, **kwargs):
+        with self.lock.read():
+            return self.collection.query(**kwargs)
+
+    def get(self, **kwargs):
+        with self.lock.read():
+            return self.collection.get(**kwargs)
+
+    def count(self) -> int:
+        with self.lock.read():
+            return self.collection.count()
+
+    def memory_usage(self):
+        with self.lock.read():
+            return self.collection.memory_usage()
+
+
+class IndexOwnerManager(BaseManager):
+    pass
+
+
+_owned: Optional[OwnedCollection] = None
+
+
+def _get_collection() -> OwnedCollection:
+    return _owned
+
+
+IndexOwnerManager.register("collection", callable=_get_collection, exposed=("add", "query", "get", "count", "memory_usage"))
+
+
+def serve(address: Address, authkey: bytes, persist_directory: str = "./chroma_db", index_mode: Optional[str] = None):
+    """Open the collection and serve it until the process is stopped"""
+    global _owned
+    from .vector_store import open_collection
+
+    index_mode = (index_mode or os.getenv("VECTOR_INDEX_MODE", "chroma")).lower()
+    _, collection = open_collection(persist_directory, index_mode)
+    _owned = OwnedCollection(collection)
+
+    if isinstance(address, str) and os.path.exists(address):
+        # Left behind by an owner that did not shut down cleanly
+        os.unlink(address)
+    server = IndexOwnerManager(address=address, authkey=authkey).get_server()
+    logger.info("✅ Index owner serving %s collection on %s", index_mode, address)
+    server.serve_forever()
+
+
+def run_owner(address: Address, authkey: bytes, persist_directory: str = "./chroma_db"):
+    """Entry point for an owner process: configure logging, then serve
+
+    A spawned process starts with nothing configured, so without this its
+    add and query errors would go nowhere.
+    """
+    from .logging_config import configure_logging
+    configure_logging()
+    serve(address, authkey, persist_directory)
+
+
+def wait_for_owner(address: Address, authkey: bytes, timeout: float = 60.0, process=None):
+    """Block until the owner accepts connections; False if it died or timed out"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and not process.is_alive():
+            return False
+        try:
+            IndexOwnerManager(address=address, authkey=authkey).connect()
+            return True
+        except (ConnectionRefusedError, FileNotFoundError):
+            time.sleep(0.1)
+    return False
+
+
+class RemoteCollection:
+    """Collection API forwarded to the index owner
+
+    Connects on first use and again in every forked process, so it can be
+    created in a preloading master before the workers exist.
+    """
+
+    def __init__(self, address: str, authkey: bytes):
+        self.address = parse_address(address)
+        self.authkey = authkey
+        self._pid = None
+        self._proxy = None
+        self._lock = threading.Lock()
+
+    def _collection(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    manager = IndexOwnerManager(address=self.address, authkey=self.authkey)
+                    manager.connect()
+                    self._proxy = manager.collection()
+                    self._pid = os.getpid()
+        return self._proxy
+
+    def add(self, **kwargs):
+        return self._collection().add(**kwargs)
+
+    def query(self, **kwargs):
+        return self._collection().query(**kwargs)
+
+    def get(self, **kwargs):
+        return self._collection().get(**kwargs)
+
+    def count(self) -> int:
+        return self._collection().count()
+
+    def memory_usage(self):
+        return self._collection().memory_usage()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the vector collection to server workers")
+    parser.add_argument("--address", default=os.getenv("INDEX_OWNER_ADDRESS", "./index_owner.sock"))
+    parser.add_argument("--persist-directory", default="./chroma_db")
+    args = parser.parse_args()
+
+    run_owner(parse_address(args.address), authkey_from_env(), args.persist_directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from . import profiling
+from .metrics import STAGE_SECONDS
+
+# Set per request (or per background job) so every record can be traced back to it
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+_timings_var: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("timings", default=None)
+
+# Attributes every LogRecord has; anything else was passed with extra= and is logged as a field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+_CONTEXT_ATTRS = {"request_id", "timings"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def begin_request(request_id: Optional[str] = None) -> str:
+    """Start a new logging scope with its own request ID and stage timings"""
+    request_id = request_id or uuid.uuid4().hex
+    request_id_var.set(request_id)
+    _timings_var.set({})
+    return request_id
+
+
+def current_timings() -> Dict[str, float]:
+    return dict(_timings_var.get() or {})
+
+
+@contextmanager
+def timed(stage: str):
+    """Add the wall time of the block, in ms, to the current scope's stage timings
+
+    Repeated stages (one per batch, say) accumulate. Every run is also
+    observed in the stage latency histogram served on /metrics, even
+    outside a request scope. If the request is being profiled, the thread
+    running the stage is sampled for its duration.
+    """
+    profiler = profiling.active()
+    if profiler is not None:
+        profiler.add_thread(threading.get_ident())
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if profiler is not None:
+            profiler.remove_thread(threading.get_ident())
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = _timings_var.get()
+        if timings is not None:
+            timings[stage] = round(timings.get(stage, 0.0) + elapsed * 1000, 3)
+
+
+class ContextFilter(logging.Filter):
+    """Stamp the request ID and stage timings onto records in the emitting thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.timings = current_timings()
+        return True
+
+
+def _extra_fields(record: logging.LogRecord) -> Dict:
+    return {
+        key: value for key, value in vars(record).items()
+        if key not in _RECORD_ATTRS and key not in _CONTEXT_ATTRS
+    }
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        timings = getattr(record, "timings", None)
+        if timings:
+            entry["timings_ms"] = timings
+        entry.update(_extra_fields(record))
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines, with any extra fields and timings appended"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not hasattr(record, "request_id"):
+            record.request_id = "-"
+        line = super().format(record)
+        fields = _extra_fields(record)
+        timings = getattr(record, "timings", None)
+        if timings:
+            fields["timings_ms"] = timings
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Only merge the message arguments here; formatting happens on the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None, after_fork: bool = False):
+    """Route the root logger through a queue to a background writer thread
+
+    LOG_LEVEL (default INFO) and LOG_FORMAT ("text" or "json") are read from
+    the environment unless given. Calling this again reconfigures in place;
+    a forked child passes after_fork=True, since the writer thread it
+    inherited a handle to only runs in the parent.
+    """
+    global _listener
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.getenv("LOG_FORMAT", "text")).lower()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    if _listener is not None:
+        if after_fork:
+            _listener = None
+        else:
+            _listener.stop()
+
+    log_queue = queue.Queue(-1)
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, _QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+@atexit.register
+def _flush():
+    if _listener is not None:
+        _listener.stop()
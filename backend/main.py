@@ -1,13 +1,32 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+import asyncio
+import json
+import logging
 import os
+import time
 import uuid
 from datetime import datetime
 from typing import List, Optional
 
+# Configured before the stores below are created so their startup messages are kept
+from .logging_config import begin_request, configure_logging, timed
+configure_logging()
+
 from .models import *
 from .database import mongo_db
+from .blob_store import BlobStore
+from .corpus_stats import CorpusStats
+from . import metrics, profiling
+from .scheduler import INGEST, QUERY, Overloaded, PriorityScheduler
 from .similarity_search import ComplianceChecker
+from .file_locks import index_write_lock
+from .upload_sessions import PROCESSING, QUEUED, UploadSessionManager
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Compliance Checker API", version="1.0.0")
 
@@ -18,22 +37,257 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """Give each request an ID and log one summary line with its stage timings"""
+    request_id = begin_request(request.headers.get("X-Request-ID", "")[:128] or None)
+    
+    profiler = None
+    if profiling.is_requested(request.headers, request.query_params):
+        if not profiling.is_authorized(request.headers.get("X-Admin-Token")):
+            return JSONResponse(status_code=403, content={"detail": "Profiling requires a valid X-Admin-Token"})
+        # Only threads running this request's timed() stages are sampled; the
+        # event loop thread is shared with every other request in flight
+        profiler = profiling.start()
+    
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        if profiler is not None:
+            _save_profile(profiler)
+        raise
+    elapsed = time.perf_counter() - start
+    response.headers["X-Request-ID"] = request_id
+    
+    if profiler is not None:
+        response.headers["X-Profile-ID"] = profiler.profile_id
+        response.body_iterator = _finish_profile(profiler, response.body_iterator)
+    logger.info(
+        "%s %s %s",
+        request.method,
+        request.url.path,
+        response.status_code,
+        extra={"duration_ms": round(elapsed * 1000, 3)}
+    )
+    
+    # Label by route template so /document/{document_id} is one series, not one per ID
+    route = request.scope.get("route")
+    route_path = route.path if route is not None else "unmatched"
+    metrics.HTTP_REQUESTS.inc(method=request.method, route=route_path, status=response.status_code)
+    metrics.HTTP_SECONDS.observe(elapsed, method=request.method, route=route_path)
+    return response
+
+async def _finish_profile(profiler, body_iterator):
+    """Pass the body through, then stop and store the profile
+
+    Waiting for the body means streamed responses are profiled to the end.
+    """
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        _save_profile(profiler)
+
+def _save_profile(profiler):
+    profiler.stop()
+    path = profiler.save()
+    logger.info("Saved profile %s (%s samples)", path, profiler.samples)
+
 # Initialize compliance checker
 checker = ComplianceChecker()
 
+# Corpus counters for /stats, kept up to date incrementally and rebuilt from the
+# metadata store every STATS_REFRESH_SECONDS, so every worker process agrees
+corpus_stats = CorpusStats(
+    source=lambda: mongo_db.get_all_documents("documents"),
+    refresh_seconds=float(os.getenv("STATS_REFRESH_SECONDS", "10"))
+)
+corpus_stats.refresh()
+
 # Ensure upload directory exists
 UPLOAD_DIR = "./uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-print("🚀 Compliance Checker API Starting...")
-print(f"📁 Upload directory: {os.path.abspath(UPLOAD_DIR)}")
+# Uploaded PDFs, stored once per distinct content under BLOB_DIR
+blob_store = BlobStore()
+
+# Largest file a chunked upload may declare
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "200")) * 1024 * 1024
+
+# Chunked uploads are ingested in the background by a small worker pool; the
+# sessions live in the metadata store, so any worker can serve any session
+upload_sessions = UploadSessionManager(
+    UPLOAD_DIR,
+    max_workers=int(os.getenv("INGEST_WORKERS", "2")),
+    store=mongo_db
+)
+
+# Queries and ingestion get separate concurrency and queue limits, and
+# queries go first; full queues are answered with 429
+scheduler = PriorityScheduler()
+
+def _scheduled(ticket, function, *args, **kwargs):
+    """Run function once ticket gets a slot; blocks, so call it from a worker thread"""
+    with ticket:
+        return function(*args, **kwargs)
+
+async def _run_scheduled(ticket, function, *args, **kwargs):
+    """Wait for ticket's slot on the event loop, then run function in the threadpool
+
+    Queued requests hold no threadpool thread while they wait, so the
+    queue limits can exceed the threadpool size.
+    """
+    try:
+        await ticket.wait()
+        return await run_in_threadpool(function, *args, **kwargs)
+    finally:
+        ticket.release()
+
+def after_fork():
+    """Re-create per-process resources in a worker forked from a preloaded master
+    
+    Called from post_fork in gunicorn.conf.py: background threads are not
+    copied by fork, and database connections must not be shared between processes.
+    """
+    configure_logging(after_fork=True)
+    mongo_db.after_fork()
+    checker.vector_store.after_fork()
+    checker.reranker.after_fork()
+
+# Gauges read from live objects at scrape time
+metrics.Gauge(
+    "compliance_vector_collection_size",
+    "Chunks in the vector collection",
+    function=lambda: checker.vector_store.collection.count()
+)
+metrics.Gauge(
+    "compliance_documents",
+    "Documents in the metadata store",
+    function=lambda: corpus_stats.total_documents
+)
+metrics.Gauge(
+    "compliance_ingest_queue_depth",
+    "Completed uploads waiting for an ingest worker",
+    function=lambda: upload_sessions.count(QUEUED)
+)
+metrics.Gauge(
+    "compliance_ingest_in_progress",
+    "Uploads currently being ingested",
+    function=lambda: upload_sessions.count(PROCESSING)
+)
+
+logger.info("🚀 Compliance Checker API Starting...")
+logger.info("📁 Upload directory: %s", os.path.abspath(UPLOAD_DIR))
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    logger.warning("⚠️ Shedding %s request: %s", exc.work_class, exc)
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
 @app.get("/")
 async def root():
     return {"message": "Compliance Checker API", "status": "running"}
 
+def ingest_file(source, file_id, title, description, category, original_filename, file_size, progress=None):
+    """Store an uploaded PDF, its metadata and its index entries; returns the stored document
+    
+    source is the PDF's bytes, or the path of a file that is moved into the blob store.
+    """
+    # Held shared by every writer, so a snapshot sees whole documents only
+    with index_write_lock(checker.vector_store.persist_directory):
+        digest = blob_store.put(source, file_id)
+        try:
+            with blob_store.local_path(digest) as pdf_path:
+                return _ingest_file(pdf_path, digest, file_id, title, description, category, original_filename, file_size, progress)
+        except Exception:
+            blob_store.release(digest, file_id)
+            raise
+
+def _ingest_file(pdf_path, digest, file_id, title, description, category, original_filename, file_size, progress):
+    # Prepare metadata
+    document_metadata = {
+        "title": title,
+        "description": description,
+        "category": category,
+        "document_id": file_id,
+        "file_path": blob_store.path(digest),
+        "blob_sha256": digest,
+        "uploaded_at": datetime.utcnow(),
+        "original_filename": original_filename,
+        "file_size": file_size
+    }
+    
+    # Store in MongoDB
+    db_doc = {
+        "_id": file_id,
+        **document_metadata
+    }
+    
+    logger.debug("💾 Saving to MongoDB: %s", title)
+    with timed("metadata_write"):
+        mongo_db.insert_document("documents", db_doc)
+    logger.debug("✅ Saved to MongoDB")
+    
+    def report(**fields):
+        # Between pages and embedding batches, let waiting queries go first
+        scheduler.yield_to_queries()
+        if progress:
+            progress(**fields)
+    
+    # Index document for similarity search
+    logger.debug("🔍 Indexing document with ID: %s", file_id)
+    index_result = checker.index_document(
+        pdf_path,
+        {
+            "title": title,
+            "description": description,
+            "document_id": file_id,
+            "category": category,
+            "uploaded_at": datetime.utcnow().isoformat()
+        },
+        report
+    )
+    
+    logger.debug("📊 Index result: %s", index_result)
+    
+    # Update with vector IDs if indexing was successful
+    if index_result["success"]:
+        logger.info("✅ Indexed %s chunks", index_result.get('chunks_count', 0))
+        # Update MongoDB with vector IDs
+        index_fields = {
+            "vector_ids": index_result.get("vector_ids", []),
+            "chunks_count": index_result.get("chunks_count", 0),
+            "cause_counts": index_result.get("cause_counts", {})
+        }
+        with timed("metadata_write"):
+            mongo_db.update_document("documents", file_id, index_fields)
+        db_doc.update(index_fields)
+    else:
+        logger.error("❌ Indexing failed: %s", index_result.get('message', 'Unknown error'))
+        db_doc = dict(db_doc, index_error=index_result.get("message", "Indexing failed"))
+    
+    corpus_stats.record_upload(db_doc)
+    return db_doc
+
+def _document_response(db_doc):
+    vector_ids = db_doc.get("vector_ids")
+    return DocumentResponse(
+        id=db_doc["_id"],
+        title=db_doc["title"],
+        description=db_doc.get("description"),
+        category=db_doc["category"],
+        uploaded_at=db_doc["uploaded_at"],
+        vector_id=vector_ids[0] if vector_ids else None
+    )
+
 @app.post("/upload/", response_model=DocumentResponse)
 async def upload_document(
     title: str = Form(...),
@@ -42,122 +296,189 @@ async def upload_document(
     file: UploadFile = File(...)
 ):
     """Upload and index a PDF document"""
-    print(f"📤 Upload request received: {title}")
-    print(f"📄 File: {file.filename} ({file.size} bytes)")
+    logger.info("📤 Upload request received: %s", title)
+    logger.debug("📄 File: %s (%s bytes)", file.filename, file.size)
     
+    ticket = scheduler.admit(INGEST)
     try:
         # Validate file type
         if not file.filename.endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are allowed")
         
-        # Save uploaded file
         file_id = str(uuid.uuid4())
-        file_extension = os.path.splitext(file.filename)[1] or '.pdf'
-        file_path = os.path.join(UPLOAD_DIR, f"{file_id}{file_extension}")
-        
-        print(f"💾 Saving file to: {file_path}")
-        
-        # Read and save file
         contents = await file.read()
-        with open(file_path, "wb") as buffer:
-            buffer.write(contents)
+        logger.debug("✅ File received (%s bytes)", len(contents))
         
-        print(f"✅ File saved successfully ({len(contents)} bytes)")
-        
-        # Prepare metadata
-        document_metadata = {
-            "title": title,
-            "description": description,
-            "category": category,
-            "document_id": file_id,
-            "file_path": file_path,
-            "uploaded_at": datetime.utcnow(),
-            "original_filename": file.filename,
-            "file_size": len(contents)
-        }
-        
-        # Store in MongoDB
-        db_doc = {
-            "_id": file_id,
-            **document_metadata
-        }
-        
-        print(f"💾 Saving to MongoDB: {title}")
-        mongo_db.insert_document("documents", db_doc)
-        print("✅ Saved to MongoDB")
-        
-        # Index document for similarity search
-        print(f"🔍 Indexing document with ID: {file_id}")
-        index_result = checker.index_document(
-            file_path,
-            {
-                "title": title,
-                "description": description,
-                "document_id": file_id,
-                "category": category,
-                "uploaded_at": datetime.utcnow().isoformat()
-            }
-        )
-        
-        print(f"📊 Index result: {index_result}")
-        
-        # Update with vector IDs if indexing was successful
-        if index_result["success"]:
-            print(f"✅ Indexed {index_result.get('chunks_count', 0)} chunks")
-            # Update MongoDB with vector IDs
-            mongo_db.get_collection("documents").update_one(
-                {"_id": file_id},
-                {"$set": {"vector_ids": index_result.get("vector_ids", [])}}
-            )
-            vector_id = index_result.get("vector_ids", [None])[0]
-        else:
-            print(f"❌ Indexing failed: {index_result.get('message', 'Unknown error')}")
-            vector_id = None
-        
-        return DocumentResponse(
-            id=file_id,
-            title=title,
-            description=description,
-            category=category,
-            uploaded_at=document_metadata["uploaded_at"],
-            vector_id=vector_id
+        # In a worker thread, so a large PDF does not hold up the event loop;
+        # the file goes into the blob store there, and out again on failure
+        db_doc = await _run_scheduled(
+            ticket, ingest_file,
+            contents, file_id, title, description, category, file.filename, len(contents)
         )
+        return _document_response(db_doc)
         
     except Exception as e:
-        print(f"❌ Upload error: {str(e)}")
-        # Clean up file if error occurred
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
+        ticket.release()
+        logger.error("❌ Upload error: %s", str(e))
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
+# ---------- Chunked uploads with background ingestion ----------
+
+def _ingest_upload_session(session):
+    """Move a fully received upload into the blob store and index it, reporting progress"""
+    file_id = str(uuid.uuid4())
+    db_doc = ingest_file(
+        session.part_path, file_id, session.title, session.description, session.category,
+        session.filename, session.total_size, progress=session.update
+    )
+    if "index_error" in db_doc:
+        # Nothing searchable came out of it (a PDF without text, say); the session fails instead
+        _remove_document(file_id, db_doc)
+        raise ValueError(db_doc["index_error"])
+    return _document_response(db_doc).model_dump(mode="json")
+
+def _get_session_or_404(upload_id):
+    session = upload_sessions.get(upload_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+@app.post("/uploads/", response_model=UploadProgress)
+async def create_upload(request: UploadSessionCreate):
+    """Start a resumable chunked upload"""
+    if not request.filename.endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+    if request.total_size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Uploads are limited to {MAX_UPLOAD_BYTES} bytes")
+    
+    session = upload_sessions.create(
+        request.title, request.description, request.category, request.filename, request.total_size
+    )
+    logger.info("📤 Upload session %s started: %s (%s bytes)", session.upload_id, request.filename, request.total_size)
+    return session.to_dict()
+
+@app.put("/uploads/{upload_id}", response_model=UploadProgress)
+async def upload_chunk(upload_id: str, request: Request, offset: int = 0):
+    """Append the request body at offset; resume from the received_bytes this returns"""
+    session = _get_session_or_404(upload_id)
+    data = await request.body()
+    try:
+        # File writes; keep them off the event loop
+        await run_in_threadpool(upload_sessions.append_chunk, session, offset, data)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "received_bytes": session.received_bytes})
+    return session.to_dict()
+
+@app.post("/uploads/{upload_id}/complete", response_model=UploadProgress)
+async def complete_upload(upload_id: str):
+    """Queue a fully received upload for background ingestion"""
+    session = _get_session_or_404(upload_id)
+    ticket = scheduler.admit(INGEST)
+    try:
+        upload_sessions.complete(session, lambda s: _scheduled(ticket, _ingest_upload_session, s))
+    except ValueError as e:
+        ticket.release()
+        raise HTTPException(status_code=409, detail=str(e))
+    return session.to_dict()
+
+@app.get("/uploads/{upload_id}", response_model=UploadProgress)
+async def get_upload(upload_id: str):
+    """Poll upload and ingestion progress"""
+    return _get_session_or_404(upload_id).to_dict()
+
+@app.get("/uploads/{upload_id}/events")
+async def upload_events(upload_id: str):
+    """Server-Sent Events stream of progress updates until ingestion finishes"""
+    session = _get_session_or_404(upload_id)
+    
+    async def events():
+        version = -1
+        while True:
+            # Ingestion may be running in another worker
+            await run_in_threadpool(upload_sessions.refresh, session)
+            if session.version != version:
+                version = session.version
+                yield f"event: progress\ndata: {json.dumps(session.to_dict())}\n\n"
+                if session.finished:
+                    break
+            await asyncio.sleep(0.25)
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.post("/check-compliance/")
 async def check_compliance(request: SimilarityRequest):
     """Check compliance for given text"""
-    print(f"🎯 Compliance check request: '{request.query_text[:50]}...'")
-    print(f"📊 Threshold: {request.threshold}")
+    logger.debug("🎯 Compliance check request: '%s...'", request.query_text[:50])
+    logger.debug("📊 Threshold: %s", request.threshold)
     
+    ticket = scheduler.admit(QUERY)
     try:
-        report = checker.check_compliance(
+        # Off the event loop, so concurrent checks overlap and their query
+        # embeddings can be batched together
+        report = await _run_scheduled(
+            ticket, checker.check_compliance,
             query_text=request.query_text,
-            threshold=request.threshold
+            threshold=request.threshold,
+            top_k=request.top_k,
+            category=request.category.value if request.category else None,
+            collapse_duplicates=request.collapse_duplicates,
+            rerank=request.rerank,
+            rerank_candidates=request.rerank_candidates,
+            rerank_budget_ms=request.rerank_budget_ms
         )
         
-        print(f"📈 Report generated: {report.get('total_matches', 0)} matches")
-        print(f"📊 High risk causes: {len(report.get('high_risk_causes', []))}")
+        logger.debug("📈 Report generated: %s matches", report.get('total_matches', 0))
+        logger.debug("📊 High risk causes: %s", len(report.get('high_risk_causes', [])))
         
         return report
     except Exception as e:
-        print(f"❌ Error in compliance check: {e}")
+        logger.error("❌ Error in compliance check: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/check-compliance/stream")
+async def check_compliance_stream(request: SimilarityRequest):
+    """Server-Sent Events version of /check-compliance/
+    
+    Sends a "match" event as soon as each retrieval batch finds something,
+    then one "report" event with the per-cause aggregates and recommendations.
+    """
+    logger.debug("🎯 Streaming compliance check request: '%s...'", request.query_text[:50])
+    
+    ticket = scheduler.admit(QUERY)
+    
+    # Waits for its slot on the event loop, then runs each search step in the threadpool
+    async def events():
+        try:
+            await ticket.wait()
+            steps = checker.iter_compliance(
+                request.query_text,
+                threshold=request.threshold,
+                top_k=request.top_k,
+                category=request.category.value if request.category else None,
+                collapse_duplicates=request.collapse_duplicates,
+                rerank=request.rerank,
+                rerank_candidates=request.rerank_candidates,
+                rerank_budget_ms=request.rerank_budget_ms
+            )
+            async for event, data in iterate_in_threadpool(steps):
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            logger.error("❌ Error in streaming compliance check: %s", e)
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+        finally:
+            ticket.release()
+    
+    # The background task also frees the ticket if the stream never started
+    return StreamingResponse(events(), media_type="text/event-stream", background=BackgroundTask(ticket.release))
+
 @app.get("/documents/", response_model=List[DocumentResponse])
 async def get_documents():
     """Get all uploaded documents"""
-    print("📚 Fetching all documents")
+    logger.debug("📚 Fetching all documents")
     
     try:
         documents = mongo_db.get_all_documents("documents")
-        print(f"📊 Found {len(documents)} documents in MongoDB")
+        logger.debug("📊 Found %s documents in MongoDB", len(documents))
         
         response_docs = []
         for doc in documents:
@@ -173,24 +494,45 @@ async def get_documents():
                 vector_id=doc.get("vector_ids", [None])[0] if doc.get("vector_ids") else None
             ))
         
-        print(f"✅ Returning {len(response_docs)} documents")
+        logger.debug("✅ Returning %s documents", len(response_docs))
         return response_docs
     except Exception as e:
-        print(f"❌ Error fetching documents: {str(e)}")
+        logger.error("❌ Error fetching documents: %s", str(e))
         raise HTTPException(status_code=500, detail=f"Failed to fetch documents: {str(e)}")
 
+@app.get("/stats", response_model=StatsResponse)
+async def get_stats():
+    """Corpus statistics from incrementally maintained counters"""
+    return corpus_stats.snapshot()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Counters, gauges and latency histograms in the Prometheus text format"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/debug/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str, request: Request):
+    """Collapsed stacks of a profiled request, for flamegraph.pl or speedscope"""
+    if not profiling.is_authorized(request.headers.get("X-Admin-Token")):
+        raise HTTPException(status_code=403, detail="Profiles require a valid X-Admin-Token")
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    with open(path) as f:
+        return PlainTextResponse(f.read())
+
 @app.get("/document/{document_id}")
 async def get_document(document_id: str):
     """Get a specific document by ID"""
-    print(f"🔍 Fetching document: {document_id}")
+    logger.debug("🔍 Fetching document: %s", document_id)
     
     try:
         document = mongo_db.get_document("documents", document_id)
         if not document:
-            print(f"❌ Document not found: {document_id}")
+            logger.error("❌ Document not found: %s", document_id)
             raise HTTPException(status_code=404, detail="Document not found")
         
-        print(f"✅ Found document: {document.get('title', 'Untitled')}")
+        logger.debug("✅ Found document: %s", document.get('title', 'Untitled'))
         
         return {
             "id": str(document["_id"]),
@@ -203,48 +545,60 @@ async def get_document(document_id: str):
             "vector_ids": document.get("vector_ids", [])
         }
     except Exception as e:
-        print(f"❌ Error fetching document: {str(e)}")
+        logger.error("❌ Error fetching document: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
+def _remove_document(document_id, document):
+    """Delete a document's file and metadata"""
+    with index_write_lock(checker.vector_store.persist_directory):
+        # Release the stored file; it is deleted once no other document shares it
+        digest = document.get("blob_sha256")
+        file_path = document.get("file_path")
+        if digest:
+            if blob_store.release(digest, document_id):
+                logger.info("✅ Deleted blob: %s", digest)
+            else:
+                logger.info("🔗 Kept blob %s, still used by other documents", digest)
+        elif file_path and os.path.exists(file_path):
+            os.remove(file_path)
+            logger.info("✅ Deleted file: %s", file_path)
+        else:
+            logger.warning("⚠️ File not found: %s", file_path)
+        
+        # Delete from MongoDB
+        if mongo_db.delete_document("documents", document_id):
+            corpus_stats.record_delete(document)
+        logger.info("✅ Deleted from MongoDB")
+
 @app.delete("/document/{document_id}")
 async def delete_document(document_id: str):
     """Delete a document by ID"""
-    print(f"🗑️ Deleting document: {document_id}")
+    logger.info("🗑️ Deleting document: %s", document_id)
     
     try:
         # Get document details first
         document = mongo_db.get_document("documents", document_id)
         if not document:
-            print(f"❌ Document not found for deletion: {document_id}")
+            logger.error("❌ Document not found for deletion: %s", document_id)
             raise HTTPException(status_code=404, detail="Document not found")
         
-        print(f"📄 Document to delete: {document.get('title', 'Unknown')}")
-        
-        # Delete file from filesystem
-        file_path = document.get("file_path")
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
-            print(f"✅ Deleted file: {file_path}")
-        else:
-            print(f"⚠️ File not found: {file_path}")
+        logger.debug("📄 Document to delete: %s", document.get('title', 'Unknown'))
         
-        # Delete from MongoDB
-        collection = mongo_db.get_collection("documents")
-        collection.delete_one({"_id": document_id})
-        print(f"✅ Deleted from MongoDB")
+        # In a worker thread: the lock waits while a snapshot is being taken
+        await run_in_threadpool(_remove_document, document_id, document)
         
         # Note: Vector store deletion would need separate implementation
         
         return {"message": "Document deleted successfully", "document_id": document_id}
     except Exception as e:
-        print(f"❌ Error deleting document: {str(e)}")
+        logger.error("❌ Error deleting document: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     mongo_status = mongo_db.client is not None
-    print(f"🏥 Health check - MongoDB: {'✅ Connected' if mongo_status else '❌ Not connected'}")
+    logger.debug("🏥 Health check - MongoDB: %s", '✅ Connected' if mongo_status else '❌ Not connected')
     
     return {
         "status": "healthy", 
@@ -304,5 +658,5 @@ async def debug_check_simple():
 
 if __name__ == "__main__":
     import uvicorn
-    print("🚀 Starting Compliance Checker API...")
+    logger.info("🚀 Starting Compliance Checker API...")
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,266 @@
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Fields that get a secondary index in every collection
+INDEXED_FIELDS = ("document_id", "category", "title")
+
+
+def _json_default(value):
+    """Encode values JSON does not know about"""
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return str(value)
+
+
+def _json_object_hook(value):
+    """Decode values written by _json_default"""
+    if len(value) == 1 and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+
+def encode_document(document: Dict) -> str:
+    """Serialize a document to JSON, keeping datetimes round-trippable"""
+    return json.dumps(document, default=_json_default)
+
+
+def decode_document(data: str) -> Dict:
+    """Deserialize a document written by encode_document"""
+    return json.loads(data, object_hook=_json_object_hook)
+
+
+class InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class UpdateResult:
+    def __init__(self, matched_count: int, modified_count: int):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+
+
+class DeleteResult:
+    def __init__(self, deleted_count: int):
+        self.deleted_count = deleted_count
+
+
+class MemoryCollection:
+    """In-memory collection with the subset of the pymongo API the app uses"""
+
+    def __init__(self, name: str, store: "MemoryStore", indexed_fields=INDEXED_FIELDS):
+        self.name = name
+        self.store = store
+        self._docs: Dict[str, Dict] = {}
+        self._indexes: Dict[str, Dict] = {field: {} for field in indexed_fields}
+
+    # ---------- index maintenance ----------
+
+    def _index_add(self, key: str, document: Dict):
+        for field, index in self._indexes.items():
+            value = document.get(field)
+            if _hashable(value):
+                index.setdefault(value, set()).add(key)
+
+    def _index_remove(self, key: str, document: Dict):
+        for field, index in self._indexes.items():
+            value = document.get(field)
+            if _hashable(value) and value in index:
+                index[value].discard(key)
+                if not index[value]:
+                    del index[value]
+
+    def _put(self, key: str, document: Dict):
+        old = self._docs.get(key)
+        if old is not None:
+            self._index_remove(key, old)
+        self._docs[key] = document
+        self._index_add(key, document)
+
+    def _remove(self, key: str):
+        old = self._docs.pop(key, None)
+        if old is not None:
+            self._index_remove(key, old)
+        return old
+
+    # ---------- query helpers ----------
+
+    def _candidate_keys(self, filter: Dict) -> List[str]:
+        """Narrow the scan using _id or a secondary index when possible"""
+        if "_id" in filter and _hashable(filter["_id"]):
+            key = str(filter["_id"])
+            return [key] if key in self._docs else []
+
+        for field, value in filter.items():
+            if field in self._indexes and _hashable(value):
+                return list(self._indexes[field].get(value, ()))
+
+        return list(self._docs.keys())
+
+    def _iter_matches(self, filter: Optional[Dict]):
+        filter = filter or {}
+        for key in self._candidate_keys(filter):
+            document = self._docs.get(key)
+            if document is not None and matches_filter(document, filter):
+                yield key, document
+
+    # ---------- public API ----------
+
+    def insert_one(self, document: Dict) -> InsertOneResult:
+        with self.store.lock:
+            if "_id" not in document:
+                document["_id"] = uuid.uuid4().hex
+            key = str(document["_id"])
+            if key in self._docs:
+                raise ValueError(f"Duplicate _id in collection '{self.name}': {key}")
+            stored = dict(document)
+            self._put(key, stored)
+            self.store._log("put", self.name, stored)
+            return InsertOneResult(document["_id"])
+
+    def find_one(self, filter: Optional[Dict] = None) -> Optional[Dict]:
+        with self.store.lock:
+            for _, document in self._iter_matches(filter):
+                return dict(document)
+            return None
+
+    def find(self, filter: Optional[Dict] = None) -> List[Dict]:
+        with self.store.lock:
+            return [dict(document) for _, document in self._iter_matches(filter)]
+
+    def count_documents(self, filter: Optional[Dict] = None) -> int:
+        with self.store.lock:
+            return sum(1 for _ in self._iter_matches(filter))
+
+    def update_one(self, filter: Dict, update: Dict) -> UpdateResult:
+        with self.store.lock:
+            for key, document in self._iter_matches(filter):
+                updated = apply_update(document, update)
+                self._put(key, updated)
+                self.store._log("put", self.name, updated)
+                return UpdateResult(1, 1)
+            return UpdateResult(0, 0)
+
+    def delete_one(self, filter: Dict) -> DeleteResult:
+        with self.store.lock:
+            for key, _ in self._iter_matches(filter):
+                removed = self._remove(key)
+                self.store._log("delete", self.name, {"_id": removed["_id"]})
+                return DeleteResult(1)
+            return DeleteResult(0)
+
+
+class MemoryStore:
+    """Per-collection in-memory storage with optional append-only persistence
+
+    Every write is appended to the log file as one JSON line, and the log is
+    replayed on startup, so a restart keeps the data without needing MongoDB.
+    """
+
+    def __init__(self, persist_path: Optional[str] = None):
+        self.persist_path = persist_path
+        self.lock = threading.RLock()
+        self._collections: Dict[str, MemoryCollection] = {}
+        self._log_file = None
+
+        if persist_path:
+            directory = os.path.dirname(os.path.abspath(persist_path))
+            os.makedirs(directory, exist_ok=True)
+            self._replay()
+            self._log_file = open(persist_path, "a", encoding="utf-8")
+
+    def __getitem__(self, collection_name: str) -> MemoryCollection:
+        return self.get_collection(collection_name)
+
+    def get_collection(self, collection_name: str) -> MemoryCollection:
+        with self.lock:
+            if collection_name not in self._collections:
+                self._collections[collection_name] = MemoryCollection(collection_name, self)
+            return self._collections[collection_name]
+
+    def _log(self, op: str, collection_name: str, document: Dict):
+        if self._log_file is None:
+            return
+        record = {"op": op, "collection": collection_name, "doc": document}
+        self._log_file.write(encode_document(record) + "\n")
+        self._log_file.flush()
+
+    def _replay(self):
+        if not os.path.exists(self.persist_path):
+            return
+
+        with open(self.persist_path, "r", encoding="utf-8") as log:
+            for line in log:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = decode_document(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write; skip it
+                    continue
+                collection = self.get_collection(record["collection"])
+                key = str(record["doc"]["_id"])
+                if record["op"] == "put":
+                    collection._put(key, record["doc"])
+                elif record["op"] == "delete":
+                    collection._remove(key)
+
+    def compact(self):
+        """Rewrite the log so it only holds the current documents"""
+        if not self.persist_path:
+            return
+
+        with self.lock:
+            tmp_path = f"{self.persist_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as out:
+                for name, collection in self._collections.items():
+                    for document in collection._docs.values():
+                        record = {"op": "put", "collection": name, "doc": document}
+                        out.write(encode_document(record) + "\n")
+            if self._log_file is not None:
+                self._log_file.close()
+            os.replace(tmp_path, self.persist_path)
+            self._log_file = open(self.persist_path, "a", encoding="utf-8")
+
+    def close(self):
+        with self.lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+
+
+def _hashable(value) -> bool:
+    return isinstance(value, (str, int, float, bool)) or value is None
+
+
+def matches_filter(document: Dict, filter: Dict) -> bool:
+    """Equality matching, plus $in, for top-level fields"""
+    for field, expected in filter.items():
+        actual = document.get(field)
+        values = expected["$in"] if isinstance(expected, dict) and "$in" in expected else [expected]
+
+        # _id is compared as a string, matching how documents are keyed
+        if field == "_id":
+            actual = str(actual)
+            values = [str(v) for v in values]
+
+        if actual not in values:
+            return False
+    return True
+
+
+def apply_update(document: Dict, update: Dict) -> Dict:
+    """Apply a Mongo-style update ($set, $unset, $inc) and return a new document"""
+    updated = dict(document)
+    for field, value in update.get("$set", {}).items():
+        updated[field] = value
+    for field in update.get("$unset", {}):
+        updated.pop(field, None)
+    for field, amount in update.get("$inc", {}).items():
+        updated[field] = updated.get(field, 0) + amount
+    return updated
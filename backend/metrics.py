@@ -0,0 +1,267 @@
+import bisect
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from a fast index lookup to a large PDF ingest
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric(ABC):
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Optional["Registry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Exposition lines for every labeled series"""
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only go up")
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self.lock:
+            return self.values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self.lock:
+            values = sorted(self.values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in values]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from function at scrape time"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional["Registry"] = None, function: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.function = function
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def _samples(self) -> List[str]:
+        if self.function is not None:
+            try:
+                return [f"{self.name} {_format_value(self.function())}"]
+            except Exception:
+                return []
+        with self.lock:
+            values = sorted(self.values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in values]
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, plus their sum and count"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional["Registry"] = None, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [per-bucket counts, sum, count]
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        with self.lock:
+            state = self.values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def _samples(self) -> List[str]:
+        with self.lock:
+            values = sorted((key, [list(s[0]), s[1], s[2]]) for key, s in self.values.items())
+        lines = []
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Metrics rendered together in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self.lock:
+            if metric.name in self.metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self.metrics[metric.name] = metric
+
+    def unregister(self, name: str):
+        with self.lock:
+            self.metrics.pop(name, None)
+
+    def render(self) -> str:
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# Shared application metrics; gauges read from live objects are registered in main
+
+STAGE_SECONDS = Histogram(
+    "compliance_stage_duration_seconds",
+    "Time spent in each pipeline stage (parse, ocr, split, embed, index, query, postprocess, report, metadata_write)",
+    ["stage"]
+)
+HTTP_REQUESTS = Counter(
+    "compliance_http_requests_total",
+    "HTTP requests by route and status",
+    ["method", "route", "status"]
+)
+HTTP_SECONDS = Histogram(
+    "compliance_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"]
+)
+DOCUMENTS_INDEXED = Counter(
+    "compliance_documents_indexed_total",
+    "Documents run through index_document, by result",
+    ["result"]
+)
+CHUNKS_INDEXED = Counter(
+    "compliance_chunks_indexed_total",
+    "Chunks added to the vector index"
+)
+COMPLIANCE_CHECKS = Counter(
+    "compliance_checks_total",
+    "Compliance checks completed"
+)
+COMPLIANCE_MATCHES = Counter(
+    "compliance_matches_total",
+    "Matches returned by compliance checks"
+)
+EMBEDDING_BATCH_SIZE = Histogram(
+    "compliance_embedding_batch_size",
+    "Texts per embedding call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+)
+QUERY_BATCH_REQUESTS = Histogram(
+    "compliance_query_batch_requests",
+    "Concurrent query-embedding requests coalesced into one encode call",
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+RERANK_FALLBACKS = Counter(
+    "compliance_rerank_fallbacks_total",
+    "Re-ranking requests answered in bi-encoder order, by reason (budget or unavailable)",
+    ["reason"]
+)
+SCHEDULER_QUEUED = Gauge(
+    "compliance_scheduler_queued",
+    "Admitted work waiting for a slot, by work class (query or ingest)",
+    ["work_class"]
+)
+SCHEDULER_ACTIVE = Gauge(
+    "compliance_scheduler_active",
+    "Work holding a slot, by work class",
+    ["work_class"]
+)
+SCHEDULER_WAIT_SECONDS = Histogram(
+    "compliance_scheduler_wait_seconds",
+    "Time admitted work waited for a slot, by work class",
+    ["work_class"]
+)
+SCHEDULER_REJECTIONS = Counter(
+    "compliance_scheduler_rejections_total",
+    "Requests refused with 429 because their work class queue was full",
+    ["work_class"]
+)
+CACHE_REQUESTS = Counter(
+    "compliance_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"]
+)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
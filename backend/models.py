@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -30,6 +30,11 @@ class SimilarityRequest(BaseModel):
     query_text: str = Field(..., min_length=10, description="Text to check for compliance")
     threshold: float = Field(0.7, ge=0.0, le=1.0, description="Similarity threshold (0.0 to 1.0)")
     top_k: int = Field(5, ge=1, le=20, description="Number of results to return")
+    category: Optional[DocumentCategory] = Field(None, description="Only search documents of this category")
+    collapse_duplicates: bool = Field(False, description="Return one result per near-duplicate clause cluster")
+    rerank: bool = Field(False, description="Re-score the top candidates with a cross-encoder")
+    rerank_candidates: int = Field(20, ge=1, le=100, description="Candidates per query segment to re-rank")
+    rerank_budget_ms: float = Field(200, ge=0, le=5000, description="Time allowed for re-ranking before falling back to bi-encoder order")
 
 class SimilarityResult(BaseModel):
     document_id: str
@@ -37,6 +42,8 @@ class SimilarityResult(BaseModel):
     similarity_score: float
     matching_text: str
     cause: str
+    cluster_size: int = 1
+    rerank_score: Optional[float] = None
     
 class ComplianceReport(BaseModel):
     query: str
@@ -45,8 +52,42 @@ class ComplianceReport(BaseModel):
     results_by_cause: dict
     high_risk_causes: List[dict]
     recommendations: List[str]
+    reranked: Optional[bool] = None
 
 class HealthCheck(BaseModel):
     status: str
     timestamp: datetime
-    mongo_connected: bool
\ No newline at end of file
+    mongo_connected: bool
+
+class StatsResponse(BaseModel):
+    total_documents: int
+    indexed_documents: int
+    total_chunks: int
+    bytes_stored: int
+    documents_by_category: Dict[str, int]
+    chunks_by_cause: Dict[str, int]
+    ingest_rate: dict
+    recent_uploads: List[dict]
+
+class UploadSessionCreate(BaseModel):
+    title: str = Field(..., min_length=1, max_length=200, description="Document title")
+    description: Optional[str] = Field("", max_length=1000, description="Document description")
+    category: str = Field("legal", description="Document category")
+    filename: str = Field(..., min_length=1, description="Original file name")
+    total_size: int = Field(..., gt=0, description="File size in bytes")
+
+class UploadProgress(BaseModel):
+    upload_id: str
+    title: str
+    filename: str
+    status: str
+    stage: str
+    total_size: int
+    received_bytes: int
+    pages_total: int
+    pages_parsed: int
+    chunks_total: int
+    chunks_embedded: int
+    document: Optional[dict] = None
+    error: Optional[str] = None
+    version: int
\ No newline at end of file
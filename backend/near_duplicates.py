@@ -0,0 +1,192 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import zlib
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_WORD = re.compile(r"\w+")
+
+
+class NearDuplicateIndex:
+    """MinHash signatures and LSH banding that put near-identical chunks in one cluster
+
+    Each chunk's word 5-shingles are MinHashed into bands x rows values.
+    Two chunks whose signatures agree on every row of any band land in the
+    same bucket; with 8 bands of 8 rows that happens to pairs above roughly
+    0.77 Jaccard similarity, and almost never below 0.5. A chunk joins the
+    cluster of the first bucket it collides with, or starts a new one.
+
+    Assignments are appended to path, one row of (cluster, band keys) per
+    chunk, and replayed on startup. The next free cluster id is saved to
+    path.next before chunks are stored, so a crash between storing chunks
+    and logging them never hands their cluster ids out again.
+    """
+
+    def __init__(self, path: Optional[str] = None, bands: int = 8, rows: int = 8, shingle_words: int = 5):
+        self.path = path
+        self.bands = bands
+        self.rows = rows
+        self.shingle_words = shingle_words
+        # Fixed seed: signatures have to match across restarts and processes
+        rng = np.random.default_rng(20240601)
+        self._a = rng.integers(1, 1 << 31, size=bands * rows, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=bands * rows, dtype=np.uint64)
+        self.buckets: List[Dict[int, int]] = [{} for _ in range(bands)]
+        self.sizes: Dict[int, int] = {}
+        self.next_cluster = 0
+        self.lock = threading.Lock()
+        self._load()
+
+    @property
+    def _counter_path(self) -> str:
+        return f"{self.path}.next"
+
+    def _load(self):
+        if not self.path:
+            return
+        if os.path.exists(self._counter_path):
+            with open(self._counter_path, "r", encoding="utf-8") as f:
+                self.next_cluster = int(f.read().strip() or 0)
+        if not os.path.exists(self.path):
+            return
+        row_bytes = 8 * (1 + self.bands)
+        usable = os.path.getsize(self.path) // row_bytes
+        records = np.fromfile(self.path, dtype=np.int64, count=usable * (1 + self.bands)).reshape(-1, 1 + self.bands)
+        for record in records.tolist():
+            self._register(record[0], record[1:])
+        # Logs written before the counter existed
+        self.next_cluster = max([self.next_cluster] + [cluster + 1 for cluster in self.sizes])
+        logger.info("✅ Loaded near-duplicate index: %s chunks in %s clusters", len(records), len(self.sizes))
+
+    def _save_counter(self, next_cluster: int):
+        partial = f"{self._counter_path}.tmp"
+        with open(partial, "w", encoding="utf-8") as f:
+            f.write(str(next_cluster))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(partial, self._counter_path)
+
+    def signature(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.lower())
+        k = self.shingle_words
+        shingles = {" ".join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        return [
+            int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), "little", signed=True)
+            for band in signature.reshape(self.bands, self.rows)
+        ]
+
+    def _register(self, cluster: int, keys: List[int]):
+        for bucket, key in zip(self.buckets, keys):
+            bucket.setdefault(key, cluster)
+        self.sizes[cluster] = self.sizes.get(cluster, 0) + 1
+
+    def assign(self, texts: List[str], store: Optional[Callable[[List[int]], None]] = None) -> List[int]:
+        """Cluster id for each text, registering it so later near-duplicates join it
+
+        store, if given, is called with the cluster ids before they are
+        registered; if it raises, nothing is registered or logged, and the
+        ids it was given are skipped.
+        """
+        keys = [self.band_keys(self.signature(text)) for text in texts]
+        clusters = []
+        with self.lock:
+            # Buckets of this batch, so its own near-duplicates share a cluster too
+            batch_buckets: List[Dict[int, int]] = [{} for _ in range(self.bands)]
+            next_cluster = self.next_cluster
+            for text_keys in keys:
+                cluster = next(
+                    (
+                        bucket[key] if key in bucket else batch_bucket[key]
+                        for bucket, batch_bucket, key in zip(self.buckets, batch_buckets, text_keys)
+                        if key in bucket or key in batch_bucket
+                    ),
+                    None
+                )
+                if cluster is None:
+                    cluster = next_cluster
+                    next_cluster += 1
+                for batch_bucket, key in zip(batch_buckets, text_keys):
+                    batch_bucket.setdefault(key, cluster)
+                clusters.append(cluster)
+
+            if next_cluster != self.next_cluster:
+                if self.path:
+                    self._save_counter(next_cluster)
+                self.next_cluster = next_cluster
+            if store:
+                store(clusters)
+            for cluster, text_keys in zip(clusters, keys):
+                self._register(cluster, text_keys)
+            if self.path:
+                records = np.array([[c] + k for c, k in zip(clusters, keys)], dtype=np.int64)
+                with open(self.path, "ab") as f:
+                    records.tofile(f)
+        return clusters
+
+    def cluster_size(self, cluster: Optional[int]) -> int:
+        return self.sizes.get(cluster, 1) if cluster is not None else 1
+
+
+class DeduplicatingCollection:
+    """Collection wrapper that tags added chunks with their near-duplicate cluster
+
+    Stored metadata gains dup_cluster; query results also carry
+    dup_cluster_size, the number of chunks in that cluster.
+    """
+
+    def __init__(self, collection, index: NearDuplicateIndex):
+        self.collection = collection
+        self.index = index
+
+    def add(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        def store(clusters: List[int]):
+            tagged = [dict(metadata, dup_cluster=cluster) for metadata, cluster in zip(metadatas, clusters)]
+            self.collection.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=tagged)
+
+        # Clusters only count chunks that were actually added
+        self.index.assign(documents, store)
+
+    def query(self, **kwargs):
+        results = self.collection.query(**kwargs)
+        if results.get("metadatas"):
+            results["metadatas"] = [
+                [dict(metadata, dup_cluster_size=self.index.cluster_size(metadata.get("dup_cluster"))) for metadata in row]
+                for row in results["metadatas"]
+            ]
+        return results
+
+    def get(self, **kwargs):
+        return self.collection.get(**kwargs)
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def memory_usage(self):
+        return self.collection.memory_usage()
+
+
+def collapse_matches(matches: List[Dict], top_k: int) -> List[Dict]:
+    """Keep the best-scoring match of each cluster, up to top_k; matches must be sorted best first"""
+    collapsed = []
+    seen = set()
+    for match in matches:
+        cluster = match.get("cluster_id")
+        key = ("cluster", cluster) if cluster is not None else ("chunk", match["document_id"], match["matching_text"])
+        if key in seen:
+            continue
+        seen.add(key)
+        collapsed.append(match)
+        if len(collapsed) == top_k:
+            break
+    return collapsed
@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+def page_fingerprint(page) -> str:
+    """SHA-256 of a page's content stream and the images it draws
+
+    Scanned pages are mostly one big image, so the same scan in another
+    upload, or the same PDF uploaded again, gets the same fingerprint.
+    """
+    digest = hashlib.sha256()
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+    resources = page.get("/Resources")
+    xobjects = resources.get_object().get("/XObject") if resources else None
+    if xobjects:
+        xobjects = xobjects.get_object()
+        for name in sorted(xobjects):
+            xobject = xobjects[name].get_object()
+            digest.update(name.encode())
+            digest.update(xobject.get_data())
+    return digest.hexdigest()
+
+
+class PageOCR:
+    """OCR for pages without a text layer, with Tesseract, cached by page fingerprint
+
+    Each page is rendered with pdftoppm and read with tesseract, both
+    installed locally (poppler-utils and tesseract-ocr). Pages run in
+    parallel, at most OCR_WORKERS at a time, each as its own pair of
+    processes limited to one thread, so a scanned document uses every core
+    without oversubscribing them. Recognized text is cached under
+    OCR_CACHE_DIR, so processing the same page again costs nothing.
+
+    OCR=0 turns it off; without the tools installed it stays off.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, workers: Optional[int] = None,
+                 language: Optional[str] = None, dpi: Optional[int] = None):
+        self.cache_dir = cache_dir or os.getenv("OCR_CACHE_DIR", "./ocr_cache")
+        self.workers = workers or int(os.getenv("OCR_WORKERS", "0")) or os.cpu_count() or 1
+        self.language = language or os.getenv("OCR_LANG", "eng")
+        self.dpi = dpi or int(os.getenv("OCR_DPI", "300"))
+        self.timeout = float(os.getenv("OCR_TIMEOUT", "120"))
+        self.enabled = os.getenv("OCR", "1") != "0"
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._warned = False
+
+    def available(self) -> bool:
+        if not self.enabled:
+            return False
+        if shutil.which("pdftoppm") and shutil.which("tesseract"):
+            return True
+        if not self._warned:
+            logger.warning("⚠️ Scanned pages found but pdftoppm/tesseract are not installed; skipping OCR")
+            self._warned = True
+        return False
+
+    def _cache_path(self, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, fingerprint[:2], f"{fingerprint}.txt")
+
+    def _cached(self, fingerprint: str) -> Optional[str]:
+        path = self._cache_path(fingerprint)
+        text = None
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        record_cache("ocr", text is not None)
+        return text
+
+    def _store(self, fingerprint: str, text: str):
+        path = self._cache_path(fingerprint)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(partial, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(partial, path)
+
+    def recognize_page(self, pdf_path: str, page_number: int) -> str:
+        """Text of one page (1-based), rendered and read in child processes"""
+        env = dict(os.environ, OMP_THREAD_LIMIT="1")
+        with tempfile.TemporaryDirectory(prefix="ocr-") as scratch:
+            image_prefix = os.path.join(scratch, "page")
+            subprocess.run(
+                ["pdftoppm", "-f", str(page_number), "-l", str(page_number), "-r", str(self.dpi),
+                 "-gray", "-png", "-singlefile", pdf_path, image_prefix],
+                check=True, capture_output=True, timeout=self.timeout
+            )
+            result = subprocess.run(
+                ["tesseract", f"{image_prefix}.png", "stdout", "-l", self.language],
+                check=True, capture_output=True, timeout=self.timeout, env=env
+            )
+        return result.stdout.decode("utf-8", errors="replace").strip()
+
+    def _recognize_cached(self, pdf_path: str, page_number: int, fingerprint: str) -> str:
+        try:
+            text = self.recognize_page(pdf_path, page_number)
+        except (subprocess.SubprocessError, OSError) as e:
+            logger.error("❌ OCR failed for page %s of %s: %s", page_number, pdf_path, e)
+            return ""
+        self._store(fingerprint, text)
+        return text
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Threads only wait on the OCR processes, which do the work
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr")
+            return self._executor
+
+    def recognize(self, pdf_path: str, pages: List[Tuple[int, object]],
+                  progress: Optional[Callable[[int], None]] = None) -> Dict[int, str]:
+        """OCR text for each (0-based index, page); progress gets the number of pages done"""
+        texts: Dict[int, str] = {}
+        pending = []
+        for index, page in pages:
+            try:
+                fingerprint = page_fingerprint(page)
+            except Exception as e:
+                logger.warning("⚠️ Could not fingerprint page %s of %s: %s", index + 1, pdf_path, e)
+                fingerprint = hashlib.sha256(f"{os.path.abspath(pdf_path)}:{os.path.getmtime(pdf_path)}:{index}".encode()).hexdigest()
+            text = self._cached(fingerprint)
+            if text is not None:
+                texts[index] = text
+            else:
+                pending.append((index, fingerprint))
+
+        if progress and texts:
+            progress(len(texts))
+        if pending:
+            pool = self._pool()
+            futures = {
+                index: pool.submit(self._recognize_cached, pdf_path, index + 1, fingerprint)
+                for index, fingerprint in pending
+            }
+            for index, future in futures.items():
+                texts[index] = future.result()
+                if progress:
+                    progress(len(texts))
+        logger.info("🔎 OCR'd %s pages of %s (%s from cache)", len(pages), pdf_path, len(pages) - len(pending))
+        return texts
@@ -0,0 +1,139 @@
+import contextvars
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+# Set only while a profiled request runs; everything else sees None and skips profiling
+_active: contextvars.ContextVar[Optional["SamplingProfiler"]] = contextvars.ContextVar("active_profiler", default=None)
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    # Last two path parts are enough to tell backend/vector_store.py from chromadb/api/...
+    path = "/".join(code.co_filename.replace("\\", "/").split("/")[-2:])
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ",")
+
+
+class SamplingProfiler:
+    """Samples the stacks of registered threads into collapsed-stack counts
+
+    Threads join while they run a timed() stage for a profiled request.
+    The event loop thread is never registered, since every other request
+    in flight runs on it too. The output is the collapsed format read by
+    flamegraph.pl and speedscope: one "root;...;leaf count" line per
+    distinct stack.
+    """
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.profile_id = uuid.uuid4().hex
+        self.interval = interval_ms / 1000
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._threads = Counter()  # thread id -> active registrations
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name=f"profiler-{self.profile_id[:8]}", daemon=True)
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._sampler.start()
+
+    def stop(self):
+        if not self._stop.is_set():
+            self._stop.set()
+            self._sampler.join()
+            self.duration = time.perf_counter() - self.started_at
+
+    def add_thread(self, thread_id: int):
+        with self._lock:
+            self._threads[thread_id] += 1
+
+    def remove_thread(self, thread_id: int):
+        with self._lock:
+            self._threads[thread_id] -= 1
+            if self._threads[thread_id] <= 0:
+                del self._threads[thread_id]
+
+    @contextmanager
+    def thread_scope(self):
+        thread_id = threading.get_ident()
+        self.add_thread(thread_id)
+        try:
+            yield
+        finally:
+            self.remove_thread(thread_id)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        frames = sys._current_frames()
+        with self._lock:
+            thread_ids = list(self._threads)
+        for thread_id in thread_ids:
+            frame = frames.get(thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def save(self, directory: Optional[str] = None) -> str:
+        directory = directory or PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.profile_id}.folded")
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+        return path
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    """Profiling is admin-only and stays off entirely unless ADMIN_TOKEN is set"""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token or not token:
+        return False
+    return hmac.compare_digest(token.encode(), admin_token.encode())
+
+
+def is_requested(headers, query_params) -> bool:
+    return headers.get("X-Profile", "").lower() in ("1", "true") or query_params.get("profile") == "1"
+
+
+def start() -> SamplingProfiler:
+    """Start a profiler for the current request context"""
+    profiler = SamplingProfiler()
+    _active.set(profiler)
+    profiler.start()
+    return profiler
+
+
+def active() -> Optional[SamplingProfiler]:
+    return _active.get()
+
+
+def profile_path(profile_id: str, directory: Optional[str] = None) -> Optional[str]:
+    """Path of a stored profile, or None for unknown or malformed IDs"""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(directory or PROFILE_DIR, f"{profile_id}.folded")
+    return path if os.path.exists(path) else None
@@ -0,0 +1,111 @@
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .exact_index import ExactIndex
+
+
+class _GrowableArray:
+    """2-D numpy buffer that grows by doubling, so appends are amortized O(1)"""
+
+    def __init__(self, dim: int, dtype, data: Optional[np.ndarray] = None):
+        self.dim = dim
+        self.dtype = dtype
+        self.size = 0
+        self._buffer = np.empty((0, dim), dtype=dtype)
+        if data is not None and len(data):
+            self.append(data)
+
+    def append(self, rows: np.ndarray):
+        needed = self.size + len(rows)
+        if needed > len(self._buffer):
+            capacity = max(needed, 2 * len(self._buffer), 1024)
+            buffer = np.empty((capacity, self.dim), dtype=self.dtype)
+            buffer[:self.size] = self._buffer[:self.size]
+            self._buffer = buffer
+        self._buffer[self.size:needed] = rows
+        self.size = needed
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._buffer[:self.size]
+
+
+def quantize_int8(vectors: np.ndarray):
+    """Symmetric per-vector int8 quantization; returns (codes, scales)"""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class QuantizedIndex(ExactIndex):
+    """Compact vector index: int8 codes in RAM, exact float32 vectors on disk
+
+    Candidates are scored against the int8 codes, then the best
+    rerank_factor * n_results are re-ranked with the exact vectors, which
+    are memory-mapped and only touched for those rows. Only RAM shrinks,
+    about 4x: the codes are stored next to the float32 vectors, so the
+    index takes about a quarter more disk than the exact one.
+    """
+
+    SUBDIRECTORY = "quantized"
+    BLOCK_ROWS = 16384
+
+    def __init__(self, persist_directory: str, dim: int = 384, rerank_factor: int = 4):
+        self.rerank_factor = rerank_factor
+        directory = os.path.join(persist_directory, self.SUBDIRECTORY)
+        self._codes_path = os.path.join(directory, "codes.i8")
+        self._scales_path = os.path.join(directory, "scales.f32")
+        super().__init__(persist_directory, dim)
+
+    def _row_files(self) -> List[Tuple[str, int]]:
+        return super()._row_files() + [(self._codes_path, self.dim), (self._scales_path, 4)]
+
+    def _load_rows(self, count: int):
+        codes = np.fromfile(self._codes_path, dtype=np.int8, count=count * self.dim) if count else np.empty(0, np.int8)
+        scales = np.fromfile(self._scales_path, dtype=np.float32, count=count) if count else np.empty(0, np.float32)
+        self._codes = _GrowableArray(self.dim, np.int8, codes.reshape(count, self.dim))
+        self._scales = _GrowableArray(1, np.float32, scales.reshape(count, 1))
+
+    def _append_rows(self, vectors: np.ndarray):
+        codes, scales = quantize_int8(vectors)
+        super()._append_rows(vectors)
+        with open(self._codes_path, "ab") as f:
+            codes.tofile(f)
+        with open(self._scales_path, "ab") as f:
+            scales.tofile(f)
+        self._codes.append(codes)
+        self._scales.append(scales.reshape(-1, 1))
+
+    def _approximate_scores(self, queries: np.ndarray) -> np.ndarray:
+        """(queries, rows) scores against the int8 codes; each block is widened once for the whole batch"""
+        codes = self._codes.data
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), self.BLOCK_ROWS):
+            block = codes[start:start + self.BLOCK_ROWS].astype(np.float32)
+            scores[:, start:start + len(block)] = queries @ block.T
+        return scores * self._scales.data[:, 0]
+
+    def _search(self, queries: np.ndarray, n: int, allowed: Optional[np.ndarray] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        exact = self._exact_vectors()
+        total = len(exact) if allowed is None else int(allowed.sum())
+        # Shortlist on int8 codes, then re-rank with exact vectors
+        approximate = self._approximate_scores(queries)
+        if allowed is not None:
+            approximate[:, ~allowed] = -np.inf
+        matches = []
+        for query, approx in zip(queries, approximate):
+            shortlist = min(total, n * self.rerank_factor)
+            candidates = np.argpartition(-approx, shortlist - 1)[:shortlist]
+            candidates.sort()
+            exact_scores = exact[candidates] @ query
+            order = np.argsort(-exact_scores)[:n]
+            matches.append((candidates[order], exact_scores[order]))
+        return matches
+
+    def memory_usage(self) -> Dict:
+        usage = super().memory_usage()
+        usage["resident_bytes"] = int(self._codes.data.nbytes + self._scales.data.nbytes)
+        return usage
@@ -0,0 +1,128 @@
+"""Rebuild the vector index from the stored uploads
+
+Changing VECTOR_INDEX_MODE, VECTOR_SHARDS or VECTOR_SHARD_BY, or the
+embedding model, needs every document indexed again. This reads each
+document's PDF back from the blob store (or its file_path, for documents
+not yet migrated) into a new, empty index directory:
+
+    VECTOR_SHARDS=4 python -m backend.reindex --persist-directory ./chroma_db.new
+
+The running node keeps serving from its old directory, and the metadata
+store is left alone, since it describes that old index. The new chunk
+counts are recorded in the new directory instead; swap the two
+directories once this finishes, then apply them:
+
+    python -m backend.reindex --apply-metadata --persist-directory ./chroma_db
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from collections import Counter
+from typing import Dict
+
+from .blob_store import BlobStore
+
+logger = logging.getLogger(__name__)
+
+# Metadata updates a re-index leaves in its directory, applied after the swap
+PENDING_METADATA = "reindex_metadata.jsonl"
+
+
+def reindex_documents(vector_store, pdf_processor, metadata_store, blob_store: BlobStore, pending_path: str) -> Dict:
+    """Index every document in metadata_store into vector_store; returns a summary
+
+    metadata_store is only read. Each document's new vector_ids,
+    chunks_count and cause_counts go to pending_path, one JSON line each,
+    for apply_metadata once the new index is in place.
+    """
+    began = time.perf_counter()
+    indexed = failed = chunks = 0
+    with open(pending_path, "w", encoding="utf-8") as pending:
+        for document in metadata_store.get_all_documents("documents"):
+            document_id = document["_id"]
+            try:
+                with blob_store.document_path(document) as pdf_path:
+                    parsed = pdf_processor.process_pdf(pdf_path, {
+                        "title": document.get("title", "Untitled"),
+                        "description": document.get("description", ""),
+                        "document_id": document_id,
+                        "category": document.get("category", "legal"),
+                    })
+            except FileNotFoundError as e:
+                logger.error("❌ %s", e)
+                failed += 1
+                continue
+            vector_ids = vector_store.add_documents(parsed)
+            if not vector_ids:
+                logger.error("❌ Nothing indexed for %s", document_id)
+                failed += 1
+                continue
+            pending.write(json.dumps({
+                "_id": document_id,
+                "vector_ids": vector_ids,
+                "chunks_count": len(vector_ids),
+                "cause_counts": dict(Counter(chunk["cause"] for chunk in parsed))
+            }) + "\n")
+            indexed += 1
+            chunks += len(vector_ids)
+
+    summary = {
+        "documents": indexed,
+        "failed": failed,
+        "chunks": chunks,
+        "seconds": round(time.perf_counter() - began, 2),
+    }
+    logger.info("✅ Re-indexed %s documents (%s chunks, %s failed) in %ss", indexed, chunks, failed, summary["seconds"])
+    return summary
+
+
+def apply_metadata(metadata_store, pending_path: str) -> int:
+    """Write the updates a re-index recorded into metadata_store, then remove pending_path
+
+    Returns the number of documents updated; documents deleted since the
+    re-index are skipped.
+    """
+    updated = 0
+    with open(pending_path, "r", encoding="utf-8") as pending:
+        for line in pending:
+            fields = json.loads(line)
+            if metadata_store.update_document("documents", fields.pop("_id"), fields):
+                updated += 1
+    os.remove(pending_path)
+    logger.info("✅ Applied re-indexed metadata to %s documents", updated)
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the vector index from the stored uploads")
+    parser.add_argument("--persist-directory", required=True, help="New, empty directory for the rebuilt index")
+    parser.add_argument("--apply-metadata", action="store_true",
+                        help="Once the rebuilt index is swapped in at --persist-directory, update the metadata store to match")
+    args = parser.parse_args()
+
+    from .logging_config import configure_logging
+    configure_logging()
+
+    from .database import mongo_db
+    pending_path = os.path.join(args.persist_directory, PENDING_METADATA)
+    if args.apply_metadata:
+        if not os.path.exists(pending_path):
+            raise SystemExit(f"No {PENDING_METADATA} in {args.persist_directory}; nothing to apply")
+        apply_metadata(mongo_db, pending_path)
+        return
+
+    if os.path.isdir(args.persist_directory) and os.listdir(args.persist_directory):
+        raise SystemExit(f"{args.persist_directory} is not empty; re-index into a new directory")
+    if os.getenv("INDEX_OWNER_ADDRESS"):
+        raise SystemExit("Unset INDEX_OWNER_ADDRESS: re-indexing writes its own index directory")
+
+    from .document_processor import PDFProcessor
+    from .vector_store import VectorStore
+    vector_store = VectorStore(args.persist_directory)
+    reindex_documents(vector_store, PDFProcessor(vector_store.embedder), mongo_db, BlobStore(), pending_path)
+
+
+if __name__ == "__main__":
+    main()
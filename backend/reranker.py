@@ -0,0 +1,138 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .logging_config import timed
+from .metrics import RERANK_FALLBACKS, record_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+class CrossEncoderReranker:
+    """Second-stage scoring of (query, chunk) pairs with a cross-encoder
+
+    The model loads in the background on the first re-ranked check
+    (RERANK=0 turns re-ranking off), so no request waits on it; until it is
+    ready, or if it cannot be loaded, results keep their bi-encoder order.
+    With RERANK_PRELOAD=1 it is loaded at startup instead, before gunicorn
+    forks, so the workers share one copy. Pairs are scored in
+    batches against a deadline, and scores are kept in an LRU cache, so
+    repeated checks of the same text cost nothing.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, cache_size: Optional[int] = None,
+                 batch_size: int = 16, model=None):
+        self.model_name = model_name or os.getenv("RERANK_MODEL", DEFAULT_RERANK_MODEL)
+        self.cache_size = cache_size if cache_size is not None else int(os.getenv("RERANK_CACHE_SIZE", "10000"))
+        self.batch_size = batch_size
+        self.model = model
+        self.enabled = os.getenv("RERANK", "1") != "0"
+        self.preload_at_startup = os.getenv("RERANK_PRELOAD", "0") == "1"
+        self.failed = False
+        # Duration of the last scored batch, to predict whether the next fits
+        self.batch_seconds = 0.0
+        self._cache: "OrderedDict[bytes, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loader: Optional[threading.Thread] = None
+
+    def _load(self):
+        try:
+            from sentence_transformers import CrossEncoder
+            model = CrossEncoder(self.model_name)
+            # The first call is several times slower; keep it out of batch timings
+            model.predict([("warm up", "warm up")] * self.batch_size, batch_size=self.batch_size, show_progress_bar=False)
+            self.model = model
+            logger.info("✅ Re-ranking model loaded: %s", self.model_name)
+        except Exception as e:
+            self.failed = True
+            logger.error("❌ Could not load re-ranking model %s: %s", self.model_name, e)
+
+    def preload(self):
+        """Load the model now, in this thread, so the first re-ranked checks need not fall back"""
+        if self.enabled and self.model is None and not self.failed:
+            self._load()
+
+    def after_fork(self):
+        """Forget a load the parent had started; its thread was not copied by fork
+
+        The worker's first re-ranked check starts its own.
+        """
+        self._lock = threading.Lock()
+        if self.model is None:
+            self._loader = None
+
+    def ready(self) -> bool:
+        """True once the model is loaded; starts loading it if that has not begun"""
+        if self.model is not None:
+            return True
+        if not self.enabled:
+            return False
+        with self._lock:
+            if self._loader is None:
+                self._loader = threading.Thread(target=self._load, name="reranker-load", daemon=True)
+                self._loader.start()
+        return False
+
+    @staticmethod
+    def _key(query: str, text: str) -> bytes:
+        return hashlib.blake2b(f"{query}\x00{text}".encode(), digest_size=16).digest()
+
+    def _cached(self, key: bytes) -> Optional[float]:
+        with self._lock:
+            score = self._cache.get(key)
+            if score is not None:
+                self._cache.move_to_end(key)
+        record_cache("rerank", score is not None)
+        return score
+
+    def _store(self, key: bytes, score: float):
+        with self._lock:
+            self._cache[key] = score
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def rerank(self, query: str, matches: List[Dict], deadline: float) -> Tuple[List[Dict], bool]:
+        """Matches ordered by cross-encoder score, and whether that happened
+
+        deadline is a time.perf_counter() value. A batch is only started if
+        the last one, from this call or an earlier one, suggests it will
+        finish in time; otherwise the matches come back unchanged, in
+        bi-encoder order.
+        """
+        if not matches:
+            return matches, True
+        if self.failed or not self.ready():
+            RERANK_FALLBACKS.inc(reason="unavailable")
+            return matches, False
+
+        keys = [self._key(query, match["matching_text"]) for match in matches]
+        scores = [self._cached(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+
+        with timed("rerank"):
+            for start in range(0, len(missing), self.batch_size):
+                if time.perf_counter() + self.batch_seconds > deadline:
+                    RERANK_FALLBACKS.inc(reason="budget")
+                    return matches, False
+                batch = missing[start:start + self.batch_size]
+                began = time.perf_counter()
+                batch_scores = self.model.predict(
+                    [(query, matches[i]["matching_text"]) for i in batch],
+                    batch_size=self.batch_size,
+                    show_progress_bar=False
+                )
+                self.batch_seconds = time.perf_counter() - began
+                for i, score in zip(batch, batch_scores):
+                    scores[i] = float(score)
+                    self._store(keys[i], scores[i])
+
+        ranked = [dict(match, rerank_score=round(score, 4)) for match, score in zip(matches, scores)]
+        ranked.sort(key=lambda match: match["rerank_score"], reverse=True)
+        return ranked, True
@@ -0,0 +1,209 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from .metrics import SCHEDULER_ACTIVE, SCHEDULER_QUEUED, SCHEDULER_REJECTIONS, SCHEDULER_WAIT_SECONDS
+
+# Work classes, in priority order
+QUERY = "query"
+INGEST = "ingest"
+
+
+class Overloaded(Exception):
+    """Raised by admit when a work class already has its maximum queued"""
+
+    def __init__(self, work_class: str, retry_after: int):
+        super().__init__(f"Too much {work_class} work queued; retry in {retry_after}s")
+        self.work_class = work_class
+        self.retry_after = retry_after
+
+
+class _WorkClass:
+    def __init__(self, name: str, concurrency: int, queue_limit: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_limit = queue_limit
+        self.queued = 0
+        self.active = 0
+        # Moving average of how long one unit of work holds a slot
+        self.service_seconds = 0.0
+
+
+class Ticket:
+    """An admitted unit of work; entering it waits for a slot, leaving frees it
+
+    A ticket that is never entered must be released, or it keeps its
+    place in the queue.
+    """
+
+    def __init__(self, scheduler: "PriorityScheduler", work_class: _WorkClass):
+        self.scheduler = scheduler
+        self.work_class = work_class
+        self.started: Optional[float] = None
+        self.done = False
+
+    def __enter__(self):
+        self.scheduler._start(self)
+        return self
+
+    async def wait(self):
+        """Wait for a slot on the event loop, without tying up a thread; release it afterwards"""
+        await self.scheduler._start_async(self)
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def release(self):
+        self.scheduler._finish(self)
+
+
+class PriorityScheduler:
+    """Admission control and priority between interactive queries and ingestion
+
+    Each work class has its own concurrency limit and queue limit. Work
+    past the queue limit is refused straight away with Overloaded, whose
+    retry_after estimates when a slot will be free. Queries come first:
+    ingestion does not start while queries are waiting, and running
+    ingestion pauses at its checkpoints (between pages and embedding
+    batches) while queries are in flight or one finished in the last
+    QUERY_GRACE seconds, for at most max_pause_ms so it still makes
+    progress under constant query load.
+    """
+
+    # A client sending checks back to back leaves only short gaps between them
+    QUERY_GRACE = 0.05
+
+    def __init__(self, query_concurrency: Optional[int] = None, query_queue_limit: Optional[int] = None,
+                 ingest_concurrency: Optional[int] = None, ingest_queue_limit: Optional[int] = None,
+                 max_pause_ms: Optional[float] = None):
+        def setting(value, name, default):
+            return value if value is not None else int(os.getenv(name, default))
+
+        self.classes: Dict[str, _WorkClass] = {
+            QUERY: _WorkClass(
+                QUERY,
+                setting(query_concurrency, "QUERY_CONCURRENCY", "4"),
+                setting(query_queue_limit, "QUERY_QUEUE_LIMIT", "32")
+            ),
+            INGEST: _WorkClass(
+                INGEST,
+                setting(ingest_concurrency, "INGEST_CONCURRENCY", "1"),
+                setting(ingest_queue_limit, "INGEST_QUEUE_LIMIT", "8")
+            ),
+        }
+        self.max_pause = setting(max_pause_ms, "INGEST_MAX_PAUSE_MS", "2000") / 1000
+        self.condition = threading.Condition()
+        # (loop, future) of tickets waiting on an event loop, woken with the condition
+        self._async_waiters = []
+        self.last_query_finished = 0.0
+
+    def admit(self, work_class: str) -> Ticket:
+        """Reserve a place in work_class's queue, or raise Overloaded"""
+        cls = self.classes[work_class]
+        with self.condition:
+            if cls.queued >= cls.queue_limit:
+                SCHEDULER_REJECTIONS.inc(work_class=cls.name)
+                raise Overloaded(cls.name, self._retry_after(cls))
+            cls.queued += 1
+            self._publish(cls)
+        return Ticket(self, cls)
+
+    def _retry_after(self, cls: _WorkClass) -> int:
+        """Seconds until the queue ahead has likely drained, from the average service time"""
+        service = cls.service_seconds or 1.0
+        return max(1, min(300, math.ceil(service * (cls.queued + 1) / cls.concurrency)))
+
+    def _can_start(self, cls: _WorkClass) -> bool:
+        if cls.active >= cls.concurrency:
+            return False
+        if cls.name == INGEST and self.classes[QUERY].queued:
+            return False
+        return True
+
+    def _start(self, ticket: Ticket):
+        cls = ticket.work_class
+        began = time.perf_counter()
+        with self.condition:
+            while not self._can_start(cls):
+                self.condition.wait()
+            self._take_slot(ticket)
+        SCHEDULER_WAIT_SECONDS.observe(ticket.started - began, work_class=cls.name)
+
+    async def _start_async(self, ticket: Ticket):
+        cls = ticket.work_class
+        began = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.condition:
+                if self._can_start(cls):
+                    self._take_slot(ticket)
+                    break
+                waiter = (loop, loop.create_future())
+                self._async_waiters.append(waiter)
+            try:
+                await waiter[1]
+            finally:
+                with self.condition:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+        SCHEDULER_WAIT_SECONDS.observe(ticket.started - began, work_class=cls.name)
+
+    def _take_slot(self, ticket: Ticket):
+        cls = ticket.work_class
+        cls.queued -= 1
+        cls.active += 1
+        ticket.started = time.perf_counter()
+        self._publish(cls)
+
+    def _notify_all(self):
+        """Wake every waiter, thread or coroutine; call with the condition held"""
+        self.condition.notify_all()
+        for loop, future in self._async_waiters:
+            loop.call_soon_threadsafe(_wake, future)
+        self._async_waiters.clear()
+
+    def _finish(self, ticket: Ticket):
+        cls = ticket.work_class
+        with self.condition:
+            if ticket.done:
+                return
+            ticket.done = True
+            if ticket.started is None:
+                cls.queued -= 1
+            else:
+                cls.active -= 1
+                if cls.name == QUERY:
+                    self.last_query_finished = time.monotonic()
+                elapsed = time.perf_counter() - ticket.started
+                cls.service_seconds = elapsed if not cls.service_seconds else 0.8 * cls.service_seconds + 0.2 * elapsed
+            self._publish(cls)
+            self._notify_all()
+
+    def _publish(self, cls: _WorkClass):
+        SCHEDULER_QUEUED.set(cls.queued, work_class=cls.name)
+        SCHEDULER_ACTIVE.set(cls.active, work_class=cls.name)
+
+    def yield_to_queries(self):
+        """Checkpoint for ingestion: wait while queries are busy, up to max_pause"""
+        query = self.classes[QUERY]
+        deadline = time.monotonic() + self.max_pause
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                if query.active or query.queued:
+                    self.condition.wait(deadline - now)
+                elif now - self.last_query_finished < self.QUERY_GRACE:
+                    self.condition.wait(min(deadline, self.last_query_finished + self.QUERY_GRACE) - now)
+                else:
+                    break
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
@@ -0,0 +1,110 @@
+import heapq
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SHARD_BY_DOCUMENT = "document_id"
+SHARD_BY_CATEGORY = "category"
+
+
+def shard_for(value: str, shards: int) -> int:
+    """Stable shard number for a partition key; unlike hash() it survives restarts"""
+    return zlib.crc32(str(value).encode()) % shards
+
+
+def _hits(distances: List[float], shard: int):
+    return ((distance, shard, i) for i, distance in enumerate(distances))
+
+
+class ShardedCollection:
+    """N collections behind the single-collection API VectorStore uses
+
+    Chunks are routed by hash of document_id or category metadata, so a
+    document always lands in one shard. Queries go to every shard at once
+    on a thread pool and the per-shard results, each already sorted by
+    distance, are heap-merged into one top-k. With shard_by="category",
+    a query filtered to one category only touches that category's shard.
+    """
+
+    def __init__(self, shards: List, shard_by: str = SHARD_BY_DOCUMENT):
+        if shard_by not in (SHARD_BY_DOCUMENT, SHARD_BY_CATEGORY):
+            raise ValueError(f"shard_by must be '{SHARD_BY_DOCUMENT}' or '{SHARD_BY_CATEGORY}', got '{shard_by}'")
+        self.shards = shards
+        self.shard_by = shard_by
+        self.executor = ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix="shard")
+
+    def shard_of(self, metadata: Dict) -> int:
+        return shard_for(metadata.get(self.shard_by, ""), len(self.shards))
+
+    def _targets(self, where: Optional[Dict]) -> List:
+        category = (where or {}).get(SHARD_BY_CATEGORY)
+        if self.shard_by == SHARD_BY_CATEGORY and isinstance(category, str):
+            return [self.shards[shard_for(category, len(self.shards))]]
+        return self.shards
+
+    def add(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        embeddings = np.asarray(embeddings)
+        rows_by_shard: Dict[int, List[int]] = {}
+        for row, metadata in enumerate(metadatas):
+            rows_by_shard.setdefault(self.shard_of(metadata), []).append(row)
+
+        futures = [
+            self.executor.submit(
+                self.shards[shard].add,
+                ids=[ids[i] for i in rows],
+                embeddings=embeddings[rows],
+                documents=[documents[i] for i in rows],
+                metadatas=[metadatas[i] for i in rows]
+            )
+            for shard, rows in rows_by_shard.items()
+        ]
+        for future in futures:
+            future.result()
+
+    def query(self, query_embeddings, n_results: int = 5, include=None, where: Optional[Dict] = None):
+        include = list(include or ["documents", "metadatas", "distances"])
+        if "distances" not in include:
+            include.append("distances")
+        kwargs = {"query_embeddings": query_embeddings, "n_results": n_results, "include": include}
+        if where:
+            kwargs["where"] = where
+
+        shard_results = list(self.executor.map(lambda shard: shard.query(**kwargs), self._targets(where)))
+
+        fields = ["ids"] + [field for field in include if field != "embeddings"]
+        merged = {field: [] for field in fields}
+        for q in range(len(np.atleast_2d(query_embeddings))):
+            # Each shard's hits are sorted by distance already, so a k-way merge is enough
+            ranked = heapq.merge(*(
+                _hits(results["distances"][q], s) for s, results in enumerate(shard_results)
+            ))
+            top = list(islice(ranked, n_results))
+            for field in fields:
+                merged[field].append([shard_results[s][field][q][i] for _, s, i in top])
+        return merged
+
+    def get(self, where: Optional[Dict] = None, include=None):
+        kwargs = {"include": include} if include else {}
+        if where:
+            kwargs["where"] = where
+        shard_results = list(self.executor.map(lambda shard: shard.get(**kwargs), self._targets(where)))
+
+        fields = ["ids"] + [field for field in (include or ["documents", "metadatas"]) if field != "embeddings"]
+        merged = {field: [item for results in shard_results for item in results[field]] for field in fields}
+        if include and "embeddings" in include:
+            blocks = [np.asarray(results["embeddings"], dtype=np.float32) for results in shard_results if len(results["ids"])]
+            merged["embeddings"] = np.concatenate(blocks) if blocks else np.empty((0, 0), dtype=np.float32)
+        return merged
+
+    def count(self) -> int:
+        return sum(self.executor.map(lambda shard: shard.count(), self.shards))
+
+    def memory_usage(self) -> Dict:
+        usage: Dict[str, int] = {}
+        for shard_usage in self.executor.map(lambda shard: shard.memory_usage(), self.shards):
+            for key, value in shard_usage.items():
+                usage[key] = usage.get(key, 0) + value
+        return usage
@@ -0,0 +1,258 @@
+"""Offline similarity join between two sets of indexed chunks
+
+For audit runs every clause of one set (say all contracts) is compared with
+every clause of another (say all regulations), keeping for each left chunk
+its top_k right chunks at or above the threshold:
+
+    python -m backend.similarity_join --left category=contract --right category=regulation \\
+        --threshold 0.75 --top-k 5 --output audit.parquet
+
+The stored embeddings are read from the collection, so nothing is encoded
+again. Blocks of left chunks are scored against blocks of right chunks with
+matrix multiplies on a thread pool, one thread per core (numpy releases the
+GIL), and matches are written out as each left block finishes, to Parquet
+(needs pyarrow) or CSV.
+"""
+import argparse
+import csv
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["left_chunk_id", "left_document_id", "right_chunk_id", "right_document_id", "similarity", "rank"]
+
+
+def parse_filter(text: Optional[str]) -> Optional[Dict]:
+    """Where filter for key=value, e.g. category=contract; empty or "all" selects every chunk"""
+    if not text or text == "all":
+        return None
+    key, separator, value = text.partition("=")
+    if not separator or not key or not value:
+        raise ValueError(f"Expected a filter like category=contract, got '{text}'")
+    return {key: value}
+
+
+class ChunkSet:
+    """Unit embeddings plus chunk and document ids of the chunks matching a filter"""
+
+    def __init__(self, collection, where: Optional[Dict] = None):
+        kwargs = {"include": ["embeddings", "metadatas"]}
+        if where:
+            kwargs["where"] = where
+        results = collection.get(**kwargs)
+        self.ids: List[str] = list(results["ids"])
+        self.document_ids: List[str] = [(m or {}).get("document_id", "") for m in results["metadatas"]]
+        if not self.ids:
+            self.vectors = np.empty((0, 0), dtype=np.float32)
+            return
+        vectors = np.asarray(results["embeddings"], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.vectors = np.ascontiguousarray(vectors / norms)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class SimilarityJoin:
+    """Thresholded top-k join of every left chunk against all right chunks
+
+    Chunks are never matched with themselves, and with skip_same_document
+    not with other chunks of their own document either, which is what a
+    set joined with itself needs.
+    """
+
+    BLOCK_ROWS = 512
+    RIGHT_BLOCK_ROWS = 8192
+
+    def __init__(self, left: ChunkSet, right: ChunkSet, threshold: float = 0.75, top_k: int = 5,
+                 skip_same_document: bool = False, workers: Optional[int] = None):
+        self.left = left
+        self.right = right
+        self.threshold = threshold
+        self.top_k = top_k
+        self.skip_same_document = skip_same_document
+        self.workers = workers or os.cpu_count() or 1
+
+        # Integer codes, so self-matches are masked with one vectorized compare per block
+        chunk_codes = {}
+        self._left_chunks = np.array([chunk_codes.setdefault(i, len(chunk_codes)) for i in left.ids], dtype=np.int64)
+        self._right_chunks = np.array([chunk_codes.setdefault(i, len(chunk_codes)) for i in right.ids], dtype=np.int64)
+        document_codes = {}
+        self._left_documents = np.array([document_codes.setdefault(d, len(document_codes)) for d in left.document_ids], dtype=np.int64)
+        self._right_documents = np.array([document_codes.setdefault(d, len(document_codes)) for d in right.document_ids], dtype=np.int64)
+
+    def _join_block(self, start: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(left rows, right rows, similarities, ranks) of the matches for one block of left chunks"""
+        stop = min(start + self.BLOCK_ROWS, len(self.left))
+        queries = self.left.vectors[start:stop]
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+
+        for right_start in range(0, len(self.right), self.RIGHT_BLOCK_ROWS):
+            right_stop = min(right_start + self.RIGHT_BLOCK_ROWS, len(self.right))
+            scores = queries @ self.right.vectors[right_start:right_stop].T
+            same = self._left_chunks[start:stop, None] == self._right_chunks[None, right_start:right_stop]
+            if self.skip_same_document:
+                same |= self._left_documents[start:stop, None] == self._right_documents[None, right_start:right_stop]
+            scores[same] = -np.inf
+
+            k = min(self.top_k, scores.shape[1])
+            rows = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, rows, axis=1)], axis=1)
+            best_rows = np.concatenate([best_rows, rows + right_start], axis=1)
+            if best_scores.shape[1] > self.top_k:
+                keep = np.argpartition(-best_scores, self.top_k - 1, axis=1)[:, :self.top_k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        # Rows are sorted best first, so the matches above threshold are a prefix of each
+        left_rows, ranks = np.nonzero(best_scores >= self.threshold)
+        return left_rows + start, best_rows[left_rows, ranks], best_scores[left_rows, ranks], ranks + 1
+
+    def blocks(self) -> Iterator[Dict[str, list]]:
+        """Matches one left block at a time, in left order, as columns named in COLUMNS"""
+        if not len(self.left) or not len(self.right):
+            return
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="join") as executor:
+            # Keep a couple of blocks per worker in flight, so memory stays bounded
+            pending = deque()
+            for start in range(0, len(self.left), self.BLOCK_ROWS):
+                pending.append(executor.submit(self._join_block, start))
+                if len(pending) >= 2 * self.workers:
+                    yield self._columns(*pending.popleft().result())
+            while pending:
+                yield self._columns(*pending.popleft().result())
+
+    def _columns(self, left_rows: np.ndarray, right_rows: np.ndarray, scores: np.ndarray, ranks: np.ndarray) -> Dict[str, list]:
+        return {
+            "left_chunk_id": [self.left.ids[i] for i in left_rows],
+            "left_document_id": [self.left.document_ids[i] for i in left_rows],
+            "right_chunk_id": [self.right.ids[i] for i in right_rows],
+            "right_document_id": [self.right.document_ids[i] for i in right_rows],
+            "similarity": [round(float(s), 4) for s in scores],
+            "rank": ranks.tolist(),
+        }
+
+
+class CsvMatchWriter:
+    def __init__(self, path: str):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMNS)
+
+    def write(self, columns: Dict[str, list]):
+        self._writer.writerows(zip(*(columns[name] for name in COLUMNS)))
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetMatchWriter:
+    def __init__(self, path: str):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet output needs pyarrow: pip install pyarrow, or write to a .csv file")
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema([
+            ("left_chunk_id", pyarrow.string()),
+            ("left_document_id", pyarrow.string()),
+            ("right_chunk_id", pyarrow.string()),
+            ("right_document_id", pyarrow.string()),
+            ("similarity", pyarrow.float32()),
+            ("rank", pyarrow.int32()),
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+
+    def write(self, columns: Dict[str, list]):
+        self._writer.write_table(self._pyarrow.Table.from_pydict(columns, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def open_writer(path: str):
+    """Parquet for a .parquet path, CSV otherwise"""
+    return ParquetMatchWriter(path) if path.endswith(".parquet") else CsvMatchWriter(path)
+
+
+def run_join(collection, left_where: Optional[Dict], right_where: Optional[Dict], output: str,
+             threshold: float = 0.75, top_k: int = 5, skip_same_document: bool = False,
+             workers: Optional[int] = None) -> Dict:
+    """Join the two chunk sets of collection into output; returns a summary"""
+    began = time.perf_counter()
+    left = ChunkSet(collection, left_where)
+    right = left if right_where == left_where else ChunkSet(collection, right_where)
+    logger.info("📊 Joining %s left chunks against %s right chunks", len(left), len(right))
+
+    join = SimilarityJoin(left, right, threshold=threshold, top_k=top_k,
+                          skip_same_document=skip_same_document, workers=workers)
+    writer = open_writer(output)
+    matches = 0
+    try:
+        for columns in join.blocks():
+            writer.write(columns)
+            matches += len(columns["similarity"])
+    finally:
+        writer.close()
+
+    summary = {
+        "left_chunks": len(left),
+        "right_chunks": len(right),
+        "matches": matches,
+        "seconds": round(time.perf_counter() - began, 2),
+        "output": output,
+    }
+    logger.info("✅ Similarity join wrote %s matches to %s in %ss", matches, output, summary["seconds"])
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare every chunk of one document set with another")
+    parser.add_argument("--left", default="", help="Left set filter, e.g. category=contract (default: all chunks)")
+    parser.add_argument("--right", default="", help="Right set filter, e.g. category=regulation (default: all chunks)")
+    parser.add_argument("--output", required=True, help="Output file; .parquet needs pyarrow, anything else is CSV")
+    parser.add_argument("--threshold", type=float, default=0.75)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--skip-same-document", action="store_true", help="Ignore matches within one document")
+    parser.add_argument("--workers", type=int, default=None, help="Threads (default: one per core)")
+    parser.add_argument("--persist-directory", default="./chroma_db")
+    args = parser.parse_args()
+
+    from .logging_config import configure_logging
+    configure_logging()
+
+    owner_address = os.getenv("INDEX_OWNER_ADDRESS")
+    if owner_address:
+        from .index_owner import RemoteCollection, authkey_from_env
+        collection = RemoteCollection(owner_address, authkey_from_env())
+    else:
+        from .vector_store import open_collection
+        _, collection = open_collection(args.persist_directory, os.getenv("VECTOR_INDEX_MODE", "chroma").lower())
+
+    run_join(
+        collection,
+        parse_filter(args.left),
+        parse_filter(args.right),
+        args.output,
+        threshold=args.threshold,
+        top_k=args.top_k,
+        skip_same_document=args.skip_same_document,
+        workers=args.workers
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,134 @@
-from typing import List, Dict
+from collections import Counter
+import logging
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from .vector_store import VectorStore
 from .document_processor import PDFProcessor
+from .logging_config import timed
+from .reranker import CrossEncoderReranker
+from .metrics import COMPLIANCE_CHECKS, COMPLIANCE_MATCHES, DOCUMENTS_INDEXED
+
+logger = logging.getLogger(__name__)
 
 class ComplianceChecker:
+    # Query segments embedded and searched together per streamed batch
+    SEGMENT_BATCH = 8
+    
     def __init__(self):
         self.vector_store = VectorStore()
-        self.pdf_processor = PDFProcessor()
-        print("✅ Compliance Checker initialized")
+        self.pdf_processor = PDFProcessor(self.vector_store.embedder)
+        self.reranker = CrossEncoderReranker()
+        if self.reranker.preload_at_startup:
+            self.reranker.preload()
+        logger.info("✅ Compliance Checker initialized")
     
-    def index_document(self, pdf_path: str, metadata: Dict) -> Dict:
-        """Index a new document for similarity search"""
-        print(f"📄 Indexing document: {pdf_path}")
+    def index_document(self, pdf_path: str, metadata: Dict, progress: Optional[Callable] = None) -> Dict:
+        """Index a new document for similarity search
+        
+        progress, if given, receives per-stage keyword updates from parsing,
+        splitting and embedding.
+        """
+        logger.debug("📄 Indexing document: %s", pdf_path)
         
         # Process PDF
-        chunks = self.pdf_processor.process_pdf(pdf_path, metadata)
+        chunks = self.pdf_processor.process_pdf(pdf_path, metadata, progress)
         
         if not chunks:
-            print("❌ Failed to process PDF or no text extracted")
+            logger.error("❌ Failed to process PDF or no text extracted")
+            DOCUMENTS_INDEXED.inc(result="failure")
             return {"success": False, "message": "Failed to process PDF"}
         
-        print(f"📊 Extracted {len(chunks)} text chunks")
+        logger.debug("📊 Extracted %s text chunks", len(chunks))
         
         # Add to vector store
-        vector_ids = self.vector_store.add_documents(chunks)
+        vector_ids = self.vector_store.add_documents(chunks, progress)
         
         if vector_ids:
-            print(f"✅ Successfully indexed document with {len(vector_ids)} chunks")
+            logger.info("✅ Successfully indexed document with %s chunks", len(vector_ids))
+            DOCUMENTS_INDEXED.inc(result="success")
             return {
                 "success": True,
                 "message": f"Indexed {len(chunks)} chunks",
                 "chunks_count": len(chunks),
+                "cause_counts": dict(Counter(chunk["cause"] for chunk in chunks)),
                 "vector_ids": vector_ids,
                 "document_id": metadata.get("document_id")
             }
         else:
-            print("❌ Failed to add documents to vector store")
+            logger.error("❌ Failed to add documents to vector store")
+            DOCUMENTS_INDEXED.inc(result="failure")
             return {"success": False, "message": "Failed to index document"}
     
-    def check_compliance(self, query_text: str, threshold: float = 0.7) -> Dict:
-        """Check compliance by finding similar cases"""
-        print(f"🔍 Checking compliance for query: '{query_text[:100]}...'")
+    def check_compliance(self, query_text: str, threshold: float = 0.7, top_k: int = 5, **options) -> Dict:
+        """Check compliance by finding similar cases; options are those of iter_compliance"""
+        for event, data in self.iter_compliance(query_text, threshold, top_k, **options):
+            if event == "report":
+                return data
+    
+    def iter_compliance(self, query_text: str, threshold: float = 0.7, top_k: int = 5, category: Optional[str] = None,
+                        collapse_duplicates: bool = False, rerank: bool = False, rerank_candidates: int = 20,
+                        rerank_budget_ms: float = 200) -> Iterator[Tuple[str, Dict]]:
+        """Check compliance, yielding ("match", doc) events as retrieval batches finish
         
-        # Search for similar documents
-        similar_docs = self.vector_store.similarity_search(
-            query_text, 
-            threshold=threshold
-        )
+        Long queries are split into segments the same way documents are, so a
+        whole document is searched piece by piece instead of being truncated
+        by the embedding model. category, if given, limits the search to
+        documents of that category; collapse_duplicates reports each
+        near-duplicate cluster once. With rerank, each segment's top
+        rerank_candidates are re-scored by a cross-encoder, falling back to
+        bi-encoder order once rerank_budget_ms is used up. The last event
+        is ("report", report).
+        """
+        logger.debug("🔍 Checking compliance for query: '%s...'", query_text[:100])
         
+        segments = self.pdf_processor.text_splitter.split_text(query_text) or [query_text]
+        
+        # The same chunk can match several segments; stream it once and
+        # keep its best score for the report, by the score the report is sorted on
+        best_matches = {}
+        deadline = time.perf_counter() + rerank_budget_ms / 1000
+        reranked = True
+        for start in range(0, len(segments), self.SEGMENT_BATCH):
+            batch_segments = segments[start:start + self.SEGMENT_BATCH]
+            batch_results = self.vector_store.similarity_search_batch(
+                batch_segments,
+                threshold=threshold,
+                top_k=max(top_k, rerank_candidates) if rerank else top_k,
+                category=category,
+                collapse_duplicates=collapse_duplicates
+            )
+            for segment, results in zip(batch_segments, batch_results):
+                if rerank:
+                    results, applied = self.reranker.rerank(segment, results, deadline)
+                    reranked = reranked and applied
+                    results = results[:top_k]
+                for doc in results:
+                    if collapse_duplicates and doc.get("cluster_id") is not None:
+                        key = ("cluster", doc["cluster_id"])
+                    else:
+                        key = (doc["document_id"], doc["matching_text"])
+                    previous = best_matches.get(key)
+                    if previous is None:
+                        best_matches[key] = doc
+                        yield "match", doc
+                    else:
+                        merge_score = "rerank_score" if "rerank_score" in doc and "rerank_score" in previous else "similarity_score"
+                        if doc[merge_score] > previous[merge_score]:
+                            best_matches[key] = doc
+        
+        # Cross-encoder scores only rank matches if every segment got them
+        score = "rerank_score" if rerank and reranked else "similarity_score"
+        similar_docs = sorted(best_matches.values(), key=lambda d: d[score], reverse=True)
+        COMPLIANCE_CHECKS.inc()
+        COMPLIANCE_MATCHES.inc(len(similar_docs))
+        with timed("report"):
+            report = self.build_report(query_text, threshold, similar_docs)
+        if rerank:
+            report["reranked"] = reranked
+        yield "report", report
+    
+    def build_report(self, query_text: str, threshold: float, similar_docs: List[Dict]) -> Dict:
+        """Group matches by cause and turn them into a compliance report"""
         # Group by cause
         results_by_cause = {}
         for doc in similar_docs:
@@ -91,5 +173,5 @@ class ComplianceChecker:
             "recommendations": recommendations
         }
         
-        print(f"📊 Compliance check complete: {len(similar_docs)} matches found")
-        return compliance_report
\ No newline at end of file
+        logger.debug("📊 Compliance check complete: %s matches found", len(similar_docs))
+        return compliance_report
@@ -0,0 +1,330 @@
+"""Point-in-time snapshots of the vector index, metadata and uploaded files
+
+    python -m backend.snapshot create snapshots/full.tar.gz
+    python -m backend.snapshot create snapshots/monday.tar.gz --base snapshots/full.tar.gz
+    python -m backend.snapshot verify snapshots/monday.tar.gz
+    python -m backend.snapshot restore snapshots/monday.tar.gz
+
+A snapshot is a gzip-compressed tar archive. Its first member,
+MANIFEST.json, lists every file with its size and SHA-256. An incremental
+snapshot (--base) stores only what changed since its base. Unchanged files
+point back to the base. Files that only grew, like the append-only exact
+index files, keep just their new tail. Restoring replays the chain from
+the oldest snapshot and checks every file against the manifest. The
+restored node serves straight away, because nothing is parsed or embedded
+again.
+
+Snapshots are taken under an exclusive lock on the vector directory.
+Ingestion and deletes hold the same lock shared, so a snapshot never sees
+half of an upload. Restore into a stopped node.
+"""
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .file_locks import LOCK_FILE, index_write_lock
+from .memory_store import decode_document, encode_document
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "MANIFEST.json"
+METADATA_FILE = "metadata/documents.jsonl"
+FORMAT_VERSION = 1
+
+# Sources, by their directory in the archive
+VECTORS = "vectors"
+UPLOADS = "uploads"
+
+# Never captured: the lock itself and chunked uploads still in progress
+SKIPPED_NAMES = {LOCK_FILE, ".partial"}
+
+_READ_SIZE = 1 << 20
+
+
+def _hash_file(path: str, prefix_size: Optional[int] = None) -> Tuple[str, Optional[str]]:
+    """SHA-256 of the whole file, and of its first prefix_size bytes if asked"""
+    digest = hashlib.sha256()
+    prefix_digest = None
+    remaining = prefix_size
+    with open(path, "rb") as f:
+        while True:
+            if remaining is not None and remaining <= _READ_SIZE:
+                digest.update(f.read(remaining))
+                prefix_digest = digest.hexdigest()
+                remaining = None
+            block = f.read(_READ_SIZE)
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest(), prefix_digest
+
+
+def _walk(root: str) -> List[str]:
+    """Files under root as sorted relative paths, leaving out SKIPPED_NAMES"""
+    paths = []
+    if not os.path.isdir(root):
+        return paths
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = sorted(d for d in subdirectories if d not in SKIPPED_NAMES)
+        for name in files:
+            if name not in SKIPPED_NAMES:
+                paths.append(os.path.relpath(os.path.join(directory, name), root).replace(os.sep, "/"))
+    return sorted(paths)
+
+
+def read_manifest(archive: str) -> Dict:
+    with tarfile.open(archive, "r:gz") as tar:
+        member = tar.next()
+        if member is None or member.name != MANIFEST:
+            raise ValueError(f"{archive} is not a snapshot: it does not start with {MANIFEST}")
+        return json.load(tar.extractfile(member))
+
+
+def _archive_sha256(path: str) -> str:
+    return _hash_file(path)[0]
+
+
+def _export_metadata(metadata_store, path: str) -> int:
+    documents = metadata_store.get_all_documents("documents")
+    with open(path, "w", encoding="utf-8") as f:
+        for document in sorted(documents, key=lambda d: str(d.get("_id"))):
+            f.write(encode_document(document) + "\n")
+    return len(documents)
+
+
+def create_snapshot(output: str, persist_directory: str, upload_dir: str, metadata_store,
+                    base: Optional[str] = None, compresslevel: int = 1) -> Dict:
+    """Write a snapshot archive to output, incremental if base is given; returns its manifest"""
+    began = time.perf_counter()
+    base_manifest = read_manifest(base) if base else None
+    base_files = base_manifest["files"] if base_manifest else {}
+
+    with tempfile.TemporaryDirectory() as scratch, index_write_lock(persist_directory, exclusive=True):
+        metadata_path = os.path.join(scratch, "documents.jsonl")
+        document_count = _export_metadata(metadata_store, metadata_path)
+
+        sources = {METADATA_FILE: metadata_path}
+        for prefix, root in ((VECTORS, persist_directory), (UPLOADS, upload_dir)):
+            for relative in _walk(root):
+                sources[f"{prefix}/{relative}"] = os.path.join(root, relative)
+
+        # First pass: hash everything and decide what this snapshot has to store
+        files = {}
+        for name, path in sources.items():
+            size = os.path.getsize(path)
+            previous = base_files.get(name)
+            prefix_size = previous["size"] if previous and previous["size"] < size else None
+            sha256, prefix_sha256 = _hash_file(path, prefix_size)
+            entry = {"size": size, "sha256": sha256, "stored": "full"}
+            if previous and previous["sha256"] == sha256:
+                entry["stored"] = "base"
+            elif previous and prefix_sha256 == previous["sha256"]:
+                entry["stored"] = "append"
+                entry["offset"] = previous["size"]
+            files[name] = entry
+
+        manifest = {
+            "format": FORMAT_VERSION,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "documents": document_count,
+            "base": None,
+            "files": files,
+        }
+        if base:
+            manifest["base"] = {
+                "path": os.path.relpath(os.path.abspath(base), os.path.dirname(os.path.abspath(output))),
+                "sha256": _archive_sha256(base),
+            }
+
+        # Second pass, still under the lock: the manifest, then the stored bytes
+        partial = output + ".partial"
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with tarfile.open(partial, "w:gz", compresslevel=compresslevel) as tar:
+            data = json.dumps(manifest, indent=1).encode()
+            info = tarfile.TarInfo(MANIFEST)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(data))
+
+            for name, entry in files.items():
+                if entry["stored"] == "base":
+                    continue
+                offset = entry.get("offset", 0)
+                info = tarfile.TarInfo(name)
+                info.size = entry["size"] - offset
+                info.mtime = int(time.time())
+                with open(sources[name], "rb") as f:
+                    f.seek(offset)
+                    tar.addfile(info, f)
+        os.replace(partial, output)
+
+    stored = sum(1 for entry in files.values() if entry["stored"] != "base")
+    logger.info(
+        "✅ Snapshot %s: %s files (%s stored), %s documents, %s bytes in %.1fs",
+        output, len(files), stored, document_count, os.path.getsize(output), time.perf_counter() - began
+    )
+    return manifest
+
+
+def _chain(archive: str) -> List[Tuple[str, Dict]]:
+    """(archive, manifest) from the full snapshot up to archive, checking each base's checksum"""
+    chain = []
+    while archive:
+        manifest = read_manifest(archive)
+        chain.append((archive, manifest))
+        base = manifest.get("base")
+        if not base:
+            break
+        base_path = os.path.join(os.path.dirname(os.path.abspath(archive)), base["path"])
+        if not os.path.exists(base_path):
+            raise FileNotFoundError(f"{archive} needs its base snapshot {base_path}")
+        if _archive_sha256(base_path) != base["sha256"]:
+            raise ValueError(f"Base snapshot {base_path} does not match the checksum recorded in {archive}")
+        archive = base_path
+    return list(reversed(chain))
+
+
+def _materialize(archive: str, staging: str) -> Dict:
+    """Rebuild the files of archive (and its bases) under staging; returns its manifest"""
+    chain = _chain(archive)
+    for path, manifest in chain:
+        files = manifest["files"]
+        with tarfile.open(path, "r:gz") as tar:
+            for member in tar:
+                if member.name == MANIFEST:
+                    continue
+                entry = files.get(member.name)
+                if entry is None or not member.isfile():
+                    raise ValueError(f"Unexpected member {member.name} in {path}")
+                target = os.path.join(staging, *member.name.split("/"))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "r+b" if entry["stored"] == "append" else "wb") as out:
+                    if entry["stored"] == "append":
+                        out.truncate(entry["offset"])
+                        out.seek(entry["offset"])
+                    shutil.copyfileobj(tar.extractfile(member), out, _READ_SIZE)
+        # Files this snapshot no longer has were deleted since its base
+        for name in _walk(staging):
+            if name not in files:
+                os.remove(os.path.join(staging, *name.split("/")))
+
+    manifest = chain[-1][1]
+    for name, entry in manifest["files"].items():
+        target = os.path.join(staging, *name.split("/"))
+        if not os.path.exists(target):
+            raise ValueError(f"{name} is missing from the snapshot chain of {archive}")
+        if os.path.getsize(target) != entry["size"] or _hash_file(target)[0] != entry["sha256"]:
+            raise ValueError(f"Checksum mismatch for {name} in {archive}")
+    return manifest
+
+
+def verify_snapshot(archive: str) -> Dict:
+    """Rebuild the snapshot in a scratch directory and check every file; returns its manifest"""
+    with tempfile.TemporaryDirectory() as staging:
+        return _materialize(archive, staging)
+
+
+def _is_empty(directory: str) -> bool:
+    return not _walk(directory)
+
+
+def restore_snapshot(archive: str, persist_directory: str, upload_dir: str, metadata_store, force: bool = False,
+                     blob_dir: Optional[str] = None) -> Dict:
+    """Replace the vector index, uploads and metadata with the snapshot's; returns its manifest
+
+    blob_dir is this node's blob store, by default BLOB_DIR or blobs/ under upload_dir.
+    """
+    from .blob_store import BlobStore
+    began = time.perf_counter()
+    existing = metadata_store.get_all_documents("documents")
+    if not force and (existing or not _is_empty(persist_directory) or not _is_empty(upload_dir)):
+        raise ValueError("Target already has data; pass force=True (--force) to replace it")
+
+    parent = os.path.dirname(os.path.abspath(persist_directory))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".restore-", dir=parent)
+    try:
+        manifest = _materialize(archive, staging)
+
+        for prefix, target in ((VECTORS, persist_directory), (UPLOADS, upload_dir)):
+            if os.path.exists(target):
+                shutil.rmtree(target)
+            source = os.path.join(staging, prefix)
+            if os.path.isdir(source):
+                shutil.move(source, target)
+            else:
+                os.makedirs(target, exist_ok=True)
+
+        for document in existing:
+            metadata_store.delete_document("documents", document["_id"])
+        restored_files = set(_walk(upload_dir))
+        blob_store = BlobStore(blob_dir or os.getenv("BLOB_DIR") or os.path.join(upload_dir, "blobs"))
+        with open(os.path.join(staging, *METADATA_FILE.split("/")), encoding="utf-8") as f:
+            for line in f:
+                document = decode_document(line)
+                # Point file paths at this node's blob store or upload directory
+                file_name = os.path.basename(document.get("file_path") or "")
+                if document.get("blob_sha256"):
+                    document["file_path"] = blob_store.path(document["blob_sha256"]) or document.get("file_path")
+                elif file_name in restored_files:
+                    document["file_path"] = os.path.join(upload_dir, file_name)
+                metadata_store.insert_document("documents", document)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    logger.info(
+        "✅ Restored %s: %s files, %s documents in %.1fs",
+        archive, len(manifest["files"]), manifest["documents"], time.perf_counter() - began
+    )
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot or restore the vector index, metadata and uploads")
+    parser.add_argument("--persist-directory", default="./chroma_db")
+    parser.add_argument("--upload-dir", default="./uploads")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create", help="Write a snapshot archive")
+    create.add_argument("output")
+    create.add_argument("--base", help="Earlier snapshot to make this one incremental on")
+    create.add_argument("--compresslevel", type=int, default=1, help="gzip level, 1 (fast) to 9 (small)")
+
+    verify = commands.add_parser("verify", help="Check a snapshot and its bases")
+    verify.add_argument("archive")
+
+    restore = commands.add_parser("restore", help="Replace local state with a snapshot")
+    restore.add_argument("archive")
+    restore.add_argument("--force", action="store_true", help="Replace existing index, uploads and metadata")
+    args = parser.parse_args()
+
+    from .logging_config import configure_logging
+    configure_logging()
+
+    if args.command == "verify":
+        manifest = verify_snapshot(args.archive)
+        logger.info("✅ %s is intact: %s files, %s documents", args.archive, len(manifest["files"]), manifest["documents"])
+        return
+
+    from .database import mongo_db
+    if getattr(mongo_db, "use_fallback", False) and not mongo_db.memory_storage.persist_path:
+        raise SystemExit("No persistent metadata store: set METADATA_BACKEND=sqlite, MONGODB_URI or MEMORY_STORE_PATH")
+
+    if args.command == "create":
+        create_snapshot(args.output, args.persist_directory, args.upload_dir, mongo_db, args.base, args.compresslevel)
+    else:
+        restore_snapshot(args.archive, args.persist_directory, args.upload_dir, mongo_db, args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import os
+import logging
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from .memory_store import (
+    DeleteResult,
+    InsertOneResult,
+    UpdateResult,
+    apply_update,
+    decode_document,
+    encode_document,
+    matches_filter,
+)
+
+logger = logging.getLogger(__name__)
+
+# Document fields copied into their own indexed columns
+INDEXED_COLUMNS = ("document_id", "category", "uploaded_at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    document_id TEXT,
+    category TEXT,
+    uploaded_at TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (collection, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_documents_document_id ON documents (collection, document_id);
+CREATE INDEX IF NOT EXISTS idx_documents_category ON documents (collection, category);
+CREATE INDEX IF NOT EXISTS idx_documents_uploaded_at ON documents (collection, uploaded_at);
+"""
+
+
+def _column_value(value):
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class SQLiteCollection:
+    """Collection view over the shared documents table, pymongo-style"""
+
+    def __init__(self, name: str, store: "SQLiteStore"):
+        self.name = name
+        self.store = store
+
+    def _row(self, document: Dict):
+        return (
+            self.name,
+            str(document["_id"]),
+            *(_column_value(document.get(column)) for column in INDEXED_COLUMNS),
+            encode_document(document),
+        )
+
+    def _select(self, filter: Optional[Dict]) -> List[Dict]:
+        """Push _id and indexed-column equality into SQL, match the rest in Python"""
+        filter = filter or {}
+        sql = "SELECT data FROM documents WHERE collection = ?"
+        params = [self.name]
+
+        for field, value in filter.items():
+            if isinstance(value, dict):
+                continue
+            if field == "_id":
+                sql += " AND id = ?"
+                params.append(str(value))
+            elif field in INDEXED_COLUMNS:
+                sql += f" AND {field} = ?"
+                params.append(_column_value(value))
+
+        with self.store.lock:
+            rows = self.store.connection.execute(sql, params).fetchall()
+
+        documents = [decode_document(row[0]) for row in rows]
+        return [doc for doc in documents if matches_filter(doc, filter)]
+
+    def insert_one(self, document: Dict) -> InsertOneResult:
+        if "_id" not in document:
+            document["_id"] = uuid.uuid4().hex
+        with self.store.write() as connection:
+            connection.execute("INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?)", self._row(document))
+        return InsertOneResult(document["_id"])
+
+    def insert_many(self, documents: List[Dict]) -> List:
+        for document in documents:
+            if "_id" not in document:
+                document["_id"] = uuid.uuid4().hex
+        with self.store.write() as connection:
+            connection.executemany(
+                "INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?)",
+                [self._row(document) for document in documents]
+            )
+        return [document["_id"] for document in documents]
+
+    def find_one(self, filter: Optional[Dict] = None) -> Optional[Dict]:
+        documents = self._select(filter)
+        return documents[0] if documents else None
+
+    def find(self, filter: Optional[Dict] = None) -> List[Dict]:
+        return self._select(filter)
+
+    def count_documents(self, filter: Optional[Dict] = None) -> int:
+        return len(self._select(filter))
+
+    def update_one(self, filter: Dict, update: Dict) -> UpdateResult:
+        with self.store.write() as connection:
+            document = self.find_one(filter)
+            if document is None:
+                return UpdateResult(0, 0)
+            updated = apply_update(document, update)
+            connection.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?)",
+                self._row(updated)
+            )
+        return UpdateResult(1, 1)
+
+    def delete_one(self, filter: Dict) -> DeleteResult:
+        with self.store.write() as connection:
+            document = self.find_one(filter)
+            if document is None:
+                return DeleteResult(0)
+            connection.execute(
+                "DELETE FROM documents WHERE collection = ? AND id = ?",
+                (self.name, str(document["_id"]))
+            )
+        return DeleteResult(1)
+
+
+class SQLiteStore:
+    """Embedded metadata backend with the same interface as MongoDB
+
+    Uses WAL mode so reads never block on writes; writes go through
+    write(), which batches everything inside it into one transaction.
+    """
+
+    def __init__(self, db_path: str = "./metadata.db"):
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        self.use_fallback = False
+        self._depth = 0
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._connect()
+        self.db = self
+        logger.info("✅ Using SQLite metadata store: %s", os.path.abspath(db_path))
+
+    def _connect(self):
+        self.client = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self.connection = self.client
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA temp_store=MEMORY")
+        self.connection.executescript(SCHEMA)
+
+    def after_fork(self):
+        """Open this process's own connection; SQLite connections must not cross a fork"""
+        self.lock = threading.RLock()
+        self._depth = 0
+        self._connect()
+
+    @contextmanager
+    def write(self):
+        """Run writes in a single transaction; nested calls join the outer one"""
+        with self.lock:
+            outermost = self._depth == 0
+            if outermost:
+                self.connection.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self.connection
+            except Exception:
+                self._depth -= 1
+                if outermost:
+                    self.connection.execute("ROLLBACK")
+                raise
+            else:
+                self._depth -= 1
+                if outermost:
+                    self.connection.execute("COMMIT")
+
+    def get_collection(self, collection_name):
+        return SQLiteCollection(collection_name, self)
+
+    def insert_document(self, collection_name, document):
+        collection = self.get_collection(collection_name)
+        return str(collection.insert_one(document).inserted_id)
+
+    def insert_documents(self, collection_name, documents):
+        """Insert many documents in one transaction"""
+        collection = self.get_collection(collection_name)
+        return [str(doc_id) for doc_id in collection.insert_many(documents)]
+
+    def get_document(self, collection_name, document_id):
+        collection = self.get_collection(collection_name)
+        return collection.find_one({"_id": str(document_id)})
+
+    def update_document(self, collection_name, document_id, fields):
+        """Set fields on a document; returns True if it was found"""
+        collection = self.get_collection(collection_name)
+        result = collection.update_one({"_id": str(document_id)}, {"$set": fields})
+        return result.matched_count > 0
+
+    def delete_document(self, collection_name, document_id):
+        """Delete a document; returns True if it existed"""
+        collection = self.get_collection(collection_name)
+        result = collection.delete_one({"_id": str(document_id)})
+        return result.deleted_count > 0
+
+    def get_all_documents(self, collection_name):
+        collection = self.get_collection(collection_name)
+        documents = collection.find({})
+        for doc in documents:
+            doc["_id"] = str(doc["_id"])
+        return documents
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
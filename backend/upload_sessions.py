@@ -0,0 +1,230 @@
+import os
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from .file_locks import locked_file
+from .logging_config import begin_request, request_id_var
+
+logger = logging.getLogger(__name__)
+
+# Session states, in order
+UPLOADING = "uploading"
+QUEUED = "queued"
+PROCESSING = "processing"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Metadata store collection the sessions are kept in, when one is given
+SESSIONS_COLLECTION = "upload_sessions"
+
+# Everything a session is rebuilt from
+_FIELDS = (
+    "upload_id", "title", "description", "category", "filename", "total_size", "part_path",
+    "received_bytes", "status", "stage", "pages_total", "pages_parsed", "chunks_total",
+    "chunks_embedded", "document", "error", "created_at", "updated_at", "version",
+)
+
+class UploadSession:
+    """One chunked upload and the progress of its ingestion"""
+
+    def __init__(self, title: str, description: str, category: str, filename: str, total_size: int, part_path: str):
+        self.upload_id = str(uuid.uuid4())
+        self.title = title
+        self.description = description
+        self.category = category
+        self.filename = filename
+        self.total_size = total_size
+        self.part_path = part_path
+        self.received_bytes = 0
+        self.status = UPLOADING
+        self.stage = "uploading"
+        self.pages_total = 0
+        self.pages_parsed = 0
+        self.chunks_total = 0
+        self.chunks_embedded = 0
+        self.document = None
+        self.error = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        # Bumped on every change so event streams know when to send an update
+        self.version = 0
+        # Called with the changed fields after every update, to save them
+        self.persist = None
+
+    def update(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.updated_at = time.time()
+        self.version += 1
+        if self.persist:
+            self.persist(dict(fields, updated_at=self.updated_at, version=self.version))
+
+    def to_record(self) -> Dict:
+        record = {name: getattr(self, name) for name in _FIELDS}
+        record["_id"] = self.upload_id
+        return record
+
+    def load(self, record: Dict):
+        """Take the fields of a stored record"""
+        for name in _FIELDS:
+            if name in record:
+                setattr(self, name, record[name])
+
+    @classmethod
+    def from_record(cls, record: Dict) -> "UploadSession":
+        session = cls(record["title"], record["description"], record["category"], record["filename"],
+                      record["total_size"], record["part_path"])
+        session.load(record)
+        return session
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+    def to_dict(self) -> Dict:
+        return {
+            "upload_id": self.upload_id,
+            "title": self.title,
+            "filename": self.filename,
+            "status": self.status,
+            "stage": self.stage,
+            "total_size": self.total_size,
+            "received_bytes": self.received_bytes,
+            "pages_total": self.pages_total,
+            "pages_parsed": self.pages_parsed,
+            "chunks_total": self.chunks_total,
+            "chunks_embedded": self.chunks_embedded,
+            "document": self.document,
+            "error": self.error,
+            "version": self.version,
+        }
+
+class UploadSessionManager:
+    """Resumable chunked uploads with background ingestion
+
+    Clients append bytes at the offset the server reports, so an interrupted
+    upload resumes from received_bytes. Once complete, ingestion runs on a
+    small worker pool and reports per-stage progress back into the session.
+
+    With a metadata store, sessions are saved in it rather than kept in
+    this process, so with several gunicorn workers any of them can take the
+    next chunk or report progress; the part files under upload_dir are
+    shared the same way.
+    """
+
+    def __init__(self, upload_dir: str, max_workers: int = 2, retention_seconds: int = 3600, store=None):
+        self.partial_dir = os.path.join(upload_dir, ".partial")
+        os.makedirs(self.partial_dir, exist_ok=True)
+        self.retention_seconds = retention_seconds
+        self.store = store
+        self.sessions: Dict[str, UploadSession] = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+
+    def create(self, title: str, description: str, category: str, filename: str, total_size: int) -> UploadSession:
+        self._expire()
+        session = UploadSession(title, description, category, filename, total_size, "")
+        session.part_path = os.path.join(self.partial_dir, f"{session.upload_id}.part")
+        open(session.part_path, "wb").close()
+        if self.store is not None:
+            self.store.insert_document(SESSIONS_COLLECTION, session.to_record())
+            self._attach(session)
+            return session
+        with self.lock:
+            self.sessions[session.upload_id] = session
+        return session
+
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        if self.store is not None:
+            record = self.store.get_document(SESSIONS_COLLECTION, upload_id)
+            return self._attach(UploadSession.from_record(record)) if record else None
+        with self.lock:
+            return self.sessions.get(upload_id)
+
+    def refresh(self, session: UploadSession):
+        """Bring session up to date with changes made by other processes"""
+        if self.store is not None:
+            record = self.store.get_document(SESSIONS_COLLECTION, session.upload_id)
+            if record:
+                session.load(record)
+
+    def _attach(self, session: UploadSession) -> UploadSession:
+        store = self.store
+        session.persist = lambda fields: store.update_document(SESSIONS_COLLECTION, session.upload_id, fields)
+        return session
+
+    def _all(self) -> List[UploadSession]:
+        if self.store is not None:
+            return [UploadSession.from_record(r) for r in self.store.get_all_documents(SESSIONS_COLLECTION)]
+        with self.lock:
+            return list(self.sessions.values())
+
+    def append_chunk(self, session: UploadSession, offset: int, data: bytes):
+        """Append bytes at offset; raises ValueError if offset is not where the upload left off
+
+        Only this session's part file is locked while the chunk is written,
+        so a slow upload does not hold up any other session.
+        """
+        with open(session.part_path, "ab") as part, locked_file(part):
+            # Another worker may have taken a chunk since session was read
+            self.refresh(session)
+            if session.status != UPLOADING:
+                raise ValueError(f"Upload is already {session.status}")
+            if offset != session.received_bytes:
+                raise ValueError(f"Expected offset {session.received_bytes}, got {offset}")
+            if session.received_bytes + len(data) > session.total_size:
+                raise ValueError("Chunk goes past the declared file size")
+
+            part.write(data)
+            part.flush()
+            session.update(received_bytes=session.received_bytes + len(data))
+
+    def count(self, status: str) -> int:
+        """Number of sessions currently in status"""
+        return sum(1 for s in self._all() if s.status == status)
+
+    def complete(self, session: UploadSession, ingest: Callable[[UploadSession], Dict]):
+        """Queue ingestion once every byte has arrived"""
+        with open(session.part_path, "ab") as part, locked_file(part):
+            self.refresh(session)
+            if session.status != UPLOADING:
+                raise ValueError(f"Upload is already {session.status}")
+            if session.received_bytes != session.total_size:
+                raise ValueError(f"Received {session.received_bytes} of {session.total_size} bytes")
+            session.update(status=QUEUED, stage="queued")
+
+        self.executor.submit(self._run, session, ingest, request_id_var.get())
+
+    def _run(self, session: UploadSession, ingest: Callable[[UploadSession], Dict], request_id: str):
+        # Log under the ID of the request that completed the upload
+        begin_request(request_id)
+        session.update(status=PROCESSING, stage="parsing")
+        try:
+            document = ingest(session)
+            session.update(status=COMPLETED, stage="done", document=document)
+        except Exception as e:
+            logger.exception("❌ Background ingestion failed for %s: %s", session.filename, e)
+            session.update(status=FAILED, stage="failed", error=str(e))
+        finally:
+            if os.path.exists(session.part_path):
+                os.remove(session.part_path)
+
+    def _expire(self):
+        """Forget finished or abandoned sessions past the retention window"""
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            s for s in self._all()
+            if s.updated_at < cutoff and s.status in (UPLOADING, COMPLETED, FAILED)
+        ]
+        for session in expired:
+            if self.store is not None:
+                self.store.delete_document(SESSIONS_COLLECTION, session.upload_id)
+            else:
+                with self.lock:
+                    self.sessions.pop(session.upload_id, None)
+            if os.path.exists(session.part_path):
+                os.remove(session.part_path)
@@ -1,49 +1,219 @@
 import chromadb
-from sentence_transformers import SentenceTransformer
 import numpy as np
 import uuid
-from typing import List, Dict
+import logging
+from typing import Callable, List, Dict, Optional
 import os
 
+from .batching import EmbeddingBatcher
+from .embeddings import create_backend
+from .exact_index import ExactIndex
+from .logging_config import timed
+from .metrics import CHUNKS_INDEXED, EMBEDDING_BATCH_SIZE
+from .near_duplicates import DeduplicatingCollection, NearDuplicateIndex, collapse_matches
+from .quantized_index import QuantizedIndex
+from .sharded_index import SHARD_BY_CATEGORY, SHARD_BY_DOCUMENT, ShardedCollection
+
+logger = logging.getLogger(__name__)
+
+# New Chroma collections use cosine distance, as the exact and int8 indexes do
+CHROMA_METADATA = {"description": "Legal documents for compliance checking", "hnsw:space": "cosine"}
+
+class L2AsCosineCollection:
+    """Chroma collection created with the default l2 space, reporting cosine distances
+
+    Chroma's l2 distance is the squared Euclidean distance, which for the
+    unit-length embeddings stored here is twice the cosine distance; halving
+    it gives every index mode the same 1 - distance similarity.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def add(self, **kwargs):
+        return self.collection.add(**kwargs)
+
+    def query(self, **kwargs):
+        results = self.collection.query(**kwargs)
+        if results.get("distances"):
+            results["distances"] = [[distance / 2 for distance in row] for row in results["distances"]]
+        return results
+
+    def get(self, **kwargs):
+        return self.collection.get(**kwargs)
+
+    def count(self) -> int:
+        return self.collection.count()
+
+def _cosine(collection):
+    """collection, converted to cosine distances if it predates CHROMA_METADATA"""
+    if (collection.metadata or {}).get("hnsw:space", "l2") == "l2":
+        logger.info("ℹ️ Collection %s uses l2 distance; converting to cosine", collection.name)
+        return L2AsCosineCollection(collection)
+    return collection
+
+def _open_shard(persist_directory: str, index_mode: str, client, shard: int):
+    if index_mode == "exact":
+        return ExactIndex(os.path.join(persist_directory, f"shard_{shard}"))
+    if index_mode == "int8":
+        return QuantizedIndex(
+            os.path.join(persist_directory, f"shard_{shard}"),
+            rerank_factor=int(os.getenv("VECTOR_RERANK_FACTOR", "4"))
+        )
+    return _cosine(client.get_or_create_collection(name=f"legal_documents_{shard}", metadata=CHROMA_METADATA))
+
+def open_collection(persist_directory: str, index_mode: str):
+    """Open the collection for index_mode; returns (chroma client or None, collection)
+    
+    VECTOR_SHARDS > 1 splits it into that many shards, partitioned by
+    VECTOR_SHARD_BY (document_id or category). Changing either means re-indexing.
+    Unless NEAR_DUPLICATES=0, added chunks are also tagged with near-duplicate clusters.
+    """
+    client, collection = _open_index(persist_directory, index_mode)
+    if os.getenv("NEAR_DUPLICATES", "1") != "0":
+        collection = DeduplicatingCollection(
+            collection,
+            NearDuplicateIndex(os.path.join(persist_directory, "near_duplicates.bin"))
+        )
+    return client, collection
+
+def _open_index(persist_directory: str, index_mode: str):
+    shards = int(os.getenv("VECTOR_SHARDS", "1"))
+    if shards > 1:
+        shard_by = os.getenv("VECTOR_SHARD_BY", SHARD_BY_DOCUMENT).lower()
+        if shard_by not in (SHARD_BY_DOCUMENT, SHARD_BY_CATEGORY):
+            logger.warning("⚠️ Unknown VECTOR_SHARD_BY '%s', using %s", shard_by, SHARD_BY_DOCUMENT)
+            shard_by = SHARD_BY_DOCUMENT
+        client = None if index_mode in ("exact", "int8") else chromadb.PersistentClient(path=persist_directory)
+        collection = ShardedCollection(
+            [_open_shard(persist_directory, index_mode, client, shard) for shard in range(shards)],
+            shard_by=shard_by
+        )
+        logger.info("✅ Loaded %s %s shards (by %s) with %s documents", shards, index_mode, shard_by, collection.count())
+        return client, collection
+    
+    if index_mode == "exact":
+        collection = ExactIndex(persist_directory)
+        logger.info("✅ Loaded exact index with %s documents", collection.count())
+        return None, collection
+    if index_mode == "int8":
+        collection = QuantizedIndex(
+            persist_directory,
+            rerank_factor=int(os.getenv("VECTOR_RERANK_FACTOR", "4"))
+        )
+        logger.info("✅ Loaded int8 index with %s documents", collection.count())
+        return None, collection
+    
+    # Initialize ChromaDB
+    client = chromadb.PersistentClient(path=persist_directory)
+    
+    # Get or create collection - SIMPLIFIED VERSION
+    try:
+        collection = client.get_collection("legal_documents")
+        logger.info("✅ Loaded existing collection with %s documents", collection.count())
+    except:
+        collection = client.create_collection(name="legal_documents", metadata=CHROMA_METADATA)
+        logger.info("✅ Created new collection")
+    return client, _cosine(collection)
+
 class VectorStore:
-    def __init__(self, persist_directory="./chroma_db"):
+    # Extra candidates fetched per result when near-duplicates are collapsed
+    DUPLICATE_OVERFETCH = 4
+    # Chroma rejects larger adds (its limit is about 5461), so bigger documents are added in parts
+    MAX_ADD_BATCH = 5000
+    
+    def __init__(self, persist_directory="./chroma_db", index_mode: Optional[str] = None):
         # Create directory if not exists
         os.makedirs(persist_directory, exist_ok=True)
+        self.persist_directory = persist_directory
         
-        # Initialize ChromaDB
-        self.client = chromadb.PersistentClient(path=persist_directory)
+        # "chroma" (default), "exact" for brute-force search over a memory-mapped
+        # matrix, or "int8" for the compact quantized index
+        self.index_mode = (index_mode or os.getenv("VECTOR_INDEX_MODE", "chroma")).lower()
         
-        # Get or create collection - SIMPLIFIED VERSION
-        try:
-            self.collection = self.client.get_collection("legal_documents")
-            print(f"✅ Loaded existing collection with {self.collection.count()} documents")
-        except:
-            self.collection = self.client.create_collection(
-                name="legal_documents",
-                metadata={"description": "Legal documents for compliance checking"}
+        # With several workers, one index owner process holds the collection for all of them
+        owner_address = os.getenv("INDEX_OWNER_ADDRESS")
+        if owner_address:
+            from .index_owner import RemoteCollection, authkey_from_env
+            self.client = None
+            self.collection = RemoteCollection(owner_address, authkey_from_env())
+            logger.info("✅ Using index owner at %s", owner_address)
+        else:
+            self.client, self.collection = open_collection(persist_directory, self.index_mode)
+        
+        self.add_batch = self.MAX_ADD_BATCH
+        if self.client is not None:
+            self.add_batch = min(self.add_batch, self.client.get_max_batch_size())
+
+        # Initialize embedding model (EMBEDDING_BACKEND: torch, onnx or onnx-int8)
+        self.embedder = create_backend()
+        self.batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+        logger.info("✅ Embedding model loaded (%s backend)", self.embedder.name)
+        
+        # Concurrent queries share one encode call; QUERY_BATCH_WINDOW_MS=0 turns this off
+        window_ms = float(os.getenv("QUERY_BATCH_WINDOW_MS", "3"))
+        self.query_batcher = None
+        if window_ms > 0:
+            self.query_batcher = EmbeddingBatcher(
+                self.generate_embeddings,
+                max_batch_size=int(os.getenv("QUERY_BATCH_MAX", "64")),
+                max_wait_ms=window_ms
             )
-            print("✅ Created new collection")
 
-        # Initialize embedding model
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("✅ Embedding model loaded")
+    def after_fork(self):
+        """Restart the query batcher's worker thread in a forked worker process"""
+        if self.query_batcher is not None:
+            self.query_batcher.after_fork()
 
-    def generate_embeddings(self, texts: List[str]):
-        """Generate embeddings for texts - RETURNS LIST!"""
-        embeddings = self.embedding_model.encode(texts)
-        return embeddings.tolist()  # ✅ MUST CONVERT TO LIST!
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Generate normalized float32 embeddings as one contiguous (n, dim) array
+        
+        Both Chroma and the numpy indexes accept arrays directly, so there is
+        no need to turn every float into a Python object with tolist().
+        """
+        EMBEDDING_BATCH_SIZE.observe(len(texts))
+        embeddings = self.embedder.encode(texts, batch_size=self.batch_size)
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    def generate_embeddings_from_ids(self, input_ids: List[List[int]]) -> np.ndarray:
+        """generate_embeddings for chunks the token splitter already tokenized"""
+        EMBEDDING_BATCH_SIZE.observe(len(input_ids))
+        embeddings = self.embedder.encode_ids(input_ids, batch_size=self.batch_size)
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
 
-    def add_documents(self, documents: List[Dict]):
-        """Add documents to vector store"""
+    def add_documents(self, documents: List[Dict], progress: Optional[Callable] = None):
+        """Add documents to vector store
+        
+        progress, if given, is called with stage and chunks_embedded after
+        each embedding step.
+        """
         if not documents:
-            print("⚠️ No documents to add")
+            logger.debug("⚠️ No documents to add")
             return []
         
         texts = [doc["text"] for doc in documents]
-        print(f"📊 Adding {len(texts)} document chunks...")
+        logger.debug("📊 Adding %s document chunks...", len(texts))
         
-        # Generate embeddings
-        embeddings = self.generate_embeddings(texts)
+        # Chunks from the token splitter come with their input ids; reuse them
+        token_ids = [doc.get("input_ids") for doc in documents]
+        if any(ids is None for ids in token_ids):
+            token_ids = None
+        
+        # Generate embeddings one batch at a time, so progress can be reported and
+        # ingestion can give way to queries between batches
+        embeddings = None
+        step = self.batch_size
+        for start in range(0, len(texts), step):
+            with timed("embed"):
+                if token_ids is not None:
+                    batch = self.generate_embeddings_from_ids(token_ids[start:start + step])
+                else:
+                    batch = self.generate_embeddings(texts[start:start + step])
+            if embeddings is None:
+                embeddings = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+            embeddings[start:start + len(batch)] = batch
+            if progress:
+                progress(stage="embedding", chunks_embedded=min(start + step, len(texts)))
         
         # Prepare metadata and IDs
         metadatas = []
@@ -55,81 +225,119 @@ class VectorStore:
                 "cause": doc.get("cause", "General Compliance"),
                 "chunk_id": doc.get("chunk_id", f"chunk_{i}"),
                 "document_id": doc.get("document_id", ""),
+                "category": doc.get("category", ""),
                 "chunk_index": i
             }
             metadatas.append(metadata)
             ids.append(f"{doc.get('document_id', 'doc')}_{i}")
         
         # Add to collection
+        if progress:
+            progress(stage="indexing")
         try:
-            self.collection.add(
-                embeddings=embeddings,
-                documents=texts,
-                metadatas=metadatas,
-                ids=ids
-            )
-            print(f"✅ Successfully added {len(ids)} chunks to vector store")
+            with timed("index"):
+                for start in range(0, len(ids), self.add_batch):
+                    stop = start + self.add_batch
+                    self.collection.add(
+                        embeddings=embeddings[start:stop],
+                        documents=texts[start:stop],
+                        metadatas=metadatas[start:stop],
+                        ids=ids[start:stop]
+                    )
+            CHUNKS_INDEXED.inc(len(ids))
+            logger.info("✅ Successfully added %s chunks to vector store", len(ids))
             return ids
         except Exception as e:
-            print(f"❌ Error adding to vector store: {e}")
+            logger.error("❌ Error adding to vector store: %s", e)
             return []
 
-    def similarity_search(self, query: str, threshold: float = 0.7, top_k: int = 5):
+    def similarity_search(self, query: str, threshold: float = 0.7, top_k: int = 5, category: Optional[str] = None,
+                          collapse_duplicates: bool = False):
         """Search for similar documents"""
-        print(f"🔍 Searching for: '{query[:50]}...' (threshold: {threshold})")
+        logger.debug("🔍 Searching for: '%s...' (threshold: %s)", query[:50], threshold)
+        return self.similarity_search_batch([query], threshold, top_k, category, collapse_duplicates)[0]
+
+    def similarity_search_batch(self, queries: List[str], threshold: float = 0.7, top_k: int = 5, category: Optional[str] = None,
+                                collapse_duplicates: bool = False):
+        """Search for several queries with one encode and one index query
         
+        Returns one result list per query, in the same order. category, if
+        given, restricts the search to chunks of that document category.
+        With collapse_duplicates, near-identical chunks count once: each
+        result is the best of its cluster and cluster_size says how many
+        chunks it stands for.
+        """
         try:
             # Count documents first
             total_docs = self.collection.count()
-            print(f"📊 Total documents in collection: {total_docs}")
+            logger.debug("📊 Total documents in collection: %s", total_docs)
             
             if total_docs == 0:
-                print("⚠️ No documents in vector store")
-                return []
+                logger.debug("⚠️ No documents in vector store")
+                return [[] for _ in queries]
             
-            # Generate query embedding
-            query_embedding = self.generate_embeddings([query])
+            # Generate query embeddings
+            with timed("embed"):
+                if self.query_batcher is not None:
+                    query_embeddings = self.query_batcher.encode(queries)
+                else:
+                    query_embeddings = self.generate_embeddings(queries)
             
             # Perform search
-            results = self.collection.query(
-                query_embeddings=query_embedding,
-                n_results=min(top_k, total_docs),
-                include=["documents", "metadatas", "distances"]
-            )
-            
-            search_results = []
+            search = {
+                "query_embeddings": query_embeddings,
+                "n_results": min(top_k * (self.DUPLICATE_OVERFETCH if collapse_duplicates else 1), total_docs),
+                "include": ["documents", "metadatas", "distances"]
+            }
+            if category:
+                search["where"] = {"category": category}
+            with timed("query"):
+                results = self.collection.query(**search)
             
-            if results["documents"] and len(results["documents"][0]) > 0:
-                print(f"📈 Found {len(results['documents'][0])} potential matches")
-                
-                for i in range(len(results["documents"][0])):
-                    distance = results["distances"][0][i]
-                    similarity_score = 1 - distance
+            with timed("postprocess"):
+                all_results = []
+                for q in range(len(queries)):
+                    search_results = []
+                    documents = results["documents"][q] if results["documents"] else []
                     
-                    if similarity_score >= threshold:
-                        search_results.append({
-                            "similarity_score": round(similarity_score, 3),
-                            "matching_text": results["documents"][0][i],
-                            "cause": results["metadatas"][0][i].get("cause", "Unknown"),
-                            "document_title": results["metadatas"][0][i].get("title", "Unknown"),
-                            "document_id": results["metadatas"][0][i].get("document_id", "")
-                        })
+                    for i in range(len(documents)):
+                        distance = results["distances"][q][i]
+                        similarity_score = 1 - distance
+                        
+                        if similarity_score >= threshold:
+                            metadata = results["metadatas"][q][i]
+                            search_results.append({
+                                "similarity_score": round(similarity_score, 3),
+                                "matching_text": documents[i],
+                                "cause": metadata.get("cause", "Unknown"),
+                                "document_title": metadata.get("title", "Unknown"),
+                                "document_id": metadata.get("document_id", ""),
+                                "cluster_id": metadata.get("dup_cluster"),
+                                "cluster_size": metadata.get("dup_cluster_size", 1)
+                            })
+                    if collapse_duplicates:
+                        search_results = collapse_matches(search_results, top_k)
+                    all_results.append(search_results)
             
-            print(f"✅ Returning {len(search_results)} matches above threshold {threshold}")
-            return search_results
+            logger.debug("✅ Returning %s matches above threshold %s", sum(len(r) for r in all_results), threshold)
+            return all_results
             
         except Exception as e:
-            print(f"❌ Error in similarity search: {e}")
-            return []
+            logger.error("❌ Error in similarity search: %s", e)
+            return [[] for _ in queries]
 
     def get_collection_info(self):
         """Get information about the collection"""
         try:
             count = self.collection.count()
-            return {
+            info = {
                 "collection_name": "legal_documents",
+                "index_mode": self.index_mode,
                 "document_count": count,
                 "status": "active"
             }
+            if self.index_mode in ("exact", "int8"):
+                info["memory"] = self.collection.memory_usage()
+            return info
         except:
             return {"error": "Unable to get collection info"}
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""Helpers shared by the benchmark scripts"""
+import json
+import platform
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+
+def latency_summary(seconds: Iterable[float]) -> Dict:
+    """p50/p95/p99/mean latency in milliseconds"""
+    values = 1000 * np.asarray(list(seconds), dtype=np.float64)
+    if not len(values):
+        return {}
+    return {
+        "latency_ms_p50": round(float(np.percentile(values, 50)), 3),
+        "latency_ms_p95": round(float(np.percentile(values, 95)), 3),
+        "latency_ms_p99": round(float(np.percentile(values, 99)), 3),
+        "latency_ms_mean": round(float(values.mean()), 3),
+    }
+
+
+def environment() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def emit(report: Dict, output: Optional[str] = None):
+    """Print the JSON report, or write it to output"""
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,57 @@
+"""CPU time and peak memory of handing embeddings to the index as lists vs arrays
+
+Run from the project root:
+
+    python -m benchmarks.embedding_handoff --chunks 10000
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from backend.quantized_index import QuantizedIndex
+
+
+def measure(label: str, embeddings: np.ndarray, as_list: bool) -> dict:
+    count = len(embeddings)
+    with tempfile.TemporaryDirectory() as directory:
+        index = QuantizedIndex(directory, dim=embeddings.shape[1])
+        tracemalloc.start()
+        start = time.process_time()
+
+        payload = embeddings.tolist() if as_list else embeddings
+        index.add(ids=[str(i) for i in range(count)], embeddings=payload, documents=[""] * count, metadatas=[{}] * count)
+
+        cpu_seconds = time.process_time() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {"path": label, "cpu_ms": round(1000 * cpu_seconds, 1), "peak_python_bytes": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((args.chunks, args.dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    report = {
+        "chunks": args.chunks,
+        "dim": args.dim,
+        "results": [
+            measure("tolist", embeddings, as_list=True),
+            measure("ndarray", embeddings, as_list=False),
+        ],
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
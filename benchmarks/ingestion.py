@@ -0,0 +1,98 @@
+"""Ingestion throughput: pages/sec for PDFProcessor, chunks/sec for VectorStore.add_documents
+
+Run from the project root:
+
+    python -m benchmarks.ingestion --pages 200 --chunks 5000 --batch-sizes 16 64 256
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from backend.document_processor import PDFProcessor
+from backend.logging_config import begin_request, current_timings
+
+from .common import emit, environment
+from .synthetic import legal_pdf, synthetic_chunks
+
+
+def bench_pdf(pages: int, repeats: int = 3, seed: int = 0) -> Dict:
+    processor = PDFProcessor()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synthetic.pdf")
+        with open(path, "wb") as f:
+            f.write(legal_pdf(pages, seed=seed))
+
+        best = None
+        chunks = []
+        for _ in range(repeats):
+            begin_request()
+            start = time.perf_counter()
+            chunks = processor.process_pdf(path)
+            elapsed = time.perf_counter() - start
+            if best is None or elapsed < best[0]:
+                best = (elapsed, current_timings())
+
+    seconds, timings = best
+    return {
+        "pages": pages,
+        "chunks": len(chunks),
+        "seconds": round(seconds, 4),
+        "pages_per_sec": round(pages / seconds, 1),
+        "chunks_per_sec": round(len(chunks) / seconds, 1),
+        "stage_ms": timings,
+    }
+
+
+def bench_add_documents(chunks: int, batch_sizes: List[int], index_mode: str, seed: int = 0) -> Dict:
+    """Index the same synthetic chunks once per batch size into a fresh collection"""
+    from backend.vector_store import VectorStore
+
+    corpus = synthetic_chunks(chunks, seed=seed)
+    results = []
+    embedder = None
+    for batch_size in batch_sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            store = VectorStore(persist_directory=directory, index_mode=index_mode)
+            # Reuse the first model so later runs are not skewed by load time or a cold cache
+            if embedder is None:
+                embedder = store.embedder
+            store.embedder = embedder
+            store.batch_size = batch_size
+
+            begin_request()
+            start = time.perf_counter()
+            ids = store.add_documents(corpus)
+            elapsed = time.perf_counter() - start
+        assert len(ids) == chunks, f"Indexed {len(ids)} of {chunks} chunks at batch size {batch_size}"
+
+        results.append({
+            "batch_size": batch_size,
+            "chunks_indexed": len(ids),
+            "seconds": round(elapsed, 3),
+            "chunks_per_sec": round(len(ids) / elapsed, 1),
+            "stage_ms": current_timings(),
+        })
+
+    return {"index_mode": index_mode, "embedding_backend": embedder.name, "chunks": chunks, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--index-mode", default=os.getenv("VECTOR_INDEX_MODE", "chroma"))
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    emit({
+        "environment": environment(),
+        "pdf_processing": bench_pdf(args.pages),
+        "add_documents": bench_add_documents(args.chunks, args.batch_sizes, args.index_mode),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Recall/latency/memory trade-off of the int8 index versus exact search
+
+Run from the project root:
+
+    python -m benchmarks.quantized_recall --chunks 100000 --queries 200
+"""
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from backend.quantized_index import QuantizedIndex
+
+from .synthetic import synthetic_embeddings
+
+
+def run(chunks: int, queries: int, dim: int, top_k: int, rerank_factors, seed: int = 0) -> dict:
+    corpus = synthetic_embeddings(chunks, dim, clusters=max(8, chunks // 500), seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    query_vectors = corpus[rng.integers(0, chunks, queries)] + 0.3 * rng.standard_normal((queries, dim)).astype(np.float32)
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+
+    start = time.perf_counter()
+    exact_top = np.argsort(-(query_vectors @ corpus.T), axis=1)[:, :top_k]
+    exact_seconds = time.perf_counter() - start
+
+    report = {
+        "chunks": chunks,
+        "queries": queries,
+        "dim": dim,
+        "top_k": top_k,
+        "exact_float32": {
+            # One batched matmul for all queries, amortized per query
+            "latency_ms_batched": round(1000 * exact_seconds / queries, 3),
+            "resident_bytes": int(corpus.nbytes),
+        },
+        "int8": [],
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = QuantizedIndex(directory, dim=dim)
+        ids = [str(i) for i in range(chunks)]
+        index.add(ids=ids, embeddings=corpus, documents=[""] * chunks, metadatas=[{}] * chunks)
+        report["int8_memory"] = index.memory_usage()
+
+        for factor in rerank_factors:
+            index.rerank_factor = factor
+            hits = 0
+            latencies = []
+            for query, expected in zip(query_vectors, exact_top):
+                start = time.perf_counter()
+                found = index.query(query[None, :], n_results=top_k)["ids"][0]
+                latencies.append(time.perf_counter() - start)
+                hits += len(set(int(i) for i in found) & set(expected.tolist()))
+
+            report["int8"].append({
+                "rerank_factor": factor,
+                f"recall@{top_k}": round(hits / (queries * top_k), 4),
+                "latency_ms_p50": round(1000 * float(np.percentile(latencies, 50)), 3),
+                "latency_ms_p95": round(1000 * float(np.percentile(latencies, 95)), 3),
+            })
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--rerank-factors", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = run(args.chunks, args.queries, args.dim, args.top_k, args.rerank_factors)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
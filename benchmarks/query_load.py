@@ -0,0 +1,101 @@
+"""Latency percentiles and QPS of /check-compliance/ at several concurrency levels
+
+Runs against a live API server. Start one (uvicorn backend.main:app), then
+from the project root:
+
+    python -m benchmarks.query_load --seed-documents 20 --concurrency 1 4 16
+
+--seed-documents uploads synthetic legal PDFs first so there is something to match.
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+
+from .common import emit, environment, latency_summary
+from .synthetic import legal_pdf, synthetic_queries
+
+
+def seed_documents(url: str, documents: int, pages: int, seed: int = 0):
+    session = requests.Session()
+    for i in range(documents):
+        response = session.post(
+            f"{url}/upload/",
+            files={"file": (f"synthetic_{i}.pdf", legal_pdf(pages, seed=seed + i), "application/pdf")},
+            data={"title": f"Synthetic contract {i}", "description": "benchmark", "category": "contract"},
+            timeout=600,
+        )
+        response.raise_for_status()
+
+
+def run_level(url: str, queries: List[str], concurrency: int, threshold: float, top_k: int, endpoint: str) -> Dict:
+    local = threading.local()
+
+    def one(query: str):
+        # One keep-alive session per worker thread
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            response = local.session.post(
+                f"{url}{endpoint}",
+                json={"query_text": query, "threshold": threshold, "top_k": top_k},
+                timeout=120,
+            )
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(one, queries))
+    wall = time.perf_counter() - start
+
+    latencies = [seconds for seconds, ok in outcomes if ok]
+    return {
+        "concurrency": concurrency,
+        "requests": len(queries),
+        "errors": sum(1 for _, ok in outcomes if not ok),
+        "qps": round(len(latencies) / wall, 2),
+        **latency_summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=os.getenv("API_URL", "http://localhost:8000"))
+    parser.add_argument("--endpoint", default="/check-compliance/")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed-documents", type=int, default=0)
+    parser.add_argument("--pages", type=int, default=10, help="Pages per seeded document")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    if args.seed_documents:
+        seed_documents(args.url, args.seed_documents, args.pages)
+
+    queries = synthetic_queries(args.requests)
+    run_level(args.url, queries[:args.warmup], 1, args.threshold, args.top_k, args.endpoint)
+
+    emit({
+        "environment": environment(),
+        "url": args.url,
+        "endpoint": args.endpoint,
+        "levels": [
+            run_level(args.url, queries, level, args.threshold, args.top_k, args.endpoint)
+            for level in args.concurrency
+        ],
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
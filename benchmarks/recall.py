@@ -0,0 +1,113 @@
+"""Recall@k and query latency of each vector index against exact search
+
+Uses synthetic embeddings, so corpora from 1k up to 1M chunks can be
+compared without running the embedding model. Run from the project root:
+
+    python -m benchmarks.recall --chunks 1000 100000 --engines exact int8 chroma
+"""
+import argparse
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from backend.exact_index import ExactIndex
+from backend.quantized_index import QuantizedIndex
+
+from .common import emit, environment, latency_summary
+from .synthetic import synthetic_embeddings
+
+ENGINES = ("exact", "int8", "chroma")
+
+
+def _open_engine(engine: str, directory: str, dim: int):
+    if engine == "exact":
+        return ExactIndex(directory, dim=dim)
+    if engine == "int8":
+        return QuantizedIndex(directory, dim=dim)
+    import chromadb
+    client = chromadb.PersistentClient(path=directory)
+    return client.create_collection("benchmark")
+
+
+def _add(collection, vectors: np.ndarray):
+    # Chroma caps the rows per add; the numpy indexes take any size but the same loop is fine
+    batch = 5000
+    for start in range(0, len(vectors), batch):
+        part = vectors[start:start + batch]
+        collection.add(
+            ids=[str(i) for i in range(start, start + len(part))],
+            embeddings=part,
+            documents=[""] * len(part),
+            metadatas=[{"row": i} for i in range(start, start + len(part))],
+        )
+
+
+def bench_engine(engine: str, corpus: np.ndarray, queries: np.ndarray, truth: np.ndarray, top_k: int) -> Dict:
+    with tempfile.TemporaryDirectory() as directory:
+        collection = _open_engine(engine, directory, corpus.shape[1])
+        start = time.perf_counter()
+        _add(collection, corpus)
+        add_seconds = time.perf_counter() - start
+
+        hits = 0
+        latencies = []
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            found = collection.query(query_embeddings=query[None, :], n_results=top_k, include=["distances"])["ids"][0]
+            latencies.append(time.perf_counter() - start)
+            hits += len(set(int(i) for i in found) & set(expected.tolist()))
+
+        start = time.perf_counter()
+        collection.query(query_embeddings=queries, n_results=top_k, include=["distances"])
+        batched_seconds = time.perf_counter() - start
+
+    return {
+        "engine": engine,
+        f"recall@{top_k}": round(hits / (len(queries) * top_k), 4),
+        "add_chunks_per_sec": round(len(corpus) / add_seconds, 1),
+        "qps_single": round(len(queries) / sum(latencies), 1),
+        "qps_batched": round(len(queries) / batched_seconds, 1),
+        **latency_summary(latencies),
+    }
+
+
+def run(chunk_counts: List[int], engines: List[str], queries: int, dim: int, top_k: int, seed: int = 0) -> Dict:
+    results = []
+    for chunks in chunk_counts:
+        corpus = synthetic_embeddings(chunks, dim, clusters=max(8, chunks // 500), seed=seed)
+        rng = np.random.default_rng(seed + 1)
+        query_vectors = corpus[rng.integers(0, chunks, queries)] + 0.3 * rng.standard_normal((queries, dim)).astype(np.float32)
+        query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+        # Ground truth from a plain matmul, blocked so 1M x 384 stays within memory
+        truth = np.empty((queries, top_k), dtype=np.int64)
+        for start in range(0, queries, 64):
+            scores = query_vectors[start:start + 64] @ corpus.T
+            truth[start:start + 64] = np.argsort(-scores, axis=1)[:, :top_k]
+
+        results.append({
+            "chunks": chunks,
+            "engines": [bench_engine(engine, corpus, query_vectors, truth, top_k) for engine in engines],
+        })
+
+    return {"queries": queries, "dim": dim, "top_k": top_k, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = run(args.chunks, args.engines, args.queries, args.dim, args.top_k)
+    report["environment"] = environment()
+    emit(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
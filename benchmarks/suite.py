@@ -0,0 +1,59 @@
+"""Run the whole benchmark suite and write one JSON report
+
+Run from the project root:
+
+    python -m benchmarks.suite --size small --output results.json
+    python -m benchmarks.suite --size large --url http://localhost:8000
+
+Compare two reports (say, before and after changing EMBEDDING_BATCH_SIZE or
+VECTOR_INDEX_MODE) to see the effect of a change before rolling it out.
+Query load is only measured when --url points at a running API server.
+"""
+import argparse
+import os
+
+from . import ingestion, query_load, recall
+from .common import emit, environment
+from .synthetic import synthetic_queries
+
+# pdf pages, chunks embedded through add_documents, chunk counts for the recall runs
+SIZES = {
+    "small": {"pages": 20, "chunks": 1000, "recall_chunks": [1000, 10000]},
+    "medium": {"pages": 100, "chunks": 10000, "recall_chunks": [10000, 100000]},
+    "large": {"pages": 500, "chunks": 100000, "recall_chunks": [100000, 1000000]},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", choices=SIZES, default="small")
+    parser.add_argument("--index-mode", default=os.getenv("VECTOR_INDEX_MODE", "chroma"))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--engines", nargs="+", choices=recall.ENGINES, default=list(recall.ENGINES))
+    parser.add_argument("--url", help="API server for the query load benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    size = SIZES[args.size]
+    report = {
+        "environment": environment(),
+        "size": args.size,
+        "pdf_processing": ingestion.bench_pdf(size["pages"]),
+        "add_documents": ingestion.bench_add_documents(size["chunks"], args.batch_sizes, args.index_mode),
+        "recall": recall.run(size["recall_chunks"], args.engines, queries=100, dim=384, top_k=5),
+    }
+
+    if args.url:
+        queries = synthetic_queries(args.requests)
+        report["query_load"] = [
+            query_load.run_level(args.url, queries, level, 0.5, 5, "/check-compliance/")
+            for level in args.concurrency
+        ]
+
+    emit(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
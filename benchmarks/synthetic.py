@@ -0,0 +1,136 @@
+"""Synthetic legal text, PDFs, chunks and embeddings for the benchmarks
+
+Everything is generated from a seed, so two runs with the same arguments
+measure the same workload.
+"""
+import random
+from typing import Dict, List
+
+import numpy as np
+
+# Clause templates per cause, using the keywords PDFProcessor.identify_cause looks for
+CLAUSES = {
+    "Contract Breach": [
+        "Any breach of the obligations in section {n} shall entitle the {party} to terminate this agreement.",
+        "A material violation of these terms constitutes non-compliance and must be cured within {days} days.",
+    ],
+    "Privacy Violation": [
+        "The {party} shall process personal data only in accordance with GDPR and applicable data protection law.",
+        "Privacy notices must be provided before any personal data is collected from {subject}.",
+    ],
+    "IP Infringement": [
+        "All intellectual property, including copyright and patent rights, remains with the {party}.",
+        "The {party} shall not use any trademark of the other party without prior written consent.",
+    ],
+    "Fraud": [
+        "Any fraud or misrepresentation in the information provided by the {party} voids this agreement.",
+        "Deceptive practices in marketing to {subject} are strictly prohibited.",
+    ],
+    "Liability Issues": [
+        "The liability of the {party} for damages shall not exceed the fees paid in the preceding {months} months.",
+        "The {party} shall provide indemnity against third-party claims and a warranty of fitness for purpose.",
+    ],
+    "Payment Terms": [
+        "Payment of each invoice is due within {days} days; late fees accrue at {rate} percent per month.",
+        "The price for the services is fixed for {months} months and excludes applicable taxes.",
+    ],
+    "Confidentiality": [
+        "All confidential information disclosed under this NDA must be kept secret for {months} months.",
+        "The non-disclosure obligations of the {party} survive termination of this agreement.",
+    ],
+    "General Compliance": [
+        "Employee shall not work in the same industry for {months} months after leaving the {party}.",
+        "This agreement is governed by the laws of the state in which the {party} is registered.",
+        "Notices must be delivered in writing to the address of the {party} listed above.",
+    ],
+}
+CAUSES = list(CLAUSES)
+PARTIES = ["Company", "Supplier", "Customer", "Contractor", "Licensee", "Employer"]
+SUBJECTS = ["customers", "employees", "end users", "minors", "applicants"]
+
+
+def clause(rng: random.Random, cause: str) -> str:
+    return rng.choice(CLAUSES[cause]).format(
+        n=rng.randint(1, 40),
+        party=rng.choice(PARTIES),
+        subject=rng.choice(SUBJECTS),
+        days=rng.choice([7, 14, 30, 60, 90]),
+        months=rng.choice([6, 12, 24, 36, 120]),
+        rate=rng.choice([1, 1.5, 2]),
+    )
+
+
+def legal_text(rng: random.Random, sentences: int) -> str:
+    return " ".join(clause(rng, rng.choice(CAUSES)) for _ in range(sentences))
+
+
+def make_pdf(pages: List[str]) -> bytes:
+    """A minimal single-font PDF with one text page per string"""
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    # Each page adds a content stream and a page object; the page tree comes right after
+    pages_id = len(objects) + 1 + 2 * len(pages)
+    page_ids = []
+    for text in pages:
+        text = text.replace("\\", "").replace("(", "").replace(")", "")
+        lines = [text[i:i + 90] for i in range(0, len(text), 90)]
+        stream = ("BT /F1 10 Tf 50 800 Td 12 TL " + " ".join(f"({line}) '" for line in lines) + " ET").encode("latin-1", "replace")
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 842] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (pages_id, content, font)
+        ))
+    add(b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % p for p in page_ids) + b"] /Count %d >>" % len(page_ids))
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    return out
+
+
+def legal_pdf(pages: int, seed: int = 0, sentences_per_page: int = 25) -> bytes:
+    rng = random.Random(seed)
+    return make_pdf([legal_text(rng, sentences_per_page) for _ in range(pages)])
+
+
+def synthetic_chunks(count: int, seed: int = 0, documents: int = 100) -> List[Dict]:
+    """Chunk dicts shaped like PDFProcessor output, ready for VectorStore.add_documents"""
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(count):
+        cause = rng.choice(CAUSES)
+        chunks.append({
+            "text": " ".join(clause(rng, cause) for _ in range(4)),
+            "cause": cause,
+            "chunk_id": f"chunk_{i}",
+            "title": f"Synthetic contract {i % documents}",
+            "document_id": f"doc_{i % documents}",
+        })
+    return chunks
+
+
+def synthetic_queries(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed + 1)
+    return [legal_text(rng, 2) for _ in range(count)]
+
+
+def synthetic_embeddings(count: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    """Normalized vectors drawn around random centroids, like sentence embeddings"""
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((clusters, dim)).astype(np.float32)
+    assignment = rng.integers(0, clusters, count)
+    vectors = centroids[assignment] + 0.6 * rng.standard_normal((count, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
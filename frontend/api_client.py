@@ -0,0 +1,178 @@
+import hashlib
+import io
+import json
+import os
+
+import PyPDF2
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+# Backend API URL
+API_URL = os.getenv("API_URL", "http://localhost:8000")
+
+
+class ApiError(Exception):
+    """Backend answered with a non-200 status"""
+
+    def __init__(self, status_code: int, detail: str = ""):
+        super().__init__(f"Status {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One keep-alive session per Streamlit server, shared by every rerun"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _get_json(path: str, timeout: int = 10):
+    response = get_session().get(f"{API_URL}{path}", timeout=timeout)
+    if response.status_code != 200:
+        raise ApiError(response.status_code, response.text[:200])
+    return response.json()
+
+
+# Cached reads: Streamlit reruns the whole script on every widget change,
+# so these only hit the backend when the TTL expires or after invalidate()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_documents() -> list:
+    return _get_json("/documents/")
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_stats() -> dict:
+    return _get_json("/stats")
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def fetch_health() -> dict:
+    return _get_json("/health", timeout=5)
+
+
+def invalidate():
+    """Drop cached reads after anything that changes the corpus"""
+    fetch_documents.clear()
+    fetch_stats.clear()
+
+
+# Writes go straight to the backend and invalidate the cached reads
+
+def delete_document(document_id: str) -> requests.Response:
+    response = get_session().delete(f"{API_URL}/document/{document_id}", timeout=10)
+    if response.status_code == 200:
+        invalidate()
+    return response
+
+
+# Chunked uploads: bytes go up in pieces and ingestion runs in the background,
+# so a large PDF never hits a request timeout
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+def _json_or_raise(response: requests.Response) -> dict:
+    if response.status_code != 200:
+        raise ApiError(response.status_code, response.text[:200])
+    return response.json()
+
+
+def start_upload(title: str, description: str, category: str, filename: str, total_size: int) -> dict:
+    response = get_session().post(
+        f"{API_URL}/uploads/",
+        json={
+            "title": title,
+            "description": description,
+            "category": category,
+            "filename": filename,
+            "total_size": total_size
+        },
+        timeout=10
+    )
+    return _json_or_raise(response)
+
+
+def send_upload_bytes(upload_id: str, data: bytes, on_progress=None) -> dict:
+    """Send data in chunks, resuming from the server's offset after a conflict"""
+    offset = 0
+    progress = {}
+    while offset < len(data):
+        response = get_session().put(
+            f"{API_URL}/uploads/{upload_id}",
+            params={"offset": offset},
+            data=data[offset:offset + UPLOAD_CHUNK_BYTES],
+            timeout=30
+        )
+        if response.status_code == 409:
+            resume_at = response.json()["detail"]["received_bytes"]
+            if resume_at == offset:
+                raise ApiError(409, response.text[:200])
+            offset = resume_at
+            continue
+        progress = _json_or_raise(response)
+        offset = progress["received_bytes"]
+        if on_progress:
+            on_progress(progress)
+    return progress
+
+
+def complete_upload(upload_id: str) -> dict:
+    response = get_session().post(f"{API_URL}/uploads/{upload_id}/complete", timeout=10)
+    return _json_or_raise(response)
+
+
+def get_upload(upload_id: str) -> dict:
+    response = get_session().get(f"{API_URL}/uploads/{upload_id}", timeout=10)
+    return _json_or_raise(response)
+
+
+def check_compliance(payload: dict, timeout: int = 30) -> requests.Response:
+    return get_session().post(f"{API_URL}/check-compliance/", json=payload, timeout=timeout)
+
+
+def stream_compliance(payload: dict, timeout: int = 30):
+    """Yield (event, data) pairs from the streaming compliance endpoint
+
+    timeout applies between events, not to the whole check.
+    """
+    with get_session().post(
+        f"{API_URL}/check-compliance/stream",
+        json=payload,
+        stream=True,
+        timeout=timeout
+    ) as response:
+        if response.status_code != 200:
+            raise ApiError(response.status_code, response.text[:200])
+
+        event, data = "message", []
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data.append(line[len("data:"):].strip())
+            elif not line and data:
+                yield event, json.loads("\n".join(data))
+                event, data = "message", []
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _extract_pdf_text(file_hash: str, _data: bytes) -> str:
+    # Keyed on file_hash only; the leading underscore stops Streamlit hashing the bytes
+    reader = PyPDF2.PdfReader(io.BytesIO(_data))
+    extracted_text = ""
+    for page in reader.pages:
+        text = page.extract_text()
+        if text:
+            extracted_text += text
+    return extracted_text
+
+
+def extract_pdf_text(data: bytes) -> str:
+    """Extract text from PDF bytes, parsing each distinct file only once"""
+    return _extract_pdf_text(hashlib.sha256(data).hexdigest(), data)
@@ -1,12 +1,10 @@
 import streamlit as st
 import requests
 import os
+import time
 from datetime import datetime
-import io
-import PyPDF2
 
-# Backend API URL
-API_URL = "http://localhost:8000"
+import api_client
 
 st.set_page_config(
     page_title="Compliance Checker",
@@ -85,6 +83,71 @@ if 'compliance_results' not in st.session_state:
     st.session_state.compliance_results = None
 if 'show_delete_confirm' not in st.session_state:
     st.session_state.show_delete_confirm = None
+if 'active_uploads' not in st.session_state:
+    st.session_state.active_uploads = []
+
+def render_report(report):
+    """Render a finished compliance report"""
+    # Get values safely
+    total_matches = report.get("total_matches", 0)
+    high_risk_causes = report.get("high_risk_causes", [])
+    results_by_cause = report.get("results_by_cause", {})
+    recommendations = report.get("recommendations", [])
+    
+    # Metrics
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Matches", total_matches)
+    with col2:
+        st.metric("High Risk Issues", len(high_risk_causes))
+    with col3:
+        if high_risk_causes:
+            risk = "🔴 HIGH"
+        elif total_matches > 0:
+            risk = "🟡 MEDIUM"
+        else:
+            risk = "🟢 LOW"
+        st.metric("Risk Level", risk)
+    
+    # High risk causes
+    if high_risk_causes:
+        st.markdown('<div class="warning-box">', unsafe_allow_html=True)
+        st.markdown("### 🚨 High Risk Compliance Issues")
+        for risk in high_risk_causes:
+            st.write(f"**{risk.get('cause', 'Unknown')}**: {risk.get('count', 0)} matches")
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Detailed results
+    if results_by_cause:
+        st.markdown("### 📋 Detailed Matches")
+        for cause, docs in results_by_cause.items():
+            with st.expander(f"**{cause}** ({len(docs)} matches)", expanded=False):
+                for i, doc in enumerate(docs):
+                    st.write(f"**Match {i+1}:** {doc.get('similarity_score', 0):.1%} similar")
+                    st.write(f"**Document:** {doc.get('document_title', 'Unknown')}")
+                    if doc.get('cluster_size', 1) > 1:
+                        st.caption(f"Same clause appears {doc['cluster_size']} times in the corpus")
+                    st.text_area(
+                        "Matching Text:",
+                        value=doc.get('matching_text', ''),
+                        height=100,
+                        key=f"match_{cause}_{i}",
+                        disabled=True
+                    )
+                    st.write("---")
+    elif total_matches == 0:
+        st.info("No matches found with current threshold. Try lowering the threshold.")
+    
+    # Recommendations
+    if recommendations:
+        st.markdown("### 💡 Recommendations")
+        for rec in recommendations:
+            st.info(rec)
+    else:
+        if total_matches == 0:
+            st.success("✅ No significant compliance issues found.")
+        else:
+            st.info("Review the matches above for potential issues.")
 
 # App Header
 st.markdown("<h1 class='main-header'>⚖️ Legal Compliance Checker</h1>", unsafe_allow_html=True)
@@ -116,11 +179,10 @@ with st.sidebar:
     # Health check
     if st.button("Check API Health", key="health_check"):
         try:
-            response = requests.get(f"{API_URL}/health", timeout=5)
-            if response.status_code == 200:
-                st.success("✅ API Connected")
-            else:
-                st.error(f"❌ API Error: Status {response.status_code}")
+            api_client.fetch_health()
+            st.success("✅ API Connected")
+        except api_client.ApiError as e:
+            st.error(f"❌ API Error: Status {e.status_code}")
         except requests.exceptions.ConnectionError:
             st.error("❌ Cannot connect to API")
             st.info("Start backend: python -m uvicorn backend.main:app --reload")
@@ -129,7 +191,7 @@ with st.sidebar:
 
 # ==================== UPLOAD DOCUMENTS PAGE ====================
 if page == "📤 Upload Documents":
-    st.header("📤 Upload Legal Document")
+    st.header("📤 Upload Legal Documents")
     
     with st.form("upload_form", clear_on_submit=True):
         col1, col2 = st.columns(2)
@@ -156,76 +218,118 @@ if page == "📤 Upload Documents":
         )
         
         st.markdown('<div class="upload-box">', unsafe_allow_html=True)
-        uploaded_file = st.file_uploader(
-            "**Choose PDF file***", 
+        selected_files = st.file_uploader(
+            "**Choose PDF files***", 
             type="pdf",
-            help="Select a PDF to upload and index"
+            accept_multiple_files=True,
+            help="Select one or more PDFs to upload and index"
         )
         st.markdown('</div>', unsafe_allow_html=True)
         
-        if uploaded_file:
-            file_size = uploaded_file.size
-            st.info(f"📄 **Selected:** {uploaded_file.name} ({file_size/1024:.1f} KB)")
+        for selected in selected_files or []:
+            st.info(f"📄 **Selected:** {selected.name} ({selected.size/1024:.1f} KB)")
         
-        submitted = st.form_submit_button("🚀 Upload & Index Document", type="primary")
+        submitted = st.form_submit_button("🚀 Upload & Index Documents", type="primary")
         
         if submitted:
             if not title:
                 st.error("❌ Please enter a document title")
-            elif not uploaded_file:
+            elif not selected_files:
                 st.error("❌ Please select a PDF file")
             else:
-                with st.spinner("📤 Uploading and processing..."):
-                    try:
-                        files = {
-                            'file': (uploaded_file.name, uploaded_file.getvalue(), 'application/pdf')
-                        }
-                        
-                        data = {
-                            'title': title,
-                            'description': description,
-                            'category': category.lower().replace(" ", "_")
-                        }
-                        
-                        response = requests.post(
-                            f"{API_URL}/upload/",
-                            files=files,
-                            data=data,
-                            timeout=30
+                try:
+                    for selected in selected_files:
+                        data = selected.getvalue()
+                        # With several files, tell them apart by file name
+                        file_title = title if len(selected_files) == 1 else f"{title} - {selected.name}"
+                        upload = api_client.start_upload(
+                            file_title,
+                            description,
+                            category.lower().replace(" ", "_"),
+                            selected.name,
+                            len(data)
                         )
                         
-                        if response.status_code == 200:
-                            result = response.json()
-                            st.markdown('<div class="success-box">', unsafe_allow_html=True)
-                            st.success("✅ **Document uploaded and indexed!**")
-                            st.write(f"**Title:** {result['title']}")
-                            st.write(f"**ID:** {result['id']}")
-                            st.write(f"**Category:** {result['category'].replace('_', ' ').title()}")
-                            st.markdown('</div>', unsafe_allow_html=True)
-                            
-                            with st.expander("📋 View Details", expanded=False):
-                                st.json(result)
-                            
-                            st.session_state.uploaded_files.append({
-                                "id": result["id"],
-                                "title": result["title"],
-                                "uploaded_at": result["uploaded_at"]
-                            })
-                            
-                        else:
-                            st.markdown('<div class="error-box">', unsafe_allow_html=True)
-                            try:
-                                error_detail = response.json().get('detail', 'Unknown error')
-                                st.error(f"❌ Upload failed: {error_detail}")
-                            except:
-                                st.error(f"❌ Upload failed with status: {response.status_code}")
-                            st.markdown('</div>', unsafe_allow_html=True)
-                            
-                    except requests.exceptions.ConnectionError:
-                        st.error("❌ Cannot connect to backend server")
-                        st.info("Run: `python -m uvicorn backend.main:app --reload`")
-                    except Exception as e:
-                        st.error(f"❌ Error: {str(e)}")
+                        bar = st.progress(0.0, text=f"📤 Uploading {selected.name}")
+                        api_client.send_upload_bytes(
+                            upload["upload_id"],
+                            data,
+                            on_progress=lambda p, bar=bar, name=selected.name: bar.progress(
+                                p["received_bytes"] / p["total_size"],
+                                text=f"📤 Uploading {name}"
+                            )
+                        )
+                        api_client.complete_upload(upload["upload_id"])
+                        st.session_state.active_uploads.append(upload["upload_id"])
+                
+                except api_client.ApiError as e:
+                    st.error(f"❌ Upload failed: {e.detail}")
+                except requests.exceptions.ConnectionError:
+                    st.error("❌ Cannot connect to backend server")
+                    st.info("Run: `python -m uvicorn backend.main:app --reload`")
+                except Exception as e:
+                    st.error(f"❌ Error: {str(e)}")
+    
+    # Live ingestion progress for queued uploads
+    if st.session_state.active_uploads:
+        st.subheader("⏳ Processing")
+        placeholders = {upload_id: st.empty() for upload_id in st.session_state.active_uploads}
+        finished = {}
+        
+        try:
+            while len(finished) < len(placeholders):
+                for upload_id, placeholder in placeholders.items():
+                    if upload_id in finished:
+                        continue
+                    progress = api_client.get_upload(upload_id)
+                    
+                    if progress["status"] in ("completed", "failed"):
+                        finished[upload_id] = progress
+                        placeholder.empty()
+                        continue
+                    
+                    if progress["stage"] == "embedding" and progress["chunks_total"]:
+                        fraction = progress["chunks_embedded"] / progress["chunks_total"]
+                        detail = f"{progress['chunks_embedded']}/{progress['chunks_total']} chunks embedded"
+                    elif progress["pages_total"]:
+                        fraction = progress["pages_parsed"] / progress["pages_total"]
+                        detail = f"{progress['pages_parsed']}/{progress['pages_total']} pages parsed"
+                    else:
+                        fraction = 0.0
+                        detail = progress["stage"]
+                    placeholder.progress(fraction, text=f"⚙️ {progress['filename']}: {detail}")
+                
+                if len(finished) < len(placeholders):
+                    time.sleep(1)
+        except (api_client.ApiError, requests.exceptions.ConnectionError) as e:
+            st.error(f"❌ Lost track of upload progress: {e}")
+        
+        st.session_state.active_uploads = [u for u in st.session_state.active_uploads if u not in finished]
+        if finished:
+            api_client.invalidate()
+        
+        for progress in finished.values():
+            if progress["status"] == "completed":
+                result = progress["document"]
+                st.markdown('<div class="success-box">', unsafe_allow_html=True)
+                st.success("✅ **Document uploaded and indexed!**")
+                st.write(f"**Title:** {result['title']}")
+                st.write(f"**ID:** {result['id']}")
+                st.write(f"**Category:** {result['category'].replace('_', ' ').title()}")
+                st.markdown('</div>', unsafe_allow_html=True)
+                
+                with st.expander("📋 View Details", expanded=False):
+                    st.json(result)
+                
+                st.session_state.uploaded_files.append({
+                    "id": result["id"],
+                    "title": result["title"],
+                    "uploaded_at": result["uploaded_at"]
+                })
+            else:
+                st.markdown('<div class="error-box">', unsafe_allow_html=True)
+                st.error(f"❌ Upload failed for {progress['filename']}: {progress.get('error') or 'Unknown error'}")
+                st.markdown('</div>', unsafe_allow_html=True)
 
 # ==================== CHECK COMPLIANCE PAGE ====================
 elif page == "🔍 Check Compliance":
@@ -262,18 +366,13 @@ Example: Employee cannot work in same industry for 10 years after leaving job.""
         
         if uploaded_query:
             try:
-                reader = PyPDF2.PdfReader(io.BytesIO(uploaded_query.getvalue()))
-                extracted_text = ""
-                for page in reader.pages:
-                    text = page.extract_text()
-                    if text:
-                        extracted_text += text
+                extracted_text = api_client.extract_pdf_text(uploaded_query.getvalue())
                 
                 if extracted_text.strip():
                     st.success(f"✅ Extracted {len(extracted_text)} characters")
                     query_text = st.text_area(
                         "Extracted Text:",
-                        value=extracted_text[:2000],
+                        value=extracted_text,
                         height=200,
                         key="extracted_text"
                     )
@@ -301,6 +400,21 @@ Example: Employee cannot work in same industry for 10 years after leaving job.""
                 value=5,
                 help="Maximum results to return"
             )
+        search_category = st.selectbox(
+            "Search In",
+            ["All Categories", "Contract", "Policy", "Regulation", "Case Law", "Other"],
+            help="Only compare against documents of this category"
+        )
+        collapse_duplicates = st.checkbox(
+            "Collapse near-duplicate clauses",
+            value=True,
+            help="Show repeated boilerplate once, with how often it occurs"
+        )
+        rerank = st.checkbox(
+            "Re-rank results",
+            value=False,
+            help="Re-score the best candidates with a slower, more precise model"
+        )
     
     # Check Compliance button
     check_button = st.button("🔍 Check Compliance", type="primary", key="check_compliance_main", use_container_width=True)
@@ -311,100 +425,58 @@ Example: Employee cannot work in same industry for 10 years after leaving job.""
         elif len(query_text.strip()) < 5:
             st.warning("⚠️ Please enter at least 5 characters")
         else:
-            with st.spinner("🔍 Analyzing for compliance issues..."):
-                try:
-                    response = requests.post(
-                        f"{API_URL}/check-compliance/",
-                        json={
-                            "query_text": query_text.strip(),
-                            "threshold": threshold,
-                            "top_k": top_k
-                        },
-                        timeout=30
-                    )
-                    
-                    if response.status_code == 200:
-                        report = response.json()
-                        st.session_state.compliance_results = report
-                        
-                        # Display results
-                        st.markdown("---")
-                        st.markdown("## 📊 Analysis Results")
-                        
-                        # Get values safely
-                        total_matches = report.get("total_matches", 0)
-                        high_risk_causes = report.get("high_risk_causes", [])
-                        results_by_cause = report.get("results_by_cause", {})
-                        recommendations = report.get("recommendations", [])
-                        
-                        # Metrics
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Total Matches", total_matches)
-                        with col2:
-                            st.metric("High Risk Issues", len(high_risk_causes))
-                        with col3:
-                            if high_risk_causes:
-                                risk = "🔴 HIGH"
-                            elif total_matches > 0:
-                                risk = "🟡 MEDIUM"
-                            else:
-                                risk = "🟢 LOW"
-                            st.metric("Risk Level", risk)
-                        
-                        # High risk causes
-                        if high_risk_causes:
-                            st.markdown('<div class="warning-box">', unsafe_allow_html=True)
-                            st.markdown("### 🚨 High Risk Compliance Issues")
-                            for risk in high_risk_causes:
-                                st.write(f"**{risk.get('cause', 'Unknown')}**: {risk.get('count', 0)} matches")
-                            st.markdown('</div>', unsafe_allow_html=True)
-                        
-                        # Detailed results
-                        if results_by_cause:
-                            st.markdown("### 📋 Detailed Matches")
-                            for cause, docs in results_by_cause.items():
-                                with st.expander(f"**{cause}** ({len(docs)} matches)", expanded=False):
-                                    for i, doc in enumerate(docs):
-                                        st.write(f"**Match {i+1}:** {doc.get('similarity_score', 0):.1%} similar")
-                                        st.write(f"**Document:** {doc.get('document_title', 'Unknown')}")
-                                        st.text_area(
-                                            "Matching Text:",
-                                            value=doc.get('matching_text', ''),
-                                            height=100,
-                                            key=f"match_{cause}_{i}",
-                                            disabled=True
-                                        )
-                                        st.write("---")
-                        elif total_matches == 0:
-                            st.info("No matches found with current threshold. Try lowering the threshold.")
-                        
-                        # Recommendations
-                        if recommendations:
-                            st.markdown("### 💡 Recommendations")
-                            for rec in recommendations:
-                                st.info(rec)
-                        else:
-                            if total_matches == 0:
-                                st.success("✅ No significant compliance issues found.")
-                            else:
-                                st.info("Review the matches above for potential issues.")
-                    
-                    else:
-                        st.error(f"❌ API Error: Status {response.status_code}")
-                        try:
-                            error_detail = response.json().get('detail', response.text[:200])
-                            st.error(f"Details: {error_detail}")
-                        except:
-                            pass
-                
-                except requests.exceptions.ConnectionError:
-                    st.error("❌ Cannot connect to backend server")
-                    st.info("Make sure backend is running: http://localhost:8000")
-                except requests.exceptions.Timeout:
-                    st.error("❌ Request timed out. Server might be busy.")
-                except Exception as e:
-                    st.error(f"❌ Error: {str(e)}")
+            st.markdown("---")
+            st.markdown("## 📊 Analysis Results")
+            
+            # Matches are shown as they stream in, then replaced by the full report
+            live = st.empty()
+            live_matches = live.container()
+            status = live_matches.empty()
+            status.info("🔍 Analyzing for compliance issues...")
+            match_count = 0
+            
+            payload = {
+                "query_text": query_text.strip(),
+                "threshold": threshold,
+                "top_k": top_k,
+                "collapse_duplicates": collapse_duplicates,
+                "rerank": rerank
+            }
+            if search_category != "All Categories":
+                payload["category"] = search_category.lower().replace(" ", "_")
+            
+            try:
+                for event, data in api_client.stream_compliance(payload, timeout=30):
+                    if event == "match":
+                        match_count += 1
+                        status.info(f"🔍 Analyzing... {match_count} matches so far")
+                        live_matches.write(
+                            f"**{data.get('similarity_score', 0):.1%}** · {data.get('cause', 'Unknown')} · "
+                            f"{data.get('document_title', 'Unknown')}"
+                        )
+                    elif event == "report":
+                        st.session_state.compliance_results = data
+                        live.empty()
+                        render_report(data)
+                    elif event == "error":
+                        live.empty()
+                        st.error(f"❌ Compliance check failed: {data.get('detail', '')}")
+            
+            except api_client.ApiError as e:
+                live.empty()
+                st.error(f"❌ API Error: Status {e.status_code}")
+                if e.detail:
+                    st.error(f"Details: {e.detail}")
+            except requests.exceptions.ConnectionError:
+                live.empty()
+                st.error("❌ Cannot connect to backend server")
+                st.info("Make sure backend is running: http://localhost:8000")
+            except requests.exceptions.Timeout:
+                live.empty()
+                st.error("❌ Request timed out. Server might be busy.")
+            except Exception as e:
+                live.empty()
+                st.error(f"❌ Error: {str(e)}")
     
     # Show previous results if available
     if st.session_state.compliance_results:
@@ -418,117 +490,112 @@ elif page == "📚 View Documents":
     
     try:
         with st.spinner("Loading documents..."):
-            response = requests.get(f"{API_URL}/documents/", timeout=10)
+            documents = api_client.fetch_documents()
             
-            if response.status_code == 200:
-                documents = response.json()
-                
-                # Summary
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Total Documents", len(documents))
-                with col2:
-                    indexed = len([d for d in documents if d.get("vector_id")])
-                    st.metric("Indexed", indexed)
-                with col3:
-                    if documents:
-                        categories = len(set([d.get("category", "").replace("_", " ").title() for d in documents]))
-                        st.metric("Categories", categories)
-                
-                # Search and filter
-                st.markdown("### 🔍 Search & Filter")
-                search_col1, search_col2 = st.columns([3, 1])
-                with search_col1:
-                    search_query = st.text_input("Search documents:", placeholder="Search by title or description...", key="doc_search")
-                with search_col2:
-                    filter_category = st.selectbox("Category", ["All", "Contract", "Policy", "Regulation", "Case Law", "Other"], key="cat_filter")
-                
-                # Filter documents
-                filtered_docs = documents
-                if search_query:
-                    filtered_docs = [
-                        doc for doc in documents 
-                        if search_query.lower() in doc.get("title", "").lower() 
-                        or search_query.lower() in doc.get("description", "").lower()
-                    ]
-                
-                if filter_category != "All":
-                    filtered_docs = [
-                        doc for doc in filtered_docs 
-                        if doc.get("category", "").replace("_", " ").title() == filter_category
-                    ]
+            # Summary from the server-side counters
+            stats = api_client.fetch_stats()
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total Documents", stats.get("total_documents", len(documents)))
+            with col2:
+                st.metric("Indexed", stats.get("indexed_documents", 0))
+            with col3:
+                if documents:
+                    st.metric("Categories", len(stats.get("documents_by_category", {})))
+            
+            # Search and filter
+            st.markdown("### 🔍 Search & Filter")
+            search_col1, search_col2 = st.columns([3, 1])
+            with search_col1:
+                search_query = st.text_input("Search documents:", placeholder="Search by title or description...", key="doc_search")
+            with search_col2:
+                filter_category = st.selectbox("Category", ["All", "Contract", "Policy", "Regulation", "Case Law", "Other"], key="cat_filter")
+            
+            # Filter documents
+            filtered_docs = documents
+            if search_query:
+                filtered_docs = [
+                    doc for doc in documents 
+                    if search_query.lower() in doc.get("title", "").lower() 
+                    or search_query.lower() in doc.get("description", "").lower()
+                ]
+            
+            if filter_category != "All":
+                filtered_docs = [
+                    doc for doc in filtered_docs 
+                    if doc.get("category", "").replace("_", " ").title() == filter_category
+                ]
+            
+            # Display documents with DELETE option
+            if not filtered_docs:
+                st.info("No documents found matching your criteria.")
+            else:
+                st.markdown(f"**Showing {len(filtered_docs)} document(s)**")
                 
-                # Display documents with DELETE option
-                if not filtered_docs:
-                    st.info("No documents found matching your criteria.")
-                else:
-                    st.markdown(f"**Showing {len(filtered_docs)} document(s)**")
-                    
-                    for doc in filtered_docs:
-                        with st.container():
-                            st.markdown("---")
-                            
-                            col1, col2, col3 = st.columns([3, 1, 1])
+                for doc in filtered_docs:
+                    with st.container():
+                        st.markdown("---")
+                        
+                        col1, col2, col3 = st.columns([3, 1, 1])
+                        
+                        with col1:
+                            st.markdown(f"### {doc.get('title', 'Untitled')}")
+                            if doc.get("description"):
+                                st.write(f"*{doc.get('description')}*")
                             
-                            with col1:
-                                st.markdown(f"### {doc.get('title', 'Untitled')}")
-                                if doc.get("description"):
-                                    st.write(f"*{doc.get('description')}*")
-                                
-                                # Metadata
-                                meta_col1, meta_col2, meta_col3 = st.columns(3)
-                                with meta_col1:
-                                    cat = doc.get("category", "other").replace("_", " ").title()
-                                    st.caption(f"**Category:** {cat}")
-                                with meta_col2:
-                                    date = doc.get("uploaded_at", "")[:10]
-                                    st.caption(f"**Uploaded:** {date}")
-                                with meta_col3:
-                                    if doc.get("vector_id"):
-                                        st.success("✅ Indexed")
-                                    else:
-                                        st.warning("⚠️ Not Indexed")
+                            # Metadata
+                            meta_col1, meta_col2, meta_col3 = st.columns(3)
+                            with meta_col1:
+                                cat = doc.get("category", "other").replace("_", " ").title()
+                                st.caption(f"**Category:** {cat}")
+                            with meta_col2:
+                                date = doc.get("uploaded_at", "")[:10]
+                                st.caption(f"**Uploaded:** {date}")
+                            with meta_col3:
+                                if doc.get("vector_id"):
+                                    st.success("✅ Indexed")
+                                else:
+                                    st.warning("⚠️ Not Indexed")
+                        
+                        with col2:
+                            if st.button("📄 View", key=f"view_{doc.get('id')}"):
+                                st.session_state.selected_doc = doc.get('id')
+                                st.rerun()
+                        
+                        with col3:
+                            # DELETE button with confirmation
+                            delete_key = f"delete_{doc.get('id')}"
+                            if delete_key not in st.session_state:
+                                st.session_state[delete_key] = False
                             
-                            with col2:
-                                if st.button("📄 View", key=f"view_{doc.get('id')}"):
-                                    st.session_state.selected_doc = doc.get('id')
+                            if not st.session_state[delete_key]:
+                                if st.button("🗑️ Delete", key=f"del_btn_{doc.get('id')}"):
+                                    st.session_state[delete_key] = True
+                                    st.session_state.show_delete_confirm = doc.get('id')
                                     st.rerun()
-                            
-                            with col3:
-                                # DELETE button with confirmation
-                                delete_key = f"delete_{doc.get('id')}"
-                                if delete_key not in st.session_state:
-                                    st.session_state[delete_key] = False
-                                
-                                if not st.session_state[delete_key]:
-                                    if st.button("🗑️ Delete", key=f"del_btn_{doc.get('id')}"):
-                                        st.session_state[delete_key] = True
-                                        st.session_state.show_delete_confirm = doc.get('id')
+                            else:
+                                # Show confirmation
+                                st.warning(f"Delete '{doc.get('title', 'this document')}'?")
+                                col_yes, col_no = st.columns(2)
+                                with col_yes:
+                                    if st.button("✅ Yes", key=f"confirm_yes_{doc.get('id')}"):
+                                        try:
+                                            delete_response = api_client.delete_document(doc.get('id'))
+                                            if delete_response.status_code == 200:
+                                                st.success("✅ Document deleted successfully!")
+                                                st.session_state[delete_key] = False
+                                                st.rerun()
+                                            else:
+                                                st.error("Failed to delete document")
+                                        except:
+                                            st.error("Error deleting document")
+                                with col_no:
+                                    if st.button("❌ No", key=f"confirm_no_{doc.get('id')}"):
+                                        st.session_state[delete_key] = False
                                         st.rerun()
-                                else:
-                                    # Show confirmation
-                                    st.warning(f"Delete '{doc.get('title', 'this document')}'?")
-                                    col_yes, col_no = st.columns(2)
-                                    with col_yes:
-                                        if st.button("✅ Yes", key=f"confirm_yes_{doc.get('id')}"):
-                                            try:
-                                                delete_response = requests.delete(f"{API_URL}/document/{doc.get('id')}")
-                                                if delete_response.status_code == 200:
-                                                    st.success("✅ Document deleted successfully!")
-                                                    st.session_state[delete_key] = False
-                                                    st.rerun()
-                                                else:
-                                                    st.error("Failed to delete document")
-                                            except:
-                                                st.error("Error deleting document")
-                                    with col_no:
-                                        if st.button("❌ No", key=f"confirm_no_{doc.get('id')}"):
-                                            st.session_state[delete_key] = False
-                                            st.rerun()
-            
-            else:
-                st.error(f"Failed to fetch documents: Status {response.status_code}")
     
+    except api_client.ApiError as e:
+        st.error(f"Failed to fetch documents: Status {e.status_code}")
     except requests.exceptions.ConnectionError:
         st.error("❌ Cannot connect to backend server")
     except Exception as e:
@@ -539,54 +606,60 @@ elif page == "📊 Dashboard":
     st.header("📊 Dashboard")
     
     try:
-        response = requests.get(f"{API_URL}/documents/", timeout=10)
+        stats = api_client.fetch_stats()
+        categories = stats.get("documents_by_category", {})
         
-        if response.status_code == 200:
-            documents = response.json()
+        if stats.get("total_documents", 0):
+            # Stats
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Total", stats["total_documents"])
+            with col2:
+                st.metric("Contracts", categories.get("contract", 0))
+            with col3:
+                st.metric("Policies", categories.get("policy", 0))
+            with col4:
+                st.metric("Indexed", stats.get("indexed_documents", 0))
             
-            if documents:
-                # Stats
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Total", len(documents))
-                with col2:
-                    contracts = len([d for d in documents if "contract" in d.get("category", "").lower()])
-                    st.metric("Contracts", contracts)
-                with col3:
-                    policies = len([d for d in documents if "policy" in d.get("category", "").lower()])
-                    st.metric("Policies", policies)
-                with col4:
-                    indexed = len([d for d in documents if d.get("vector_id")])
-                    st.metric("Indexed", indexed)
-                
-                # Categories
-                st.subheader("Categories")
-                categories = {}
-                for doc in documents:
-                    cat = doc.get("category", "other").replace("_", " ").title()
-                    categories[cat] = categories.get(cat, 0) + 1
-                
-                # Show categories
-                cat_items = list(categories.items())
-                for i in range(0, len(cat_items), 3):
-                    row = cat_items[i:i+3]
-                    cols = st.columns(len(row))
-                    for j, (cat, count) in enumerate(row):
-                        with cols[j]:
-                            st.metric(cat, count)
-                
-                # Recent uploads
-                st.subheader("Recent Uploads")
-                recent = sorted(documents, key=lambda x: x.get("uploaded_at", ""), reverse=True)[:5]
-                for doc in recent:
-                    st.write(f"• **{doc.get('title', 'Untitled')}** - {doc.get('uploaded_at', '')[:10]}")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Chunks", stats.get("total_chunks", 0))
+            with col2:
+                st.metric("Stored", f"{stats.get('bytes_stored', 0) / (1024 * 1024):.1f} MB")
+            with col3:
+                rate = stats.get("ingest_rate", {}).get("documents_per_minute", 0)
+                st.metric("Uploads / min (last hour)", rate)
             
-            else:
-                st.info("No documents yet. Upload some first!")
+            # Categories
+            st.subheader("Categories")
+            cat_items = [
+                (cat.replace("_", " ").title(), count)
+                for cat, count in categories.items()
+            ]
+            for i in range(0, len(cat_items), 3):
+                row = cat_items[i:i+3]
+                cols = st.columns(len(row))
+                for j, (cat, count) in enumerate(row):
+                    with cols[j]:
+                        st.metric(cat, count)
+            
+            # Causes
+            causes = stats.get("chunks_by_cause", {})
+            if causes:
+                st.subheader("Chunks by Cause")
+                for cause, count in sorted(causes.items(), key=lambda x: x[1], reverse=True):
+                    st.write(f"• **{cause}**: {count}")
+            
+            # Recent uploads
+            st.subheader("Recent Uploads")
+            for doc in stats.get("recent_uploads", [])[:5]:
+                st.write(f"• **{doc.get('title', 'Untitled')}** - {doc.get('uploaded_at', '')[:10]}")
         
         else:
-            st.error("Failed to fetch data")
+            st.info("No documents yet. Upload some first!")
     
+    except api_client.ApiError:
+        st.error("Failed to fetch data")
     except requests.exceptions.ConnectionError:
         st.error("❌ Cannot connect to backend")
     except Exception as e:
@@ -0,0 +1,57 @@
+"""Multi-worker serving: gunicorn -c gunicorn.conf.py
+
+The app is imported once in the master, so the embedding model is loaded
+before the workers are forked and its weights are shared copy-on-write.
+The vector collection lives in a single index owner process that the
+master starts and every worker talks to (see backend/index_owner.py).
+"""
+import gc
+import multiprocessing
+import os
+import secrets
+
+from backend.index_owner import parse_address, run_owner, wait_for_owner
+
+wsgi_app = "backend.main:app"
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+preload_app = True
+
+# Set before the app is preloaded so VectorStore connects to the owner instead of opening the index
+os.environ.setdefault("INDEX_OWNER_ADDRESS", os.path.abspath("./index_owner.sock"))
+os.environ.setdefault("INDEX_OWNER_AUTHKEY", secrets.token_hex(16))
+
+_owner = None
+
+
+def on_starting(server):
+    global _owner
+    address = parse_address(os.environ["INDEX_OWNER_ADDRESS"])
+    authkey = os.environ["INDEX_OWNER_AUTHKEY"].encode()
+    # Spawned rather than forked: the owner needs the index, not the master's model and threads
+    _owner = multiprocessing.get_context("spawn").Process(
+        target=run_owner,
+        args=(address, authkey, "./chroma_db"),
+        name="index-owner",
+        daemon=True,
+    )
+    _owner.start()
+    if not wait_for_owner(address, authkey, process=_owner):
+        raise RuntimeError(f"Index owner did not start on {address}")
+
+    # Everything allocated so far is long-lived; keep the collector from touching, and so copying, its pages
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from backend.main import after_fork
+    after_fork()
+
+
+def on_exit(server):
+    if _owner is not None and _owner.is_alive():
+        _owner.terminate()
+        _owner.join(5)
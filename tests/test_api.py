@@ -1,6 +1,7 @@
 import pytest
 import sys
 import os
+import threading
 from pathlib import Path
 
 # Add project root to Python path
@@ -51,4 +52,112 @@ def test_check_compliance_validation():
     # Missing query_text
     bad_data = {"threshold": 0.7}
     response = client.post("/check-compliance/", json=bad_data)
-    assert response.status_code == 422  # Validation error
\ No newline at end of file
+    assert response.status_code == 422  # Validation error
+
+def test_stats_endpoint():
+    """Test corpus statistics endpoint"""
+    response = client.get("/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_documents"] >= 0
+    assert isinstance(data["documents_by_category"], dict)
+
+def test_check_compliance_stream():
+    """Test streaming compliance check ends with a report event"""
+    test_data = {
+        "query_text": "This is a test query for compliance check",
+        "threshold": 0.5,
+        "top_k": 3
+    }
+    response = client.post("/check-compliance/stream", json=test_data)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [line for line in response.text.splitlines() if line.startswith("event:")]
+    assert events[-1] == "event: report"
+
+def test_request_id_header():
+    """Test request IDs are echoed back or generated"""
+    response = client.get("/health", headers={"X-Request-ID": "abc123"})
+    assert response.headers["X-Request-ID"] == "abc123"
+    assert client.get("/health").headers["X-Request-ID"]
+
+def test_metrics_endpoint():
+    """Test Prometheus metrics endpoint"""
+    client.get("/health")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'compliance_http_requests_total{method="GET",route="/health",status="200"}' in response.text
+    assert "compliance_vector_collection_size" in response.text
+
+def test_profiled_request(monkeypatch, tmp_path):
+    """Test admin-only per-request profiling"""
+    from backend import profiling
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    
+    assert client.get("/health?profile=1").status_code == 403
+    
+    response = client.get("/health", headers={"X-Profile": "1", "X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-ID"]
+    
+    profile = client.get(f"/debug/profiles/{profile_id}", headers={"X-Admin-Token": "secret"})
+    assert profile.status_code == 200
+    assert client.get(f"/debug/profiles/{profile_id}").status_code == 403
+
+def test_full_query_queue_is_shed(monkeypatch):
+    """Test a full query queue answers 429 with Retry-After"""
+    from backend import main
+    monkeypatch.setattr(main.scheduler.classes["query"], "queue_limit", 0)
+    
+    response = client.post("/check-compliance/", json={"query_text": "Test query for load shedding"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+def test_profile_is_saved_when_request_fails(monkeypatch, tmp_path):
+    """Test a profiled request that raises still stops and saves its profiler"""
+    from backend import main, profiling
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(main, "datetime", None)
+    
+    with pytest.raises(AttributeError):
+        client.get("/health", headers={"X-Profile": "1", "X-Admin-Token": "secret"})
+    assert len(list(tmp_path.glob("*.folded"))) == 1
+    assert not any(t.name.startswith("profiler-") for t in threading.enumerate())
+
+def test_chunked_upload_without_text_fails():
+    """Test a chunked upload that indexes nothing ends failed with the indexing message"""
+    import io
+    import time
+    from PyPDF2 import PdfWriter
+    writer = PdfWriter()
+    writer.add_blank_page(width=612, height=792)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    pdf = buffer.getvalue()
+    
+    session = client.post("/uploads/", json={
+        "title": "Blank", "category": "other", "filename": "blank.pdf", "total_size": len(pdf)
+    }).json()
+    upload_id = session["upload_id"]
+    assert client.put(f"/uploads/{upload_id}?offset=0", content=pdf).json()["received_bytes"] == len(pdf)
+    client.post(f"/uploads/{upload_id}/complete")
+    
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        progress = client.get(f"/uploads/{upload_id}").json()
+        if progress["status"] in ("completed", "failed"):
+            break
+        time.sleep(0.05)
+    assert progress["status"] == "failed"
+    assert "Failed to process PDF" in progress["error"]
+
+def test_oversized_chunked_upload_is_refused():
+    """Test a chunked upload declaring more than the maximum size gets 413"""
+    from backend import main
+    response = client.post("/uploads/", json={
+        "title": "Huge", "category": "other", "filename": "huge.pdf", "total_size": main.MAX_UPLOAD_BYTES + 1
+    })
+    assert response.status_code == 413
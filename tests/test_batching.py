@@ -0,0 +1,74 @@
+import pytest
+import sys
+import os
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend import profiling
+from backend.batching import EmbeddingBatcher
+
+def _fake_encode(calls):
+    def encode(texts):
+        calls.append(len(texts))
+        time.sleep(0.01)
+        return np.array([[float(t.split("-")[1])] for t in texts], dtype=np.float32)
+    return encode
+
+def test_concurrent_requests_share_encode_calls():
+    """Test concurrent callers are coalesced and get their own rows back"""
+    calls = []
+    batcher = EmbeddingBatcher(_fake_encode(calls), max_batch_size=64, max_wait_ms=5)
+    
+    def request(i):
+        texts = [f"q-{i}", f"q-{i + 1000}"]
+        return i, batcher.encode(texts)
+    
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(request, range(64)))
+    batcher.close()
+    
+    for i, rows in results:
+        assert rows[:, 0].tolist() == [i, i + 1000]
+    assert sum(calls) == 128
+    assert len(calls) < 64
+    assert max(calls) <= 64
+
+def test_encode_errors_reach_every_caller():
+    """Test a failed batch raises in each waiting caller"""
+    def failing(texts):
+        raise ValueError("model unavailable")
+    
+    batcher = EmbeddingBatcher(failing)
+    with pytest.raises(ValueError):
+        batcher.encode(["q-1"])
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(["q-2"])
+
+def test_profiled_callers_sample_the_batched_encode():
+    """Test a profiled request's profile covers the encode run on the batcher thread"""
+    def busy_encode(texts):
+        end = time.perf_counter() + 0.1
+        while time.perf_counter() < end:
+            pass
+        return np.zeros((len(texts), 1), dtype=np.float32)
+    
+    def profiled_request():
+        profiler = profiling.start()
+        batcher.encode(["q-1"])
+        profiler.stop()
+        return profiler
+    
+    batcher = EmbeddingBatcher(busy_encode)
+    profiler = contextvars.copy_context().run(profiled_request)
+    batcher.close()
+    assert any("busy_encode" in stack for stack in profiler.stacks)
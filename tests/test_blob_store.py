@@ -0,0 +1,57 @@
+import pytest
+import sys
+import os
+import hashlib
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.blob_store import BlobStore, migrate_documents
+from backend.sqlite_store import SQLiteStore
+
+def test_shared_blob_is_kept_until_last_reference_is_released(tmp_path):
+    """Test the same content is stored once and deleted with its last reference"""
+    store = BlobStore(str(tmp_path / "blobs"), compression="gzip")
+    data = b"%PDF-1.4 " + b"shall comply " * 1000
+    digest = store.put(data, "doc1")
+
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert store.path(digest) == str(tmp_path / "blobs" / digest[:2] / digest[2:4] / f"{digest}.gz")
+    assert os.path.getsize(store.path(digest)) < len(data)
+
+    upload = tmp_path / "upload.part"
+    upload.write_bytes(data)
+    assert store.put(str(upload), "doc2") == digest
+    assert not upload.exists()
+    assert store.refs(digest) == ["doc1", "doc2"]
+    with store.local_path(digest) as path:
+        assert Path(path).read_bytes() == data
+
+    assert store.release(digest, "doc1") is False
+    with store.open(digest) as f:
+        assert f.read() == data
+    assert store.release(digest, "doc2") is True
+    assert not store.exists(digest)
+    assert not list((tmp_path / "blobs").rglob(f"{digest}*"))
+
+def test_migrate_moves_plain_uploads_into_store(tmp_path):
+    """Test documents with only a file_path are moved into the blob store"""
+    metadata = SQLiteStore(str(tmp_path / "metadata.db"))
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+    for doc_id in ("a", "b"):
+        (uploads / f"{doc_id}.pdf").write_bytes(b"%PDF same bytes")
+        metadata.insert_document("documents", {"_id": doc_id, "file_path": str(uploads / f"{doc_id}.pdf")})
+    metadata.insert_document("documents", {"_id": "gone", "file_path": str(uploads / "gone.pdf")})
+
+    store = BlobStore(str(uploads / "blobs"))
+    assert migrate_documents(store, metadata) == {"moved": 2, "missing": 1}
+
+    digest = metadata.get_document("documents", "a")["blob_sha256"]
+    assert metadata.get_document("documents", "b")["blob_sha256"] == digest
+    assert store.refs(digest) == ["a", "b"]
+    assert not (uploads / "a.pdf").exists()
+    with store.document_path(metadata.get_document("documents", "b")) as path:
+        assert Path(path).read_bytes() == b"%PDF same bytes"
@@ -0,0 +1,64 @@
+import pytest
+import sys
+import os
+from pathlib import Path
+from datetime import datetime
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.corpus_stats import CorpusStats
+
+def _doc(doc_id, category, chunks, causes, size=100):
+    return {
+        "_id": doc_id,
+        "title": f"Doc {doc_id}",
+        "category": category,
+        "file_size": size,
+        "chunks_count": chunks,
+        "cause_counts": causes,
+        "uploaded_at": datetime(2024, 1, int(doc_id)),
+    }
+
+def test_rebuild_and_incremental_updates():
+    """Test counters match after rebuild, upload and delete"""
+    stats = CorpusStats()
+    stats.rebuild([_doc("1", "contract", 3, {"Fraud": 2, "Payment Terms": 1})])
+    stats.record_upload(_doc("2", "policy", 2, {"Fraud": 2}))
+
+    snapshot = stats.snapshot()
+    assert snapshot["total_documents"] == 2
+    assert snapshot["total_chunks"] == 5
+    assert snapshot["bytes_stored"] == 200
+    assert snapshot["documents_by_category"] == {"contract": 1, "policy": 1}
+    assert snapshot["chunks_by_cause"] == {"Fraud": 4, "Payment Terms": 1}
+    assert snapshot["recent_uploads"][0]["id"] == "2"
+    assert snapshot["ingest_rate"]["chunks_per_minute"] > 0
+
+    stats.record_delete(_doc("1", "contract", 3, {"Fraud": 2, "Payment Terms": 1}))
+    snapshot = stats.snapshot()
+    assert snapshot["total_documents"] == 1
+    assert snapshot["documents_by_category"] == {"policy": 1}
+    assert snapshot["chunks_by_cause"] == {"Fraud": 2}
+    assert [d["id"] for d in snapshot["recent_uploads"]] == ["2"]
+
+def test_legacy_documents_count_vector_ids():
+    """Test documents without chunks_count fall back to vector_ids"""
+    stats = CorpusStats()
+    stats.rebuild([{"_id": "a", "category": "other", "vector_ids": ["a_0", "a_1"]}, {"_id": "b"}])
+    snapshot = stats.snapshot()
+    assert snapshot["total_chunks"] == 2
+    assert snapshot["indexed_documents"] == 1
+
+def test_snapshot_follows_shared_store():
+    """Test a stats source is re-read, so uploads made by other workers show up"""
+    documents = [_doc("1", "contract", 3, {"Fraud": 3})]
+    stats = CorpusStats(source=lambda: list(documents), refresh_seconds=0)
+    assert stats.snapshot()["total_documents"] == 1
+
+    recent = dict(_doc("2", "policy", 4, {"Fraud": 4}), uploaded_at=datetime.utcnow())
+    documents.append(recent)
+    snapshot = stats.snapshot()
+    assert snapshot["total_documents"] == 2
+    assert snapshot["ingest_rate"]["chunks_per_minute"] > 0
@@ -0,0 +1,65 @@
+import pytest
+import sys
+import os
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.embeddings import FP32_FILE, EmbeddingBackend, OnnxBackend, SentenceTransformerBackend, export_onnx
+
+TEXTS = [
+    "Employee cannot work in same industry for 10 years after leaving job.",
+    "Payment of each invoice is due within 30 days.",
+    "Personal data shall be processed in accordance with GDPR.",
+    "Short.",
+]
+
+@pytest.fixture(scope="module")
+def models(tmp_path_factory):
+    pytest.importorskip("onnxruntime")
+    try:
+        torch_backend = SentenceTransformerBackend()
+    except Exception as e:
+        pytest.skip(f"Embedding model unavailable: {e}")
+    
+    # Use an existing export if EMBEDDING_MODEL_PATH points at one, otherwise export now
+    model_path = os.getenv("EMBEDDING_MODEL_PATH")
+    if not model_path or not os.path.exists(os.path.join(model_path, FP32_FILE)):
+        pytest.importorskip("onnx")
+        model_path = export_onnx("all-MiniLM-L6-v2", str(tmp_path_factory.mktemp("onnx")))
+    return torch_backend, model_path
+
+def test_onnx_matches_pytorch(models):
+    """Test fp32 ONNX embeddings agree with the PyTorch model"""
+    torch_backend, model_path = models
+    expected = torch_backend.encode(TEXTS)
+    actual = OnnxBackend(model_path).encode(TEXTS, batch_size=2)
+    
+    assert actual.shape == expected.shape
+    cosine = np.sum(actual * expected, axis=1)
+    assert cosine.min() > 0.999
+
+def test_int8_onnx_stays_close(models):
+    """Test quantized ONNX embeddings stay close to the PyTorch model"""
+    torch_backend, model_path = models
+    if not os.path.exists(os.path.join(model_path, "model_int8.onnx")):
+        pytest.skip("No int8 export")
+    expected = torch_backend.encode(TEXTS)
+    actual = OnnxBackend(model_path, quantized=True).encode(TEXTS)
+    
+    cosine = np.sum(actual * expected, axis=1)
+    assert cosine.min() > 0.95
+    assert np.allclose(np.linalg.norm(actual, axis=1), 1.0, atol=1e-5)
+
+def test_incomplete_backend_fails_when_built():
+    """Test a backend missing part of the interface cannot be instantiated"""
+    class EncodeOnly(EmbeddingBackend):
+        def encode(self, texts, batch_size=64):
+            return np.zeros((len(texts), 384), dtype=np.float32)
+
+    with pytest.raises(TypeError):
+        EncodeOnly()
@@ -0,0 +1,75 @@
+import pytest
+import sys
+import os
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from backend.exact_index import ExactIndex
+
+def _vectors(count, dim=384, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def test_blocked_search_is_exact(tmp_path):
+    """Test top-k across several blocks equals a full argsort"""
+    vectors = _vectors(1000)
+    index = ExactIndex(str(tmp_path))
+    index.BLOCK_ROWS = 128
+    index.add(
+        ids=[str(i) for i in range(1000)],
+        embeddings=vectors,
+        documents=[f"text {i}" for i in range(1000)],
+        metadatas=[{"chunk_index": i} for i in range(1000)]
+    )
+
+    queries = _vectors(3, seed=1)
+    results = index.query(query_embeddings=queries, n_results=7)
+
+    for query, ids, distances in zip(queries, results["ids"], results["distances"]):
+        expected = np.argsort(-(vectors @ query))[:7]
+        assert ids == [str(i) for i in expected]
+        assert distances == pytest.approx([1 - float(vectors[i] @ query) for i in expected], abs=1e-5)
+
+def test_empty_index_and_reload(tmp_path):
+    """Test querying an empty index, then reloading appended data"""
+    index = ExactIndex(str(tmp_path))
+    assert index.query(_vectors(1), n_results=5)["ids"] == [[]]
+
+    index.add(ids=["a"], embeddings=_vectors(1), documents=["doc"], metadatas=[{"cause": "Fraud"}])
+    index.add(ids=["b"], embeddings=_vectors(1, seed=2), documents=["doc b"], metadatas=[{}])
+
+    reloaded = ExactIndex(str(tmp_path))
+    assert reloaded.count() == 2
+    results = reloaded.query(_vectors(1), n_results=5)
+    assert results["ids"][0][0] == "a"
+    assert results["metadatas"][0][0] == {"cause": "Fraud"}
+
+def test_every_index_mode_reports_the_same_cosine_scores(tmp_path, monkeypatch):
+    """Test chroma (new and legacy l2 collections), exact and int8 give the same 1 - distance"""
+    import chromadb
+    from backend.vector_store import _cosine, _open_index
+    monkeypatch.setenv("VECTOR_SHARDS", "1")
+    vectors = _vectors(50)
+    rows = dict(
+        ids=[str(i) for i in range(50)],
+        embeddings=vectors,
+        documents=[f"chunk {i}" for i in range(50)],
+        metadatas=[{"document_id": str(i)} for i in range(50)]
+    )
+    queries = _vectors(3, seed=1)
+    expected = np.sort(queries @ vectors.T, axis=1)[:, ::-1][:, :5]
+
+    legacy = chromadb.PersistentClient(path=str(tmp_path / "legacy")).create_collection("legal_documents")
+    collections = [_cosine(legacy)] + [
+        _open_index(str(tmp_path / mode), mode)[1] for mode in ("chroma", "exact", "int8")
+    ]
+    for collection in collections:
+        collection.add(**rows)
+        results = collection.query(query_embeddings=queries, n_results=5, include=["distances"])
+        scores = 1 - np.array(results["distances"])
+        assert np.allclose(scores, expected, atol=1e-3)
@@ -0,0 +1,56 @@
+import pytest
+import sys
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.index_owner import ReadWriteLock, RemoteCollection, parse_address, serve, wait_for_owner
+
+def test_remote_collection_round_trip(tmp_path):
+    """Test adds and queries through a RemoteCollection reach the owner's index"""
+    address = str(tmp_path / "owner.sock")
+    owner = threading.Thread(
+        target=serve,
+        args=(address, b"secret", str(tmp_path / "index"), "exact"),
+        daemon=True
+    )
+    owner.start()
+    assert wait_for_owner(address, b"secret", timeout=10)
+
+    collection = RemoteCollection(address, b"secret")
+    embeddings = np.eye(3, 384, dtype=np.float32)
+    collection.add(
+        embeddings=embeddings,
+        documents=["a", "b", "c"],
+        metadatas=[{"document_id": "d"}] * 3,
+        ids=["d_0", "d_1", "d_2"]
+    )
+
+    assert collection.count() == 3
+    results = collection.query(query_embeddings=embeddings[1:2], n_results=1, include=["documents", "distances"])
+    assert results["documents"][0] == ["b"]
+    assert parse_address("127.0.0.1:7000") == ("127.0.0.1", 7000)
+
+def test_read_write_lock_excludes_writers():
+    """Test readers share the lock while a writer waits for them and then runs alone"""
+    lock = ReadWriteLock()
+    events = []
+
+    def write():
+        with lock.write():
+            events.append("write")
+
+    with lock.read(), lock.read():
+        writer = threading.Thread(target=write)
+        writer.start()
+        time.sleep(0.05)
+        assert events == []
+    writer.join(1)
+    assert events == ["write"]
@@ -0,0 +1,46 @@
+import pytest
+import sys
+import os
+import json
+import logging
+import contextvars
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.logging_config import ContextFilter, JsonFormatter, begin_request, current_timings, timed
+
+def test_timed_accumulates_per_request():
+    """Test repeated stages add up and stay scoped to the request"""
+    def run():
+        begin_request("req-1")
+        with timed("embed"):
+            pass
+        first = current_timings()["embed"]
+        with timed("embed"):
+            pass
+        assert current_timings()["embed"] >= first
+        return current_timings()
+
+    timings = contextvars.copy_context().run(run)
+    assert set(timings) == {"embed"}
+    assert current_timings() == {}
+
+def test_json_formatter_includes_context():
+    """Test JSON records carry request ID, timings and extra fields"""
+    def run():
+        begin_request("req-2")
+        with timed("query"):
+            pass
+        record = logging.LogRecord("backend.test", logging.INFO, __file__, 1, "found %s", (3,), None)
+        record.status = 200
+        ContextFilter().filter(record)
+        return json.loads(JsonFormatter().format(record))
+
+    entry = contextvars.copy_context().run(run)
+    assert entry["message"] == "found 3"
+    assert entry["request_id"] == "req-2"
+    assert "query" in entry["timings_ms"]
+    assert entry["status"] == 200
@@ -0,0 +1,75 @@
+import pytest
+import sys
+import os
+from pathlib import Path
+from datetime import datetime
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.memory_store import MemoryStore
+
+def test_insert_and_find_by_id():
+    """Test documents are found by _id in their own collection"""
+    store = MemoryStore()
+    store["documents"].insert_one({"_id": "doc1", "title": "Contract", "category": "contract"})
+
+    assert store["documents"].find_one({"_id": "doc1"})["title"] == "Contract"
+    assert store["other"].find_one({"_id": "doc1"}) is None
+
+def test_secondary_index_lookup():
+    """Test filtering on an indexed field"""
+    store = MemoryStore()
+    collection = store["documents"]
+    collection.insert_one({"_id": "a", "category": "contract"})
+    collection.insert_one({"_id": "b", "category": "policy"})
+    collection.insert_one({"_id": "c", "category": "contract"})
+
+    ids = sorted(doc["_id"] for doc in collection.find({"category": "contract"}))
+    assert ids == ["a", "c"]
+    assert collection.count_documents({"category": "policy"}) == 1
+
+def test_update_and_delete():
+    """Test update_one and delete_one keep indexes in sync"""
+    store = MemoryStore()
+    collection = store["documents"]
+    collection.insert_one({"_id": "a", "category": "contract"})
+
+    result = collection.update_one({"_id": "a"}, {"$set": {"category": "policy", "vector_ids": ["v1"]}})
+    assert result.matched_count == 1
+    assert collection.find({"category": "contract"}) == []
+    assert collection.find_one({"category": "policy"})["vector_ids"] == ["v1"]
+
+    assert collection.delete_one({"_id": "a"}).deleted_count == 1
+    assert collection.find_one({"_id": "a"}) is None
+    assert collection.delete_one({"_id": "a"}).deleted_count == 0
+
+def test_duplicate_id_rejected():
+    """Test inserting the same _id twice fails"""
+    store = MemoryStore()
+    store["documents"].insert_one({"_id": "a"})
+    with pytest.raises(ValueError):
+        store["documents"].insert_one({"_id": "a"})
+
+def test_persistence_replay(tmp_path):
+    """Test the append-only log restores data after a restart"""
+    log_path = os.path.join(tmp_path, "store.jsonl")
+    uploaded_at = datetime(2024, 1, 2, 3, 4, 5)
+
+    store = MemoryStore(log_path)
+    store["documents"].insert_one({"_id": "a", "uploaded_at": uploaded_at})
+    store["documents"].insert_one({"_id": "b"})
+    store["documents"].update_one({"_id": "a"}, {"$set": {"title": "Updated"}})
+    store["documents"].delete_one({"_id": "b"})
+    store.close()
+
+    restored = MemoryStore(log_path)
+    docs = restored["documents"].find({})
+    assert len(docs) == 1
+    assert docs[0]["title"] == "Updated"
+    assert docs[0]["uploaded_at"] == uploaded_at
+
+    restored.compact()
+    restored.close()
+    assert len(MemoryStore(log_path)["documents"].find({})) == 1
@@ -0,0 +1,50 @@
+import pytest
+import sys
+import os
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.metrics import Counter, Gauge, Histogram, Registry, _Metric
+
+def test_counter_and_gauge_render():
+    """Test counters and function gauges in the text format"""
+    registry = Registry()
+    requests = Counter("requests_total", "Requests", ["status"], registry=registry)
+    requests.inc(status=200)
+    requests.inc(2, status=200)
+    Gauge("queue_depth", "Queued jobs", registry=registry, function=lambda: 4)
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{status="200"} 3.0' in text
+    assert "queue_depth 4.0" in text
+
+    with pytest.raises(ValueError):
+        requests.inc(status=200, route="/")
+    with pytest.raises(ValueError):
+        Counter("requests_total", "Again", registry=registry)
+
+def test_histogram_buckets_are_cumulative():
+    """Test histogram buckets, sum and count"""
+    registry = Registry()
+    latency = Histogram("latency_seconds", "Latency", ["stage"], registry=registry, buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, stage="embed")
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{stage="embed",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="embed",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{stage="embed",le="+Inf"} 4' in text
+    assert 'latency_seconds_sum{stage="embed"} 4.05' in text
+    assert 'latency_seconds_count{stage="embed"} 4' in text
+
+def test_metric_without_samples_fails_when_built():
+    """Test a metric type that does not render samples cannot be instantiated"""
+    class Untyped(_Metric):
+        type_name = "untyped"
+
+    with pytest.raises(TypeError):
+        Untyped("untyped_total", "No samples", registry=Registry())
@@ -0,0 +1,94 @@
+import pytest
+import sys
+import os
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.exact_index import ExactIndex
+from backend.near_duplicates import DeduplicatingCollection, NearDuplicateIndex, collapse_matches
+
+INDEMNITY = (
+    "The Supplier shall indemnify, defend and hold harmless the Customer and its officers, directors "
+    "and employees from and against any and all claims, losses, damages, liabilities, costs and expenses "
+    "including reasonable attorneys fees arising out of or relating to any breach of this Agreement by {party} "
+    "or any negligent or wrongful act or omission of the Supplier in the performance of its obligations."
+)
+PAYMENT = "All invoices are payable within thirty days of receipt, and late payments accrue interest at one percent per month."
+
+def test_near_duplicates_share_a_cluster(tmp_path):
+    """Test boilerplate with small edits clusters together and survives a reload"""
+    path = str(tmp_path / "near_duplicates.bin")
+    index = NearDuplicateIndex(path)
+    clusters = index.assign([
+        INDEMNITY.format(party="the Supplier"),
+        INDEMNITY.format(party="Acme Corporation"),
+        PAYMENT,
+        INDEMNITY.format(party="Globex Limited"),
+    ])
+
+    assert clusters[0] == clusters[1] == clusters[3]
+    assert clusters[2] != clusters[0]
+    assert index.cluster_size(clusters[0]) == 3
+
+    reloaded = NearDuplicateIndex(path)
+    assert reloaded.cluster_size(clusters[0]) == 3
+    assert reloaded.assign([INDEMNITY.format(party="Initech")]) == [clusters[0]]
+
+def test_query_results_collapse_to_one_per_cluster(tmp_path):
+    """Test results carry cluster sizes and collapse keeps the best of each cluster"""
+    collection = DeduplicatingCollection(ExactIndex(str(tmp_path / "index")), NearDuplicateIndex())
+    texts = [INDEMNITY.format(party=f"Party {i}") for i in range(4)] + [PAYMENT]
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=384).astype(np.float32)
+    embeddings = np.stack([base + 0.01 * i for i in range(4)] + [base + 0.2])
+    collection.add(
+        ids=[f"d{i}_0" for i in range(5)],
+        embeddings=embeddings,
+        documents=texts,
+        metadatas=[{"document_id": f"d{i}"} for i in range(5)]
+    )
+
+    results = collection.query(query_embeddings=base[None, :], n_results=5)
+    matches = [
+        {"document_id": m["document_id"], "matching_text": text, "cluster_id": m["dup_cluster"], "cluster_size": m["dup_cluster_size"]}
+        for m, text in zip(results["metadatas"][0], results["documents"][0])
+    ]
+    collapsed = collapse_matches(matches, top_k=5)
+
+    assert len(collapsed) == 2
+    assert collapsed[0]["document_id"] == "d0"
+    assert collapsed[0]["cluster_size"] == 4
+    assert collapsed[1]["matching_text"] == PAYMENT
+
+def test_failed_add_registers_no_clusters(tmp_path):
+    """Test clusters of chunks whose add failed are neither counted nor persisted"""
+    class FailingCollection:
+        def add(self, **kwargs):
+            raise ValueError("batch too large")
+
+    path = str(tmp_path / "near_duplicates.bin")
+    collection = DeduplicatingCollection(FailingCollection(), NearDuplicateIndex(path))
+    with pytest.raises(ValueError):
+        collection.add(ids=["d0_0", "d1_0"], embeddings=np.zeros((2, 384), dtype=np.float32),
+                       documents=[INDEMNITY.format(party="Acme"), INDEMNITY.format(party="Globex")],
+                       metadatas=[{}, {}])
+
+    assert collection.index.sizes == {}
+    assert NearDuplicateIndex(path).sizes == {}
+
+def test_cluster_ids_are_not_reused_after_a_crash(tmp_path):
+    """Test chunks stored but never logged keep their cluster id to themselves after a restart"""
+    path = tmp_path / "near_duplicates.bin"
+    stored = []
+    first = NearDuplicateIndex(str(path)).assign([INDEMNITY.format(party="Acme")], stored.extend)
+    # The process died after the chunks were added but before the log was appended
+    path.write_bytes(b"")
+
+    second = NearDuplicateIndex(str(path)).assign([PAYMENT])
+    assert stored == first
+    assert second[0] not in first
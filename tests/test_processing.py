@@ -37,4 +37,82 @@ def test_empty_text():
     """Test with empty text"""
     processor = PDFProcessor()
     result = processor.identify_cause("")
-    assert result == "General Compliance"
\ No newline at end of file
+    assert result == "General Compliance"
+
+
+def test_process_synthetic_pdf(tmp_path):
+    """Test the benchmark PDF generator produces parseable pages"""
+    from benchmarks.synthetic import legal_pdf
+    
+    pdf_path = tmp_path / "synthetic.pdf"
+    pdf_path.write_bytes(legal_pdf(3, seed=1))
+    
+    progress = []
+    chunks = PDFProcessor().process_pdf(str(pdf_path), progress=lambda **fields: progress.append(fields))
+    assert chunks
+    assert {"stage": "parsing", "pages_parsed": 3, "pages_total": 3} in progress
+
+def test_token_splitter_respects_model_limit():
+    """Test token chunks fit the model, overlap, and carry their own input ids"""
+    from backend.embeddings import SentenceTransformerBackend
+    import random
+    from benchmarks.synthetic import legal_text
+    
+    embedder = SentenceTransformerBackend()
+    processor = PDFProcessor(embedder)
+    text = legal_text(random.Random(2), 40)
+    chunks = processor.split_document(text)
+    
+    assert len(chunks) > 1
+    tokenizer = embedder.tokenizer
+    for chunk in chunks:
+        assert len(chunk["input_ids"]) <= embedder.max_length
+        assert chunk["input_ids"] == tokenizer(chunk["text"])["input_ids"]
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current["text"][:20] in previous["text"]
+    
+    from_ids = embedder.encode_ids([chunk["input_ids"] for chunk in chunks[:4]])
+    from_text = embedder.encode([chunk["text"] for chunk in chunks[:4]])
+    assert abs(from_ids - from_text).max() < 1e-5
+
+def test_only_scanned_pages_are_ocrd(tmp_path):
+    """Test pages without a text layer are OCR'd once and then served from the cache"""
+    import io
+    from PIL import Image, ImageDraw
+    from pypdf import PdfReader, PdfWriter
+    from benchmarks.synthetic import legal_pdf
+    from backend.ocr import PageOCR
+    
+    scan = Image.new("L", (600, 800), 255)
+    ImageDraw.Draw(scan).text((50, 50), "Scanned regulation page", fill=0)
+    scan_pdf = io.BytesIO()
+    scan.save(scan_pdf, format="PDF")
+    
+    writer = PdfWriter()
+    for source in (legal_pdf(2, seed=1), scan_pdf.getvalue()):
+        for page in PdfReader(io.BytesIO(source)).pages:
+            writer.add_page(page)
+    pdf_path = tmp_path / "mixed.pdf"
+    with open(pdf_path, "wb") as f:
+        writer.write(f)
+    
+    class RecordingOCR(PageOCR):
+        """Tesseract stand-in that records which pages it was asked to read"""
+        pages = []
+        
+        def available(self):
+            return True
+        
+        def recognize_page(self, pdf_path, page_number):
+            self.pages.append(page_number)
+            return "The operator shall retain personal data records for five years."
+    
+    processor = PDFProcessor()
+    processor.ocr = RecordingOCR(cache_dir=str(tmp_path / "ocr_cache"), workers=2)
+    
+    text = processor.extract_text_from_pdf(str(pdf_path))
+    assert RecordingOCR.pages == [3]
+    assert "retain personal data records" in text
+    
+    assert processor.extract_text_from_pdf(str(pdf_path)) == text
+    assert RecordingOCR.pages == [3]
@@ -0,0 +1,55 @@
+import pytest
+import sys
+import os
+import threading
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend import profiling
+from backend.profiling import SamplingProfiler
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def test_sampling_profiler_collapsed_stacks(tmp_path):
+    """Test registered threads are sampled into collapsed stacks"""
+    profiler = SamplingProfiler(interval_ms=1)
+    profiler.start()
+    with profiler.thread_scope():
+        _busy(0.1)
+    profiler.stop()
+
+    assert profiler.samples > 0
+    lines = profiler.collapsed().splitlines()
+    assert any("_busy (tests/test_profiling.py" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+
+    path = profiler.save(str(tmp_path))
+    assert profiling.profile_path(profiler.profile_id, str(tmp_path)) == path
+    assert profiling.profile_path("../etc/passwd", str(tmp_path)) is None
+
+def test_unregistered_threads_are_not_sampled():
+    """Test other threads stay out of the profile"""
+    profiler = SamplingProfiler(interval_ms=1)
+    worker = threading.Thread(target=_busy, args=(0.05,))
+    profiler.start()
+    worker.start()
+    worker.join()
+    profiler.stop()
+    assert profiler.samples == 0
+
+def test_authorization(monkeypatch):
+    """Test profiling stays off without ADMIN_TOKEN"""
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert not profiling.is_authorized("anything")
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    assert profiling.is_authorized("secret")
+    assert not profiling.is_authorized("wrong")
+    assert not profiling.is_authorized(None)
@@ -0,0 +1,58 @@
+import pytest
+import sys
+import os
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from backend.quantized_index import QuantizedIndex, quantize_int8
+
+def _vectors(count, dim=384, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def test_quantize_roundtrip_is_close():
+    """Test int8 codes reconstruct the vectors closely"""
+    vectors = _vectors(50)
+    codes, scales = quantize_int8(vectors)
+    assert codes.dtype == np.int8
+    restored = codes.astype(np.float32) * scales[:, None]
+    assert np.abs(restored - vectors).max() < 0.01
+
+def test_query_matches_exact_search(tmp_path):
+    """Test re-ranked results equal brute-force cosine ranking"""
+    vectors = _vectors(500)
+    index = QuantizedIndex(str(tmp_path))
+    index.add(
+        ids=[f"id_{i}" for i in range(500)],
+        embeddings=vectors,
+        documents=[f"text {i}" for i in range(500)],
+        metadatas=[{"chunk_index": i} for i in range(500)]
+    )
+
+    query = vectors[42] + 0.05 * _vectors(1, seed=1)[0]
+    results = index.query(query_embeddings=[query.tolist()], n_results=5)
+
+    query /= np.linalg.norm(query)
+    expected = np.argsort(-(vectors @ query))[:5]
+    assert results["ids"][0] == [f"id_{i}" for i in expected]
+    assert results["documents"][0][0] == "text 42"
+    assert results["distances"][0][0] == pytest.approx(1 - float(vectors[42] @ query), abs=1e-5)
+
+def test_reload_and_torn_write_recovery(tmp_path):
+    """Test the index reloads from disk and drops a partially written row"""
+    index = QuantizedIndex(str(tmp_path))
+    index.add(ids=["a", "b"], embeddings=_vectors(2), documents=["a", "b"], metadatas=[{}, {}])
+
+    # Simulate a crash after only the vectors were appended
+    with open(os.path.join(tmp_path, "quantized", "vectors.f32"), "ab") as f:
+        _vectors(1, seed=3).tofile(f)
+
+    reloaded = QuantizedIndex(str(tmp_path))
+    assert reloaded.count() == 2
+    assert reloaded.query(_vectors(2)[1:], n_results=1)["ids"][0] == ["b"]
+    assert reloaded.memory_usage()["resident_bytes"] < reloaded.memory_usage()["float32_bytes"]
@@ -0,0 +1,38 @@
+import pytest
+import sys
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.blob_store import BlobStore
+from backend.reindex import apply_metadata, reindex_documents
+from backend.sqlite_store import SQLiteStore
+
+def test_metadata_changes_wait_until_applied(tmp_path):
+    """Test re-indexing leaves the metadata store alone until apply_metadata runs"""
+    metadata = SQLiteStore(str(tmp_path / "metadata.db"))
+    blobs = BlobStore(str(tmp_path / "blobs"))
+    for doc_id in ("a", "b"):
+        digest = blobs.put(b"%PDF " + doc_id.encode(), doc_id)
+        metadata.insert_document("documents", {"_id": doc_id, "blob_sha256": digest, "chunks_count": 1})
+
+    processor = SimpleNamespace(process_pdf=lambda path, meta: [
+        {"cause": "Fraud"}, {"cause": "Fraud"}, {"cause": "Payment Terms"}
+    ])
+    vector_store = SimpleNamespace(add_documents=lambda chunks: [f"v{i}" for i in range(len(chunks))])
+    pending = str(tmp_path / "reindex_metadata.jsonl")
+
+    summary = reindex_documents(vector_store, processor, metadata, blobs, pending)
+    assert summary["documents"] == 2
+    assert metadata.get_document("documents", "a")["chunks_count"] == 1
+
+    metadata.delete_document("documents", "b")
+    assert apply_metadata(metadata, pending) == 1
+    document = metadata.get_document("documents", "a")
+    assert document["chunks_count"] == 3
+    assert document["cause_counts"] == {"Fraud": 2, "Payment Terms": 1}
+    assert not os.path.exists(pending)
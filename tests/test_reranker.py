@@ -0,0 +1,95 @@
+import pytest
+import sys
+import os
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.reranker import CrossEncoderReranker
+
+class _OverlapModel:
+    """Scores a pair by the number of words the query and text share"""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.pairs = 0
+
+    def predict(self, pairs, batch_size, show_progress_bar):
+        time.sleep(self.delay)
+        self.pairs += len(pairs)
+        return [len(set(query.split()) & set(text.split())) for query, text in pairs]
+
+def _matches(*texts):
+    return [{"document_id": f"d{i}", "matching_text": text, "similarity_score": 0.9 - 0.1 * i} for i, text in enumerate(texts)]
+
+def test_rerank_reorders_and_caches_scores():
+    """Test matches come back in cross-encoder order and repeat pairs hit the cache"""
+    model = _OverlapModel()
+    reranker = CrossEncoderReranker(model=model, batch_size=2)
+    matches = _matches("late payment fee", "termination for cause", "notice of termination for cause")
+
+    ranked, applied = reranker.rerank("termination for cause notice", matches, time.perf_counter() + 5)
+
+    assert applied
+    assert [m["document_id"] for m in ranked] == ["d2", "d1", "d0"]
+    assert ranked[0]["rerank_score"] == 4
+    assert model.pairs == 3
+
+    reranker.rerank("termination for cause notice", matches, time.perf_counter() + 5)
+    assert model.pairs == 3
+
+def test_rerank_falls_back_when_budget_is_spent():
+    """Test a batch that would overrun the deadline leaves bi-encoder order untouched"""
+    reranker = CrossEncoderReranker(model=_OverlapModel(delay=0.05), batch_size=1)
+    matches = _matches("late payment fee", "termination for cause", "notice of termination for cause")
+
+    ranked, applied = reranker.rerank("termination for cause notice", matches, time.perf_counter() + 0.07)
+
+    assert not applied
+    assert ranked == matches
+
+    ranked, applied = reranker.rerank("termination", matches, time.perf_counter() - 1)
+    assert not applied
+
+def test_chunks_matched_by_several_segments_keep_their_best_rerank_score():
+    """Test duplicate matches across query segments are merged by rerank_score when re-ranking"""
+    from types import SimpleNamespace
+    from backend.similarity_search import ComplianceChecker
+
+    def search(segments, **kwargs):
+        # The shared chunk scores higher with the bi-encoder for the first segment
+        scores = {"termination": 0.9, "notice of termination for cause": 0.8}
+        return [
+            [{"document_id": "d1", "matching_text": "notice of termination for cause", "similarity_score": scores[s],
+              "cause": "Termination"}]
+            for s in segments
+        ]
+
+    checker = ComplianceChecker.__new__(ComplianceChecker)
+    checker.pdf_processor = SimpleNamespace(text_splitter=SimpleNamespace(
+        split_text=lambda text: ["termination", "notice of termination for cause"]
+    ))
+    checker.vector_store = SimpleNamespace(similarity_search_batch=search)
+    checker.reranker = CrossEncoderReranker(model=_OverlapModel())
+
+    report = checker.check_compliance("query", rerank=True)
+    assert report["reranked"]
+    assert report["total_matches"] == 1
+    assert report["results_by_cause"]["Termination"][0]["rerank_score"] == 5
+
+def test_model_loads_on_first_rerank_not_at_fork(monkeypatch):
+    """Test nothing is loaded until a check asks for re-ranking, and a forked worker does not start a load"""
+    reranker = CrossEncoderReranker()
+    loads = []
+    monkeypatch.setattr(reranker, "_load", lambda: loads.append(1))
+
+    reranker.after_fork()
+    assert not loads and reranker._loader is None
+
+    matches = _matches("late payment fee")
+    ranked, applied = reranker.rerank("payment", matches, time.perf_counter() + 5)
+    reranker._loader.join()
+    assert not applied and ranked == matches
+    assert loads == [1]
@@ -0,0 +1,101 @@
+import pytest
+import sys
+import os
+import threading
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.scheduler import INGEST, QUERY, Overloaded, PriorityScheduler
+
+def test_admission_limits_and_retry_after():
+    """Test work past the queue limit is refused and released tickets free their place"""
+    scheduler = PriorityScheduler(query_concurrency=1, query_queue_limit=2, ingest_concurrency=1, ingest_queue_limit=1)
+    first = scheduler.admit(QUERY)
+    second = scheduler.admit(QUERY)
+
+    with pytest.raises(Overloaded) as excinfo:
+        scheduler.admit(QUERY)
+    assert excinfo.value.retry_after >= 1
+
+    # Ingestion has its own queue
+    scheduler.admit(INGEST).release()
+
+    second.release()
+    with first:
+        third = scheduler.admit(QUERY)
+    with third:
+        pass
+    assert scheduler.classes[QUERY].queued == scheduler.classes[QUERY].active == 0
+
+def test_queries_go_before_ingestion():
+    """Test ingestion waits for queued queries and pauses at checkpoints while queries run"""
+    scheduler = PriorityScheduler(query_concurrency=1, ingest_concurrency=1, max_pause_ms=5000)
+    order = []
+
+    running = scheduler.admit(QUERY)
+    running.__enter__()
+    waiting = scheduler.admit(QUERY)
+    ingest = scheduler.admit(INGEST)
+
+    def run_ingest():
+        with ingest:
+            order.append("ingest")
+
+    def run_query():
+        with waiting:
+            order.append("query")
+
+    threads = [threading.Thread(target=run_ingest), threading.Thread(target=run_query)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    assert order == []
+
+    running.release()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert sorted(order) == ["ingest", "query"]
+    assert ingest.started >= waiting.started
+
+    # A checkpoint returns as soon as the last query finishes
+    query = scheduler.admit(QUERY)
+    query.__enter__()
+    threading.Timer(0.1, query.release).start()
+    began = time.monotonic()
+    scheduler.yield_to_queries()
+    assert 0.05 < time.monotonic() - began < 2
+
+def test_async_waiters_hold_no_threads():
+    """Test tickets waiting on the event loop start in order once slots free up, without extra threads"""
+    import asyncio
+    scheduler = PriorityScheduler(query_concurrency=1, query_queue_limit=64)
+    running = scheduler.admit(QUERY)
+    running.__enter__()
+    finished = []
+
+    async def check(i):
+        ticket = scheduler.admit(QUERY)
+        try:
+            await ticket.wait()
+            finished.append(i)
+        finally:
+            ticket.release()
+
+    async def main():
+        tasks = [asyncio.create_task(check(i)) for i in range(50)]
+        await asyncio.sleep(0.05)
+        assert not finished
+        assert scheduler.classes[QUERY].queued == 50
+        threads = threading.active_count()
+        # Freed from another thread, as a finished threadpool job would
+        threading.Thread(target=running.release).start()
+        await asyncio.gather(*tasks)
+        assert threading.active_count() <= threads
+
+    asyncio.run(main())
+    assert sorted(finished) == list(range(50))
+    assert scheduler.classes[QUERY].queued == scheduler.classes[QUERY].active == 0
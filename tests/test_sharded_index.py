@@ -0,0 +1,67 @@
+import pytest
+import sys
+import os
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.exact_index import ExactIndex
+from backend.sharded_index import ShardedCollection, shard_for
+
+CATEGORIES = ["contract", "policy", "regulation", "case_law", "other"]
+
+def _corpus(rows=300, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(rows, 384)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"doc{i % 40}_{i}" for i in range(rows)]
+    metadatas = [{"document_id": f"doc{i % 40}", "category": CATEGORIES[i % 5]} for i in range(rows)]
+    return ids, vectors, [f"text {i}" for i in range(rows)], metadatas
+
+class _CountingShard:
+    def __init__(self, index):
+        self.index = index
+        self.queries = 0
+
+    def add(self, **kwargs):
+        self.index.add(**kwargs)
+
+    def query(self, **kwargs):
+        self.queries += 1
+        return self.index.query(**kwargs)
+
+    def count(self):
+        return self.index.count()
+
+def test_sharded_results_match_single_index(tmp_path):
+    """Test fan-out plus merge returns the same top-k as one unsharded index"""
+    ids, vectors, documents, metadatas = _corpus()
+    single = ExactIndex(str(tmp_path / "single"))
+    single.add(ids=ids, embeddings=vectors, documents=documents, metadatas=metadatas)
+    sharded = ShardedCollection([ExactIndex(str(tmp_path / f"shard_{i}")) for i in range(4)])
+    sharded.add(ids=ids, embeddings=vectors, documents=documents, metadatas=metadatas)
+
+    assert sharded.count() == len(ids)
+    queries = vectors[:5] + 0.1
+    expected = single.query(query_embeddings=queries, n_results=7)
+    actual = sharded.query(query_embeddings=queries, n_results=7)
+    assert actual["ids"] == expected["ids"]
+    assert np.allclose(actual["distances"], expected["distances"], atol=1e-6)
+
+def test_category_query_touches_one_shard(tmp_path):
+    """Test a category-filtered query only searches that category's shard"""
+    ids, vectors, documents, metadatas = _corpus()
+    shards = [_CountingShard(ExactIndex(str(tmp_path / f"shard_{i}"))) for i in range(3)]
+    sharded = ShardedCollection(shards, shard_by="category")
+    sharded.add(ids=ids, embeddings=vectors, documents=documents, metadatas=metadatas)
+
+    results = sharded.query(query_embeddings=vectors[:2], n_results=5, where={"category": "policy"})
+
+    assert [shard.queries for shard in shards].count(1) == 1
+    assert shards[shard_for("policy", 3)].queries == 1
+    assert all(m["category"] == "policy" for row in results["metadatas"] for m in row)
+    assert len(results["ids"][0]) == 5
@@ -0,0 +1,67 @@
+import pytest
+import sys
+import os
+import csv
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.exact_index import ExactIndex
+from backend.sharded_index import ShardedCollection
+from backend.similarity_join import ChunkSet, SimilarityJoin, run_join
+
+def _collection(path, rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(rows, 384)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    # Every regulation chunk is a lightly edited copy of a contract chunk
+    vectors[1::2] = vectors[0::2] + 0.05 * rng.normal(size=(rows // 2, 384)).astype(np.float32)
+    collection = ShardedCollection([ExactIndex(str(path / f"shard_{i}")) for i in range(3)])
+    collection.add(
+        ids=[f"doc{i % 10}_{i}" for i in range(rows)],
+        embeddings=vectors,
+        documents=[f"text {i}" for i in range(rows)],
+        metadatas=[{"document_id": f"doc{i % 10}", "category": ["contract", "regulation"][i % 2]} for i in range(rows)]
+    )
+    return collection
+
+def test_join_matches_brute_force(tmp_path):
+    """Test the blocked join returns the same thresholded top-k as a full score matrix"""
+    collection = _collection(tmp_path)
+    contracts = ChunkSet(collection, {"category": "contract"})
+    regulations = ChunkSet(collection, {"category": "regulation"})
+    join = SimilarityJoin(contracts, regulations, threshold=0.1, top_k=3, workers=2)
+    join.BLOCK_ROWS, join.RIGHT_BLOCK_ROWS = 64, 50
+
+    found = {}
+    for columns in join.blocks():
+        for left, right, rank in zip(columns["left_chunk_id"], columns["right_chunk_id"], columns["rank"]):
+            found.setdefault(left, []).append((rank, right))
+
+    scores = contracts.vectors @ regulations.vectors.T
+    for row, left in enumerate(contracts.ids):
+        best = [i for i in np.argsort(-scores[row])[:3] if scores[row, i] >= 0.1]
+        assert [right for _, right in sorted(found.get(left, []))] == [regulations.ids[i] for i in best]
+    # The edited copy of each contract chunk is its best match
+    assert all(found[left][0][1].split("_")[1] == str(int(left.split("_")[1]) + 1) for left in contracts.ids)
+
+def test_run_join_writes_csv_and_parquet(tmp_path):
+    """Test a self-join skips a chunk's own document and both output formats agree"""
+    collection = _collection(tmp_path, rows=100)
+
+    summary = run_join(collection, None, None, str(tmp_path / "audit.csv"), threshold=0.5, top_k=2, skip_same_document=True)
+    with open(tmp_path / "audit.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    assert summary["left_chunks"] == summary["right_chunks"] == 100
+    assert len(rows) == summary["matches"] > 0
+    assert all(row["left_document_id"] != row["right_document_id"] for row in rows)
+
+    pq = pytest.importorskip("pyarrow.parquet")
+    run_join(collection, None, None, str(tmp_path / "audit.parquet"), threshold=0.5, top_k=2, skip_same_document=True)
+    table = pq.read_table(tmp_path / "audit.parquet")
+    assert table.column("left_chunk_id").to_pylist() == [row["left_chunk_id"] for row in rows]
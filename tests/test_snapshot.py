@@ -0,0 +1,124 @@
+import pytest
+import sys
+import os
+import importlib
+import io
+import tarfile
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.blob_store import BlobStore
+from backend.exact_index import ExactIndex
+from backend.snapshot import create_snapshot, read_manifest, restore_snapshot, verify_snapshot
+from backend.sqlite_store import SQLiteStore
+
+def _add(index, store, uploads, start, count, seed):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, 384)).astype(np.float32)
+    ids = [f"doc{i}" for i in range(start, start + count)]
+    index.add(ids=[f"{i}_0" for i in ids], embeddings=vectors, documents=ids, metadatas=[{"document_id": i} for i in ids])
+    for doc_id in ids:
+        path = uploads / f"{doc_id}.pdf"
+        path.write_bytes(b"%PDF " + doc_id.encode())
+        store.insert_document("documents", {"_id": doc_id, "title": doc_id, "file_path": str(path)})
+    return vectors
+
+def test_incremental_snapshot_restores_full_state(tmp_path):
+    """Test a full plus incremental snapshot restores index, uploads and metadata"""
+    vectors_dir, uploads = tmp_path / "chroma_db", tmp_path / "uploads"
+    uploads.mkdir()
+    store = SQLiteStore(str(tmp_path / "metadata.db"))
+    index = ExactIndex(str(vectors_dir))
+    _add(index, store, uploads, 0, 200, seed=0)
+    full = tmp_path / "snapshots" / "full.tar.gz"
+    create_snapshot(str(full), str(vectors_dir), str(uploads), store)
+
+    vectors = _add(index, store, uploads, 200, 20, seed=1)
+    (uploads / "doc0.pdf").unlink()
+    store.delete_document("documents", "doc0")
+    incremental = tmp_path / "snapshots" / "monday.tar.gz"
+    manifest = create_snapshot(str(incremental), str(vectors_dir), str(uploads), store, base=str(full))
+
+    # The index files only grew, so just their new tails are stored
+    assert manifest["files"]["vectors/exact/vectors.f32"]["stored"] == "append"
+    assert manifest["files"]["uploads/doc1.pdf"]["stored"] == "base"
+    assert "uploads/doc0.pdf" not in manifest["files"]
+    assert os.path.getsize(incremental) < os.path.getsize(full) / 5
+
+    restored_store = SQLiteStore(str(tmp_path / "replica" / "metadata.db"))
+    restore_snapshot(
+        str(incremental), str(tmp_path / "replica" / "chroma_db"), str(tmp_path / "replica" / "uploads"), restored_store
+    )
+
+    restored = ExactIndex(str(tmp_path / "replica" / "chroma_db"))
+    assert restored.count() == 220
+    assert restored.query(query_embeddings=vectors[:3], n_results=1)["ids"] == [["doc200_0"], ["doc201_0"], ["doc202_0"]]
+    documents = restored_store.get_all_documents("documents")
+    assert len(documents) == 219
+    assert all(os.path.exists(d["file_path"]) and "replica" in d["file_path"] for d in documents)
+
+def test_corrupt_snapshot_is_rejected(tmp_path):
+    """Test verify catches a changed file and restore refuses to overwrite data"""
+    vectors_dir, uploads = tmp_path / "chroma_db", tmp_path / "uploads"
+    uploads.mkdir()
+    store = SQLiteStore(str(tmp_path / "metadata.db"))
+    _add(ExactIndex(str(vectors_dir)), store, uploads, 0, 10, seed=0)
+    archive = tmp_path / "full.tar.gz"
+    create_snapshot(str(archive), str(vectors_dir), str(uploads), store)
+    assert verify_snapshot(str(archive))["documents"] == 10
+
+    with pytest.raises(ValueError):
+        restore_snapshot(str(archive), str(vectors_dir), str(uploads), store)
+
+    # Rewrite the archive with one upload's bytes changed but the old manifest
+    tampered = tmp_path / "tampered.tar.gz"
+    with tarfile.open(archive, "r:gz") as source, tarfile.open(tampered, "w:gz") as target:
+        for member in source:
+            data = source.extractfile(member).read()
+            if member.name == "uploads/doc3.pdf":
+                data = data.replace(b"doc3", b"doc9")
+            target.addfile(member, io.BytesIO(data))
+    assert read_manifest(str(tampered)) == read_manifest(str(archive))
+    with pytest.raises(ValueError):
+        verify_snapshot(str(tampered))
+
+def test_restore_points_blob_documents_at_restored_blobs(tmp_path, monkeypatch):
+    """Test documents stored in the blob store get this node's blob paths back"""
+    monkeypatch.delenv("BLOB_DIR", raising=False)
+    vectors_dir, uploads = tmp_path / "chroma_db", tmp_path / "uploads"
+    store = SQLiteStore(str(tmp_path / "metadata.db"))
+    blobs = BlobStore(str(uploads / "blobs"), compression="gzip")
+    ExactIndex(str(vectors_dir))
+    for doc_id, data in (("a", b"%PDF shared"), ("b", b"%PDF shared"), ("c", b"%PDF other")):
+        digest = blobs.put(data, doc_id)
+        store.insert_document("documents", {"_id": doc_id, "blob_sha256": digest, "file_path": blobs.path(digest)})
+    archive = tmp_path / "full.tar.gz"
+    create_snapshot(str(archive), str(vectors_dir), str(uploads), store)
+
+    replica_uploads = tmp_path / "replica" / "uploads"
+    restored_store = SQLiteStore(str(tmp_path / "replica.db"))
+    restore_snapshot(str(archive), str(tmp_path / "replica" / "chroma_db"), str(replica_uploads), restored_store)
+
+    restored_blobs = BlobStore(str(replica_uploads / "blobs"))
+    documents = {d["_id"]: d for d in restored_store.get_all_documents("documents")}
+    for doc_id, data in (("a", b"%PDF shared"), ("b", b"%PDF shared"), ("c", b"%PDF other")):
+        document = documents[doc_id]
+        assert document["file_path"] == restored_blobs.path(document["blob_sha256"])
+        assert str(replica_uploads) in document["file_path"]
+        with restored_blobs.document_path(document) as path:
+            assert Path(path).read_bytes() == data
+    assert restored_blobs.refs(documents["a"]["blob_sha256"]) == ["a", "b"]
+
+def test_modules_import_without_fcntl(monkeypatch):
+    """Test the snapshot and blob store modules import where fcntl does not exist"""
+    import backend.blob_store
+    import backend.file_locks
+    import backend.snapshot
+    monkeypatch.setitem(sys.modules, "fcntl", None)
+    for module in (backend.file_locks, backend.snapshot, backend.blob_store):
+        importlib.reload(module)
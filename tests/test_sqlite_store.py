@@ -0,0 +1,51 @@
+import pytest
+import sys
+import os
+from pathlib import Path
+from datetime import datetime
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.sqlite_store import SQLiteStore
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteStore(os.path.join(tmp_path, "metadata.db"))
+    yield store
+    store.close()
+
+def test_insert_get_update_delete(store):
+    """Test the MongoDB-compatible document helpers"""
+    uploaded_at = datetime(2024, 5, 6, 7, 8, 9)
+    store.insert_document("documents", {"_id": "a", "title": "NDA", "category": "contract", "uploaded_at": uploaded_at})
+
+    doc = store.get_document("documents", "a")
+    assert doc["title"] == "NDA"
+    assert doc["uploaded_at"] == uploaded_at
+
+    assert store.update_document("documents", "a", {"vector_ids": ["a_0"]})
+    assert store.get_document("documents", "a")["vector_ids"] == ["a_0"]
+
+    assert store.delete_document("documents", "a")
+    assert store.get_document("documents", "a") is None
+    assert not store.delete_document("documents", "a")
+
+def test_batched_insert_and_indexed_query(store):
+    """Test insert_documents and filtering on an indexed column"""
+    docs = [{"_id": str(i), "category": "policy" if i % 2 else "contract"} for i in range(10)]
+    store.insert_documents("documents", docs)
+
+    assert len(store.get_all_documents("documents")) == 10
+    assert store.get_collection("documents").count_documents({"category": "policy"}) == 5
+    assert store.get_all_documents("other") == []
+
+def test_failed_batch_rolls_back(store):
+    """Test a write batch is all-or-nothing"""
+    with pytest.raises(Exception):
+        with store.write():
+            store.insert_document("documents", {"_id": "a"})
+            store.insert_document("documents", {"_id": "a"})
+
+    assert store.get_document("documents", "a") is None
@@ -0,0 +1,98 @@
+import pytest
+import sys
+import os
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.upload_sessions import UploadSessionManager
+
+def _wait(session, timeout=5):
+    deadline = time.time() + timeout
+    while not session.finished and time.time() < deadline:
+        time.sleep(0.01)
+
+def test_chunked_upload_and_background_ingest(tmp_path):
+    """Test chunks append in order and ingestion reports progress"""
+    manager = UploadSessionManager(str(tmp_path))
+    session = manager.create("Title", "", "contract", "doc.pdf", 10)
+
+    manager.append_chunk(session, 0, b"12345")
+    with pytest.raises(ValueError):
+        manager.append_chunk(session, 0, b"12345")  # wrong offset, resume from 5
+    manager.append_chunk(session, session.received_bytes, b"67890")
+
+    def ingest(s):
+        with open(s.part_path, "rb") as f:
+            assert f.read() == b"1234567890"
+        s.update(stage="embedding", chunks_total=2, chunks_embedded=2)
+        return {"id": "doc"}
+
+    manager.complete(session, ingest)
+    _wait(session)
+
+    assert session.status == "completed"
+    assert session.document == {"id": "doc"}
+    assert session.to_dict()["chunks_embedded"] == 2
+    assert not os.path.exists(session.part_path)
+
+def test_incomplete_upload_cannot_complete(tmp_path):
+    """Test completion requires every declared byte"""
+    manager = UploadSessionManager(str(tmp_path))
+    session = manager.create("Title", "", "policy", "doc.pdf", 10)
+    manager.append_chunk(session, 0, b"123")
+
+    with pytest.raises(ValueError):
+        manager.complete(session, lambda s: {})
+    with pytest.raises(ValueError):
+        manager.append_chunk(session, 3, b"x" * 20)
+
+def test_failed_ingest_is_reported(tmp_path):
+    """Test an ingestion error marks the session failed"""
+    manager = UploadSessionManager(str(tmp_path))
+    session = manager.create("Title", "", "other", "doc.pdf", 1)
+    manager.append_chunk(session, 0, b"x")
+
+    def ingest(s):
+        raise RuntimeError("No text extracted")
+
+    manager.complete(session, ingest)
+    _wait(session)
+    assert session.status == "failed"
+    assert session.error == "No text extracted"
+
+def test_chunk_writes_do_not_block_other_sessions(tmp_path):
+    """Test a chunk being written to one session leaves other sessions free"""
+    from backend.file_locks import locked_file
+    manager = UploadSessionManager(str(tmp_path))
+    slow = manager.create("Slow", "", "other", "slow.pdf", 10)
+    fast = manager.create("Fast", "", "other", "fast.pdf", 3)
+
+    # Hold the slow session's lock, as a long write would
+    with open(slow.part_path, "ab") as part, locked_file(part):
+        manager.append_chunk(fast, 0, b"abc")
+        assert manager.get(fast.upload_id).received_bytes == 3
+
+def test_sessions_in_metadata_store_are_shared_between_workers(tmp_path):
+    """Test a session started in one worker takes chunks and reports progress in another"""
+    from backend.sqlite_store import SQLiteStore
+    store = SQLiteStore(str(tmp_path / "metadata.db"))
+    first = UploadSessionManager(str(tmp_path), store=store)
+    second = UploadSessionManager(str(tmp_path), store=store)
+
+    session = first.create("Title", "", "policy", "doc.pdf", 6)
+    first.append_chunk(session, 0, b"abc")
+    other = second.get(session.upload_id)
+    assert other.received_bytes == 3
+    second.append_chunk(other, 3, b"def")
+    with pytest.raises(ValueError):
+        first.append_chunk(session, 3, b"def")  # stale copy, refreshed under the lock
+    assert session.received_bytes == 6
+
+    second.complete(other, lambda s: {"id": "doc"})
+    _wait(other)
+    assert first.get(session.upload_id).status == "completed"
+    assert first.count("completed") == 1